@@ -1,19 +1,513 @@
 """Async client for the HundredX API."""
 
-from hundred_x.client import HundredXClient
+import asyncio
+import time
+from concurrent.futures import Executor
+from functools import partial
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+import aiohttp
+
+from hundred_x import json_backend, tracing
+from hundred_x.client import HundredXClient, headers
+from hundred_x.constants import DEFAULT_BACKOFF_FACTOR, DEFAULT_MAX_RETRIES, DEFAULT_POOL_SIZE, SUCCESS_CODE
+from hundred_x.enums import Environment, OrderSide, OrderType, RequestPriority, TimeInForce
+from hundred_x.exceptions import APIError, ClientError
+from hundred_x.metrics import RequestEvent, RequestHook
+from hundred_x.order_book import OrderBook
+from hundred_x.order_tracker import TrackedOrder
+from hundred_x.products import Product
+from hundred_x.rate_limit import RateLimiter, is_throttled, parse_retry_after, throttled_error
+from hundred_x.transport import RETRY_METHODS, RETRY_STATUS_CODES
+from hundred_x.utils import from_message_to_payload
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class AsyncHundredXClient(HundredXClient):
-    """Asynchronous client for the HundredX API."""
+    """Asynchronous client for the HundredX API.
+
+    Requests go through one shared ``aiohttp`` connection pool, so independent calls can run together:
+
+        depth, balances, positions, orders = await asyncio.gather(
+            client.get_depth("ethperp"),
+            client.get_spot_balances(),
+            client.get_position(),
+            client.get_open_orders("ethperp"),
+        )
+
+    Signing runs in ``sign_executor`` (the loop's default thread pool if not given) so it does not stall
+    the event loop. The client is always lazy: construction makes no requests, the referral code is registered
+    before the first signed request and the session is logged in on the first authenticated one. Await
+    ``warmup`` to do that up front.
+    """
+
+    def __init__(
+        self,
+        env: Environment = Environment.TESTNET,
+        private_key: str | None = None,
+        subaccount_id: int = 0,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        keep_alive: bool = True,
+        timeouts: Dict[str, float] | None = None,
+        sign_executor: Executor | None = None,
+        rate_limiter: RateLimiter | None = None,
+        request_hooks: List[RequestHook] | None = None,
+    ):
+        """Initialize the client with the given environment."""
+        super().__init__(
+            env=env,
+            private_key=private_key,
+            subaccount_id=subaccount_id,
+            pool_size=pool_size,
+            max_retries=max_retries,
+            keep_alive=keep_alive,
+            timeouts=timeouts,
+            lazy=True,
+            rate_limiter=rate_limiter,
+            request_hooks=request_hooks,
+        )
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.keep_alive = keep_alive
+        self.sign_executor = sign_executor
+        self._async_session: aiohttp.ClientSession | None = None
+        # Requests go through aiohttp, so the pooled requests session built by the sync client is never used.
+        self.session.close()
+
+    def __enter__(self):
+        """Refuse the sync context manager, which could not await ``close``."""
+        raise TypeError("Use 'async with AsyncHundredXClient(...)' instead of 'with'.")
+
+    def __exit__(self, *args):
+        """Refuse the sync context manager, which could not await ``close``."""
+        raise TypeError("Use 'async with AsyncHundredXClient(...)' instead of 'with'.")
+
+    async def __aenter__(self):
+        """Enter the async context manager."""
+        return self
+
+    async def __aexit__(self, *args):
+        """Close the client when leaving the async context manager."""
+        await self.close()
+
+    async def close(self):
+        """Close the pooled connections."""
+        if self._async_session is not None:
+            await self._async_session.close()
+            self._async_session = None
+        super().close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it inside the running loop on first use."""
+        if self._async_session is None or self._async_session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, force_close=not self.keep_alive)
+            self._async_session = aiohttp.ClientSession(connector=connector)
+        return self._async_session
+
+    async def _offload(self, func, *args, **kwargs) -> Any:
+        """Run blocking work such as signing in the executor."""
+        loop = asyncio.get_running_loop()
+        call = partial(func, *args, **kwargs)
+        if tracing.active():
+            call = tracing.carry(call, "offload")
+        return await loop.run_in_executor(self.sign_executor, call)
+
+    async def _request(self, method: str, endpoint: str, **kwargs) -> tuple[int, bytes, Any]:
+        """Send a request, and report it to the request hooks if there are any; see ``_send_request``."""
+        if not self.request_hooks:
+            return await self._send_request(method, endpoint, None, **kwargs)
+        event = RequestEvent(method, endpoint, None, 0.0, sent=len(kwargs.get("data") or b""))
+        start = time.perf_counter()
+        try:
+            return await self._send_request(method, endpoint, event, **kwargs)
+        except Exception as exc:
+            event.error = exc
+            raise
+        finally:
+            event.elapsed = time.perf_counter() - start
+            self._run_request_hooks(event)
+
+    async def _send_request(
+        self, method: str, endpoint: str, event: RequestEvent | None, **kwargs
+    ) -> tuple[int, bytes, Any]:
+        """Send a request through the pooled session, returning the status, raw body and decoded body.
+
+        Mirrors the sync adapter: connection errors are retried for any method, bad statuses only for GETs.
+        The rate limiter, if any, is awaited before every attempt, and throttled GETs are retried once it
+        allows; a throttled response that is not retried raises ``RateLimitError``. The outcome is written
+        to ``event``, if given.
+        """
+        timeout = aiohttp.ClientTimeout(total=self._timeout(endpoint))
+        priority = RequestPriority.HIGH if method == "DELETE" else RequestPriority.NORMAL
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(endpoint, priority)
+            throttled = False
+            try:
+                async with self._get_session().request(
+                    method, self.rest_url + endpoint, timeout=timeout, **kwargs
+                ) as response:
+                    raw = await response.read()
+                    if event is not None:
+                        event.status, event.received, event.retries = response.status, len(raw), attempt
+                    throttled = is_throttled(response.status, raw)
+                    retry_after = parse_retry_after(response.headers) if throttled else None
+                    if self.rate_limiter is not None:
+                        retry_after = self.rate_limiter.record(endpoint, throttled, retry_after)
+                    retry = method in RETRY_METHODS and (
+                        response.status in RETRY_STATUS_CODES or (throttled and self.rate_limiter is not None)
+                    )
+                    if not retry or attempt >= self.max_retries:
+                        if throttled:
+                            raise throttled_error(endpoint, response.status, raw, retry_after)
+                        tracing.mark("network")
+                        body = json_backend.loads(raw) if raw else None
+                        return response.status, raw, body
+            except aiohttp.ClientConnectionError:
+                if attempt >= self.max_retries:
+                    raise
+            if not throttled:  # a throttled retry already waits in the limiter
+                await asyncio.sleep(DEFAULT_BACKOFF_FACTOR * 2**attempt)
+            attempt += 1
+
+    async def warmup(self, login: bool = True):
+        """Do the deferred setup now: register the referral, log in, compile the signers and open a connection."""
+        if self._referral_pending:
+            await self.set_referral_code()
+        if login and self.wallet is not None and not self.session_cookie:
+            await self.login()
+        await self._offload(self._compile_signers)
+        await self.get_server_time()
+        return self
+
+    async def _get(self, endpoint: str, params: Dict[str, Any] | None = None, authenticated: bool = False) -> Any:
+        """Send a GET request and decode the response."""
+        if authenticated and self._needs_session():
+            await self.login()
+        _, _, body = await self._request(
+            "GET",
+            endpoint,
+            params=params,
+            headers=self.authenticated_headers if authenticated else None,
+        )
+        return body
+
+    async def send_message_to_endpoint(self, endpoint: str, method: str, message: dict, authenticated: bool = True):
+        """Send a message to an endpoint."""
+        if not self._validate_function(endpoint):
+            raise ClientError(f"Invalid endpoint: {endpoint}")
+        if self._needs_referral(endpoint):
+            await self.set_referral_code()
+            tracing.mark("referral")
+        payload = from_message_to_payload(message)
+        tracing.mark("payload")
+        data = json_backend.dumps(payload)
+        tracing.mark("serialize")
+        status, raw, body = await self._request(
+            method,
+            endpoint,
+            headers={**headers, **self.authenticated_headers} if authenticated else headers,
+            data=data,
+        )
+        tracing.mark("decode")
+        if status != SUCCESS_CODE:
+            raise APIError(
+                f"Failed to send message: {raw.decode()} {status} {self.rest_url} {payload}",
+                status=status,
+                body=raw,
+                endpoint=endpoint,
+            )
+        return body
+
+    async def withdraw(self, subaccount_id: int, quantity: int, asset: str = "USDB"):
+        """Generate a withdrawal message and sign it."""
+        with self._trace("withdraw"):
+            message = await self._offload(self._withdraw_message, subaccount_id, quantity, asset)
+            return await self.send_message_to_endpoint("/v1/withdraw", "POST", message)
+
+    async def create_order(
+        self,
+        subaccount_id: int,
+        product_id: int | str,
+        quantity: int,
+        price: int,
+        side: OrderSide,
+        order_type: OrderType,
+        time_in_force: TimeInForce,
+        nonce: int = 0,
+        duration: int = 1000,
+    ):
+        """Create an order; ``product_id`` may also be a symbol such as ``ethperp``.
+
+        With a quote cache, a pre-signed order is sent only if its ladder's duration is at most ``duration``,
+        e.g. ``set_ladder(..., duration=1000)`` for the default; otherwise the order is signed inline.
+        """
+        with self._trace("create_order"):
+            product_id = await self._resolve_product_id(product_id)
+            tracing.mark("resolve")
+            message = await self._offload(
+                self._order_message,
+                subaccount_id,
+                product_id,
+                quantity,
+                price,
+                side,
+                order_type,
+                time_in_force,
+                nonce,
+                duration,
+            )
+            response = await self.send_message_to_endpoint("/v1/order", "POST", message)
+            self._track_order(message, response)
+            return response
+
+    async def cancel_and_replace_order(
+        self,
+        subaccount_id: int,
+        product_id: int | str,
+        quantity: int,
+        price: int,
+        side: OrderSide,
+        order_id_to_cancel: str,
+        nonce: int = 0,
+        duration: int = 1000,
+        order_type: OrderType = OrderType.LIMIT_MAKER,
+        time_in_force: TimeInForce = TimeInForce.GTC,
+    ):
+        """Cancel and replace an order; ``product_id`` may also be a symbol.
+
+        The replacement is taken from the quote cache under the same condition as in ``create_order``.
+        """
+        with self._trace("cancel_and_replace_order"):
+            product_id = await self._resolve_product_id(product_id)
+            tracing.mark("resolve")
+            message = await self._offload(
+                self._cancel_and_replace_message,
+                subaccount_id,
+                product_id,
+                quantity,
+                price,
+                side,
+                order_id_to_cancel,
+                nonce,
+                duration,
+                order_type,
+                time_in_force,
+            )
+            response = await self.send_message_to_endpoint("/v1/order/cancel-and-replace", "POST", message)
+            self._track_order(message["newOrder"], response, replaced=order_id_to_cancel)
+            return response
+
+    async def cancel_order(self, subaccount_id: int, product_id: int | str, order_id: int):
+        """Cancel an order; ``product_id`` may also be a symbol."""
+        with self._trace("cancel_order"):
+            product_id = await self._resolve_product_id(product_id)
+            tracing.mark("resolve")
+            message = await self._offload(self._cancel_order_message, subaccount_id, product_id, order_id)
+            response = await self.send_message_to_endpoint("/v1/order", "DELETE", message)
+            if self.order_tracker is not None:
+                self.order_tracker.remove(order_id)
+            return response
+
+    async def cancel_all_orders(self, subaccount_id: int, product_id: int | str):
+        """Cancel all orders; ``product_id`` may also be a symbol."""
+        product_id = await self._resolve_product_id(product_id)
+        message = await self._offload(self._cancel_all_orders_message, subaccount_id, product_id)
+        response = await self.send_message_to_endpoint("/v1/openOrders", "DELETE", message)
+        if self.order_tracker is not None:
+            self.order_tracker.clear(product_id)
+        return response
+
+    async def set_referral_code(self):
+        """Ensure sign a referral code."""
+        referral_payload = await self._offload(self._referral_message)
+        try:
+            response = await self.send_message_to_endpoint("/v1/referral/add-referee", "POST", referral_payload)
+        except Exception as exc:
+            if "user already referred" not in str(exc):
+                raise exc
+            response = None
+        self._referral_pending = False
+        return response
 
-    async def list_products(self):
+    async def create_authenticated_session_with_service(self):
+        """Log in and return session cookie."""
+        login_payload = await self._offload(self._login_message)
+        response = await self.send_message_to_endpoint(
+            "/v1/session/login", "POST", login_payload, authenticated=False
+        )
+        self.session_cookie = response.get("value")
+        return response
+
+    async def login(self):
+        """Login to the exchange."""
+        response = await self.create_authenticated_session_with_service()
+        if response is None:
+            raise ConnectionError("Failed to login")
+
+    async def list_products(self) -> List[Any]:
         """List all products available on the exchange."""
-        return super().list_products()
+        return await self._get("/v1/products")
 
-    async def get_product(self, symbol: str):
+    async def get_product(self, product_symbol: str) -> Any:
         """Get a specific product available on the exchange."""
-        return super().get_product(symbol)
+        return await self._get(f"/v1/products/{product_symbol}")
+
+    async def lookup_product(self, product: str | int) -> Product:
+        """Return a product by symbol or id, refetching the cached list when it is stale or lacks the product."""
+        refreshed = self.products.stale
+        if refreshed:
+            self.products.update(await self.list_products())
+        if self.products.get(product) is None and not refreshed:
+            self.products.update(await self.list_products())
+        return self.products[product]
+
+    async def _resolve_product_id(self, product: str | int) -> int:
+        """Return the id of a product given by id or by symbol."""
+        return product if isinstance(product, int) else (await self.lookup_product(product)).id
+
+    async def get_trade_history(self, symbol: str, lookback: int) -> Any:
+        """Get the trade history for a specific product symbol and lookback amount."""
+        return await self._get("/v1/trade-history", params={"symbol": symbol, "lookback": lookback})
+
+    async def get_trade_history_array(
+        self, symbol: str, lookback: int, tick: int | None = None, lot: int | None = None
+    ) -> "np.ndarray":
+        """Get the trade history as a structured array; see ``hundred_x.arrays``."""
+        from hundred_x.arrays import trades_array
+
+        return trades_array((await self.get_trade_history(symbol, lookback)).get("trades") or [], tick, lot)
 
-    async def get_server_time(self):
+    async def get_server_time(self) -> Any:
         """Get the server time."""
-        return super().get_server_time()
+        return await self._get("/v1/time")
+
+    async def get_candlestick(self, symbol: str, **kwargs) -> Any:
+        """Get the candlestick data for a specific product."""
+        params = {"symbol": symbol}
+        for arg in ["interval", "start_time", "end_time", "limit"]:
+            var = kwargs.get(arg)
+            if var is not None:
+                params[arg] = var
+        return await self._get("/v1/uiKlines", params=params)
+
+    async def get_symbol(self, symbol: str) -> Any:
+        """Get the details of a specific symbol."""
+        return (await self._get("/v1/ticker/24hr", params={"symbol": symbol}))[0]
+
+    async def get_depth(self, symbol: str, **kwargs) -> Any:
+        """Get the depth data for a specific product."""
+        params = {"symbol": symbol}
+        for arg in ["limit"]:
+            var = kwargs.get(arg)
+            if var is not None:
+                params[arg] = var
+        return await self._get("/v1/depth", params=params)
+
+    async def get_depth_arrays(
+        self, symbol: str, tick: int | None = None, lot: int | None = None, **kwargs
+    ) -> Dict[str, "np.ndarray"]:
+        """Get the depth data as ``bids`` and ``asks`` structured arrays; see ``hundred_x.arrays``."""
+        from hundred_x.arrays import depth_arrays
+
+        return depth_arrays(await self.get_depth(symbol, **kwargs), tick, lot)
+
+    async def get_order_book(self, symbol: str, **kwargs) -> OrderBook:
+        """Get the depth data for a specific product as a local order book."""
+        return OrderBook.from_depth(await self.get_depth(symbol, **kwargs), symbol)
+
+    async def get_session_status(self):
+        """Get the current session status."""
+        return await self._get("/v1/session/status", authenticated=True)
+
+    async def logout(self):
+        """Logout from the exchange."""
+        return await self._get("/v1/session/logout", authenticated=True)
+
+    async def get_spot_balances(self):
+        """Get the spot balances."""
+        return await self._get(
+            "/v1/balances",
+            params={"account": self.public_key, "subAccountId": self.subaccount_id},
+            authenticated=True,
+        )
+
+    async def get_position(self):
+        """Get all positions for the subaccount."""
+        return await self._get(
+            "/v1/positionRisk",
+            params={"account": self.public_key, "subAccountId": self.subaccount_id},
+            authenticated=True,
+        )
+
+    async def get_approved_signers(self):
+        """Get the approved signers."""
+        return await self._get(
+            "/v1/approved-signers",
+            params={"account": self.public_key, "subAccountId": self.subaccount_id},
+            authenticated=True,
+        )
+
+    async def get_open_orders(self, symbol: str | None = None):
+        """Get the open orders."""
+        params = {"account": self.public_key, "subAccountId": self.subaccount_id}
+        if symbol is not None:
+            params["symbol"] = symbol
+        return await self._get("/v1/openOrders", params=params, authenticated=True)
+
+    async def reconcile_orders(self, symbol: str | None = None) -> Tuple[List[TrackedOrder], List[TrackedOrder]]:
+        """Match the order tracker to the open orders on the exchange, optionally of one symbol.
+
+        Enables the tracker if needed. Returns the orders it was missing and the ones it had that are no
+        longer open.
+        """
+        tracker = self.enable_order_tracker()
+        since = time.monotonic()
+        open_orders = await self.get_open_orders(symbol)
+        product_id = None if symbol is None else await self._resolve_product_id(symbol)
+        return tracker.reconcile(open_orders, since, product_id)
+
+    async def get_open_orders_array(
+        self, symbol: str | None = None, tick: int | None = None, lot: int | None = None
+    ) -> "np.ndarray":
+        """Get the open orders as a structured array; see ``hundred_x.arrays``."""
+        from hundred_x.arrays import orders_array
+
+        return orders_array(await self.get_open_orders(symbol), tick, lot)
+
+    async def get_orders(self, symbol: str | None = None, ids: List[str] | None = None):
+        """Get the open orders."""
+        if self._needs_session():
+            await self.login()
+        params = [("account", self.public_key), ("subAccountId", self.subaccount_id)]
+        if ids is not None:
+            params.extend(("ids", order_id) for order_id in ids)
+        if symbol is not None:
+            params.append(("symbol", symbol))
+        status, raw, body = await self._request(
+            "GET", "/v1/orders", headers=self.authenticated_headers, params=params
+        )
+        if status != SUCCESS_CODE:
+            raise APIError(
+                f"Failed to get orders: {raw.decode()} {status} {self.rest_url} {params}",
+                status=status,
+                body=raw,
+                endpoint="/v1/orders",
+            )
+        return body
+
+    async def get_orders_array(
+        self, symbol: str | None = None, ids: List[str] | None = None, tick: int | None = None, lot: int | None = None
+    ) -> "np.ndarray":
+        """Get the orders as a structured array; see ``hundred_x.arrays``."""
+        from hundred_x.arrays import orders_array
+
+        return orders_array(await self.get_orders(symbol, ids), tick, lot)
+
+    async def deposit(self, subaccount_id: int, quantity: int, asset: str = "USDB"):
+        """Deposit an asset, running the on-chain calls in the executor."""
+        return await self._offload(super().deposit, subaccount_id, quantity, asset)
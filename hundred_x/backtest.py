@@ -0,0 +1,411 @@
+"""Replay recorded depth and trades through a ``Strategy`` and simulate the fills its quotes would have got.
+
+Events come from sources that stream from storage, so a backtest over months of ticks runs in constant
+memory: ``influx_depth`` reads the depth ``just_prices.py`` records in InfluxDB and ``parquet_trades`` the
+trades ``just_trades.py`` keeps in a parquet file. ``merge`` interleaves them by time.
+
+    product = client.lookup_product("ethperp")
+    events = merge(influx_depth(query_api, "prices", product, "-30d"), parquet_trades("ethperp.parquet", product))
+    result = Backtest(JustMM(size, max_size), product).run(events)
+    print(result.summary())
+
+The strategy sees the same ``ProductState`` and ``AccountState`` as under the ``QuotingEngine``, and is asked
+for quotes whenever the recorded book or the position changes. Quotes reach the book ``latency``
+milliseconds later, replacing the order on their side and level; like ``LIMIT_MAKER`` orders, quotes that would
+cross the book on arrival are rejected. A new order joins the back of its price level: the size recorded
+there is ahead of it and only shrinks through trades at that price, or when the level itself shrinks below
+it. Trades through a price fill the orders resting at it, and an order the recorded book crosses is filled
+in full.
+"""
+
+import heapq
+import time
+from operator import attrgetter
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+from hundred_x.constants import BACKTEST_BATCH, BACKTEST_LATENCY, BACKTEST_REORDER
+from hundred_x.engine import AccountState, ProductState, Quote, RestingOrder, Strategy, quote_slots
+from hundred_x.enums import OrderSide
+from hundred_x.fixed_point import SCALE, Fixed
+from hundred_x.products import Product
+
+Level = Tuple[int, int]
+# (is buy, level) of a quote, as in the engine's ``(side, level)`` slots.
+Slot = Tuple[bool, int]
+
+
+class DepthEvent(NamedTuple):
+    """A recorded book: ``(price, size)`` levels in wei, best first, at ``time`` in milliseconds."""
+
+    time: int
+    bids: List[Level]
+    asks: List[Level]
+
+
+class TradeEvent(NamedTuple):
+    """A recorded trade in wei; ``buyer_maker`` means a resting bid was hit by a seller."""
+
+    time: int
+    price: int
+    quantity: int
+    buyer_maker: bool
+
+
+Event = DepthEvent | TradeEvent
+
+
+def ordered(events: Iterable[Event], window: int = BACKTEST_REORDER) -> Iterator[Event]:
+    """Yield events in time order, given that none is more than ``window`` events away from its place."""
+    buffer: List[Tuple[int, int, Event]] = []
+    for sequence, event in enumerate(events):
+        if len(buffer) < window:
+            heapq.heappush(buffer, (event.time, sequence, event))
+        else:
+            yield heapq.heappushpop(buffer, (event.time, sequence, event))[2]
+    while buffer:
+        yield heapq.heappop(buffer)[2]
+
+
+def merge(*sources: Iterable[Event]) -> Iterator[Event]:
+    """Interleave time-ordered sources into one time-ordered stream."""
+    return heapq.merge(*sources, key=attrgetter("time"))
+
+
+def _scaler(unit: int):
+    """Return a function turning a float in human units into wei, rounded to a multiple of ``unit`` wei."""
+    step = int(unit) / SCALE
+    return lambda value: round(float(value) / step) * unit
+
+
+def influx_depth(
+    query_api: Any,
+    bucket: str,
+    product: Product,
+    start: str,
+    stop: str = "now()",
+    levels: int = 5,
+    measurement: str = "orderbook",
+) -> Iterator[DepthEvent]:
+    """Stream the depth recorded by ``just_prices.py`` from an InfluxDB ``QueryApi``, oldest first.
+
+    ``start`` and ``stop`` are Flux times, such as ``-30d`` or ``2024-05-01T00:00:00Z``. Rows are pivoted by
+    the server and read one at a time with ``query_stream``.
+    """
+    flux = f"""
+    from(bucket: "{bucket}")
+    |> range(start: {start}, stop: {stop})
+    |> filter(fn: (r) => r._measurement == "{measurement}" and r.symbol == "{product.symbol}")
+    |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+    |> sort(columns: ["_time"])
+    """
+    price, size = _scaler(product.tick), _scaler(product.lot)
+    names = {
+        side: [(f"{side}{i}_price", f"{side}{i}_amount") for i in range(1, levels + 1)] for side in ("bid", "ask")
+    }
+    for record in query_api.query_stream(flux):
+        values = record.values
+        book = {}
+        for side, fields in names.items():
+            book[side] = [
+                (price(values[price_field]), size(values[size_field]))
+                for price_field, size_field in fields
+                if values.get(price_field) is not None and values.get(size_field) is not None
+            ]
+        yield DepthEvent(int(record.get_time().timestamp() * 1000), book["bid"], book["ask"])
+
+
+def parquet_trades(
+    path: str, product: Product, batch_size: int = BACKTEST_BATCH, window: int = BACKTEST_REORDER
+) -> Iterator[TradeEvent]:
+    """Stream the trades ``just_trades.py`` saves to a parquet file, in time order, a batch at a time.
+
+    The file is appended to in pages of the trade history, newest first, so rows are put back in order
+    within ``window`` trades. Needs ``pyarrow``.
+    """
+    import pyarrow.parquet as pq
+
+    price, size = _scaler(product.tick), _scaler(product.lot)
+
+    def rows() -> Iterator[TradeEvent]:
+        columns = ["createdAt", "price", "quantity", "isBuyerMaker"]
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns):
+            data = batch.to_pydict()
+            for created_at, trade_price, quantity, buyer_maker in zip(*(data[column] for column in columns)):
+                yield TradeEvent(int(created_at), price(trade_price), size(quantity), bool(buyer_maker))
+
+    return ordered(rows(), window)
+
+
+class SimulatedOrder:
+    """A quote resting in the backtest, with the recorded size ahead of it in the queue."""
+
+    __slots__ = ("quote", "is_buy", "level", "price", "quantity", "filled", "ahead", "placed")
+
+    def __init__(self, quote: Quote, placed: int, level: int = 0):
+        """Take a quote for ``level`` of its side that reached the book at ``placed`` milliseconds."""
+        self.quote = quote
+        self.is_buy = quote.side == OrderSide.BUY
+        self.level = level
+        self.price = int(quote.price)
+        self.quantity = int(quote.quantity)
+        self.filled = 0
+        self.ahead = 0
+        self.placed = placed
+
+    @property
+    def remaining(self) -> int:
+        """Return the quantity still resting, in wei."""
+        return self.quantity - self.filled
+
+    def __repr__(self) -> str:
+        """Return a short description of the order."""
+        return f"SimulatedOrder({self.quote!r}, filled={Fixed(self.filled)}, ahead={Fixed(self.ahead)})"
+
+
+class BacktestResult:
+    """What a backtest did: PnL, fills and inventory, with amounts as ``Fixed`` in human units."""
+
+    def __init__(self):
+        """Start with nothing traded."""
+        self.events = 0
+        self.quotes = 0
+        self.orders = 0
+        self.rejected = 0
+        self.filled_orders = 0
+        self.fills = 0
+        self.quoted_quantity = 0
+        self.filled_quantity = 0
+        self.volume = 0
+        self.fees = 0
+        self.cash = 0
+        self.position = 0
+        self.max_position = 0
+        self.mark: int | None = None
+        self.start: int | None = None
+        self.end: int | None = None
+        self.inventory_time = 0
+        self.elapsed = 0.0
+
+    @property
+    def pnl(self) -> Fixed:
+        """Return the PnL after fees, with the position marked at the last mid."""
+        return Fixed(self.cash + self.position * (self.mark or 0) // SCALE)
+
+    @property
+    def fill_rate(self) -> float:
+        """Return the fraction of the orders that got at least one fill."""
+        return self.filled_orders / self.orders if self.orders else 0.0
+
+    @property
+    def mean_inventory(self) -> Fixed:
+        """Return the time-weighted mean absolute position."""
+        span = (self.end or 0) - (self.start or 0)
+        return Fixed(self.inventory_time // span) if span else Fixed(abs(self.position))
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the results as plain values, in human units."""
+        return {
+            "events": self.events,
+            "events_per_second": self.events / self.elapsed if self.elapsed else 0.0,
+            "hours": ((self.end or 0) - (self.start or 0)) / 3_600_000,
+            "pnl": float(self.pnl),
+            "fees": float(Fixed(self.fees)),
+            "volume": float(Fixed(self.volume)),
+            "quotes": self.quotes,
+            "orders": self.orders,
+            "rejected": self.rejected,
+            "fills": self.fills,
+            "fill_rate": self.fill_rate,
+            "quantity_fill_rate": self.filled_quantity / self.quoted_quantity if self.quoted_quantity else 0.0,
+            "position": float(Fixed(self.position)),
+            "max_position": float(Fixed(self.max_position)),
+            "mean_inventory": float(self.mean_inventory),
+        }
+
+    def __repr__(self) -> str:
+        """Return the headline numbers."""
+        return (
+            f"BacktestResult(pnl={self.pnl:.2f}, fills={self.fills}, fill_rate={self.fill_rate:.1%},"
+            f" position={Fixed(self.position)}, events={self.events})"
+        )
+
+
+class Backtest:
+    """Runs a ``Strategy`` on one product over recorded events; see the module docstring for the fill model.
+
+    ``maker_fee`` is a fraction of the notional, negative for a rebate. ``balance`` is what the strategy sees
+    as ``account.balance``; the PnL is added to it as the backtest runs.
+    """
+
+    def __init__(
+        self,
+        strategy: Strategy,
+        product: Product,
+        latency: int = BACKTEST_LATENCY,
+        maker_fee: Any = 0,
+        balance: Any = 10_000,
+    ):
+        """Set up a flat position and an empty book."""
+        self.strategy = strategy
+        self.product = product
+        self.latency = latency
+        self.maker_fee = int(Fixed.parse(maker_fee))
+        self.state = ProductState(product)
+        self.account = AccountState()
+        self.balance = Fixed.parse(balance)
+        self.account.balance = self.balance
+        self.result = BacktestResult()
+        self.live: Dict[Slot, SimulatedOrder] = {}
+        # Quotes on their way to the book, per slot: (arrival time, quote, or None to cancel the slot).
+        self.pending: Dict[Slot, Tuple[int, Quote | None]] = {}
+        self._last_book: Tuple[List[Level], List[Level]] | None = None
+        self._stale = True
+
+    def run(self, events: Iterable[Event]) -> BacktestResult:
+        """Replay time-ordered events and return the result."""
+        started = time.perf_counter()
+        result = self.result
+        for event in events:
+            now = event.time
+            if result.start is None:
+                result.start = result.end = now
+            result.inventory_time += abs(result.position) * (now - result.end)
+            result.end = now
+            result.events += 1
+            if self.pending:
+                self._arrive(now)
+            if type(event) is DepthEvent:
+                self._on_depth(event)
+            else:
+                self._on_trade(event)
+            if self._stale:
+                self._requote(now)
+        result.elapsed += time.perf_counter() - started
+        return result
+
+    def _arrive(self, now: int):
+        """Put the quotes whose latency has passed on the book, replacing or cancelling their slot."""
+        book = self.state.book
+        for slot, (arrival, quote) in list(self.pending.items()):
+            if arrival > now:
+                continue
+            del self.pending[slot]
+            self.live.pop(slot, None)
+            if quote is None:
+                continue
+            is_buy = slot[0]
+            order = SimulatedOrder(quote, arrival, slot[1])
+            opposite = book.asks.best if is_buy else book.bids.best
+            if opposite is not None and (opposite[0] <= order.price if is_buy else opposite[0] >= order.price):
+                self.result.rejected += 1
+                self._stale = True
+                continue
+            order.ahead = int((book.bids if is_buy else book.asks).size_at(order.price))
+            self.live[slot] = order
+            self.result.orders += 1
+            self.result.quoted_quantity += order.quantity
+        self._sync_resting()
+
+    def _on_depth(self, event: DepthEvent):
+        """Apply a recorded book, moving queue positions and filling crossed orders."""
+        book = self.state.book
+        levels = (event.bids, event.asks)
+        if levels == self._last_book:
+            return
+        self._last_book = levels
+        book.bids.replace(event.bids)
+        book.asks.replace(event.asks)
+        self._stale = True
+        bid, ask = book.bids.best, book.asks.best
+        if bid is not None and ask is not None:
+            self.result.mark = (bid[0] + ask[0]) // 2
+        for order in list(self.live.values()):
+            is_buy = order.is_buy
+            opposite = ask if is_buy else bid
+            if opposite is not None and (opposite[0] <= order.price if is_buy else opposite[0] >= order.price):
+                self._fill(order, order.remaining, event.time)
+            else:
+                order.ahead = min(order.ahead, int((book.bids if is_buy else book.asks).size_at(order.price)))
+
+    def _on_trade(self, event: TradeEvent):
+        """Fill the orders a recorded trade went through, best price first, once the size ahead is used up."""
+        orders = [order for order in self.live.values() if order.is_buy == event.buyer_maker]
+        orders.sort(key=attrgetter("price"), reverse=event.buyer_maker)
+        quantity = event.quantity
+        for order in orders:
+            if quantity <= 0:
+                break
+            if order.is_buy:
+                through, at = event.price < order.price, event.price == order.price
+            else:
+                through, at = event.price > order.price, event.price == order.price
+            if through:
+                filled = min(quantity, order.remaining)
+                self._fill(order, filled, event.time)
+                quantity -= filled
+            elif at:
+                reached = quantity - order.ahead
+                order.ahead = max(0, order.ahead - quantity)
+                quantity = 0
+                if reached > 0:
+                    filled = min(reached, order.remaining)
+                    self._fill(order, filled, event.time)
+                    quantity = reached - filled
+
+    def _fill(self, order: SimulatedOrder, quantity: int, now: int):
+        """Fill an order at its price and settle the position, cash and fees."""
+        result = self.result
+        if not order.filled:
+            result.filled_orders += 1
+        order.filled += quantity
+        notional = order.price * quantity // SCALE
+        fee = notional * self.maker_fee // SCALE
+        result.fills += 1
+        result.filled_quantity += quantity
+        result.volume += quantity
+        result.fees += fee
+        result.cash += (-notional if order.is_buy else notional) - fee
+        result.position += quantity if order.is_buy else -quantity
+        result.max_position = max(result.max_position, abs(result.position))
+        self.state.position = Fixed(result.position)
+        self.account.balance = Fixed(self.balance + result.pnl)
+        if not order.remaining:
+            del self.live[(order.is_buy, order.level)]
+            self._sync_resting()
+        self._stale = True
+        self.strategy.on_fill(
+            self.state,
+            {
+                "productId": self.product.id,
+                "isBuy": order.is_buy,
+                "price": str(order.price),
+                "quantity": str(quantity),
+                "createdAt": now,
+            },
+        )
+
+    def _requote(self, now: int):
+        """Ask the strategy for its quotes and send the ones that differ from what is live or on its way."""
+        self._stale = False
+        if self.state.book.mid is None:
+            return
+        self.result.quotes += 1
+        wanted = {
+            (side == OrderSide.BUY, level): quote
+            for (side, level), quote in quote_slots(self.strategy.quote(self.state, self.account)).items()
+        }
+        for slot in {*wanted, *self.pending, *self.live}:
+            quote = wanted.get(slot)
+            pending = self.pending.get(slot)
+            current = pending[1] if pending is not None else getattr(self.live.get(slot), "quote", None)
+            if quote != current:
+                self.pending[slot] = (now + self.latency, quote)
+
+    def _sync_resting(self):
+        """Show the live orders to the strategy as the engine's resting orders."""
+        self.state.resting = {
+            (OrderSide.BUY if is_buy else OrderSide.SELL, level): RestingOrder(
+                f"backtest-{order.placed}", order.quote, 0
+            )
+            for (is_buy, level), order in self.live.items()
+        }
@@ -1,33 +1,80 @@
-"""Wrap the the REST API of the exchange."""
+"""Wrap the the REST API of the exchange.
 
+Importing this module stays light: web3, eth_account, the EIP-712 structs, dotenv and the contract ABIs
+are only loaded by the clients and methods that use them, so market data scripts never pay for them.
+"""
+
+import logging
+import threading
 import time
-from decimal import Decimal
-from typing import Any, List
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
 
 import requests
-from dotenv import load_dotenv
-from eip712_structs import make_domain
-from eth_account.messages import encode_structured_data
-from web3 import Web3
-from web3.exceptions import TransactionNotFound
-
-from hundred_x.constants import APIS, CONTRACTS, LOGIN_MESSAGE, REFERRAL_CODE, RPC_URLS, SUCCESS_CODE
-from hundred_x.eip_712 import CancelOrder, CancelOrders, LoginMessage, Order, Referral, Withdraw
-from hundred_x.enums import ApiType, Environment, OrderSide, OrderType, TimeInForce
-from hundred_x.exceptions import ClientError, UserInputValidationError
-from hundred_x.utils import from_message_to_payload, get_abi
 
-load_dotenv()
+from hundred_x import json_backend, tracing
+from hundred_x.constants import (
+    APIS,
+    CONTRACTS,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_POOL_SIZE,
+    ENDPOINT_TIMEOUTS,
+    LOGIN_MESSAGE,
+    PRODUCTS_TTL,
+    REFERRAL_CODE,
+    RPC_URLS,
+    SUCCESS_CODE,
+    TIMEOUT,
+    TRACE_CAPACITY,
+)
+from hundred_x.enums import ApiType, Environment, OrderSide, OrderType, RequestPriority, TimeInForce
+from hundred_x.exceptions import APIError, ClientError, UserInputValidationError
+from hundred_x.metrics import Metrics, RequestEvent, RequestHook
+from hundred_x.order_book import OrderBook
+from hundred_x.order_tracker import OrderTracker, TrackedOrder
+from hundred_x.products import Product, ProductRegistry
+from hundred_x.quote_cache import QuoteCache
+from hundred_x.rate_limit import RateLimiter, is_throttled, parse_retry_after, throttled_error
+from hundred_x.tracing import Trace, Tracer
+from hundred_x.transport import RETRY_METHODS, create_session
+from hundred_x.utils import from_message_to_payload, get_abi, to_wei
+
+if TYPE_CHECKING:
+    import numpy as np
+    from web3 import Web3
+
+    from hundred_x.eip_712 import StructSigner
+    from hundred_x.signing import SigningPool
+
+logger = logging.getLogger(__name__)
 
 headers = {
     "Accept": "application/json",
     "Content-Type": "application/json",
 }
 
+ABI_FILES = {
+    "PROTOCOL_ABI": "protocol",
+    "ERC_20_ABI": "erc20",
+}
+CONTRACT_ABIS = {
+    "USDB": "erc20",
+    "PROTOCOL": "protocol",
+}
+
+
+def __getattr__(name: str):
+    """Load ``PROTOCOL_ABI`` and ``ERC_20_ABI`` on first access rather than at import."""
+    if name in ABI_FILES:
+        return get_abi(ABI_FILES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _eip_712():
+    """Return the EIP-712 structs module, importing it on first use."""
+    from hundred_x import eip_712
 
-PROTOCOL_ABI = get_abi("protocol")
-ERC_20_ABI = get_abi("erc20")
-TIMEOUT = 60
+    return eip_712
 
 
 class HundredXClient:
@@ -62,30 +109,139 @@ class HundredXClient:
         env: Environment = Environment.TESTNET,
         private_key: str | None = None,
         subaccount_id: int = 0,
+        session: requests.Session | None = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        keep_alive: bool = True,
+        timeouts: Dict[str, float] | None = None,
+        set_referral: bool = True,
+        signing_workers: int | None = None,
+        lazy: bool = False,
+        products_ttl: float = PRODUCTS_TTL,
+        products_cache: str | None = None,
+        rate_limiter: RateLimiter | None = None,
+        request_hooks: List[RequestHook] | None = None,
     ):
-        """Initialize the client with the given environment."""
+        """Initialize the client with the given environment.
+
+        All REST calls share one pooled session, so connections are reused across requests.
+        Pass ``session`` to supply your own, or tune the default one with ``pool_size``,
+        ``max_retries`` and ``keep_alive``. ``timeouts`` overrides the per-endpoint timeouts
+        in ``ENDPOINT_TIMEOUTS``. ``set_referral=False`` skips registering the referral code.
+        ``signing_workers`` sizes the process pool behind ``sign_many`` (one per core by default).
+
+        The product list is cached for ``products_ttl`` seconds, and also on disk at ``products_cache``
+        if given, so ``lookup_product`` and the order methods can take symbols without a request each.
+
+        A throttled response raises ``RateLimitError``. Pass a ``rate_limiter``, shared between clients, to
+        pace requests per endpoint, put cancels ahead of quotes and retry throttled GETs; see ``RateLimiter``.
+
+        ``request_hooks`` are called with a ``RequestEvent`` after every request; ``enable_metrics`` adds
+        one that keeps per-endpoint latency histograms.
+
+        Construction makes no requests: the web3 provider and contracts are built on first use. With
+        ``lazy=True`` the referral code is also registered just before the first signed request, and the
+        session is logged in on the first authenticated request, instead of here; call ``warmup`` to do
+        all of that ahead of time.
+        """
+        from dotenv import load_dotenv
+
+        load_dotenv()
         self.env = env
+        self.session = session or create_session(pool_size=pool_size, max_retries=max_retries, keep_alive=keep_alive)
+        self.timeouts = {**ENDPOINT_TIMEOUTS, **(timeouts or {})}
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter
+        self.request_hooks: List[RequestHook] = list(request_hooks or [])
+        self.metrics: Metrics | None = None
+        self.tracer: Tracer | None = None
         self.rest_url = APIS[env][ApiType.REST]
         self.websocket_url = APIS[env][ApiType.WEBSOCKET]
         if any([not self.rest_url, not self.websocket_url]):
             raise UserInputValidationError(
                 f"Invalid environment: {env} Missing REST or WEBSOCKET URL for the environment."
             )
-        self.web3 = Web3(Web3.HTTPProvider(RPC_URLS[env]))
+        self.lazy = lazy
+        self._web3: "Web3 | None" = None
+        self._contracts: Dict[str, Any] = {}
+        self.wallet = self.signing_key = self.public_key = None
         if private_key:
-            self.wallet = self.web3.eth.account.from_key(private_key)
+            from eth_account import Account
+            from eth_keys import keys
+
+            self.wallet = Account.from_key(private_key)
+            self.signing_key = keys.PrivateKey(bytes(self.wallet.key))
             self.public_key = self.wallet.address
-            if subaccount_id < 0 or subaccount_id > 255:
-                raise ValueError("Subaccount ID must be a number between 0 and 255.")
-            self.subaccount_id = subaccount_id
+        if subaccount_id < 0 or subaccount_id > 255:
+            raise ValueError("Subaccount ID must be a number between 0 and 255.")
+        self.subaccount_id = subaccount_id
         self.session_cookie = {}
-        self.domain = make_domain(
-            name="100x",
-            version="0.0.0",
-            chainId=CONTRACTS[env]["CHAIN_ID"],
-            verifyingContract=CONTRACTS[env]["VERIFYING_CONTRACT"],
-        )
-        self.set_referral_code()
+        self._signers: Dict[type, "StructSigner"] = {}
+        self._last_nonce = 0
+        self._nonce_lock = threading.Lock()
+        self.quote_cache: QuoteCache | None = None
+        self.order_tracker: OrderTracker | None = None
+        self.products = ProductRegistry(ttl=products_ttl, cache_path=products_cache)
+        self.signing_workers = signing_workers
+        self._signing_pool: "SigningPool | None" = None
+        self._domain = None
+        self._referral_pending = bool(private_key) and set_referral
+        if self._referral_pending and not lazy:
+            self.set_referral_code()
+
+    @property
+    def web3(self) -> "Web3":
+        """Return the web3 connection to the chain, creating it on first use."""
+        if self._web3 is None:
+            from web3 import Web3
+
+            self._web3 = Web3(Web3.HTTPProvider(RPC_URLS[self.env]))
+        return self._web3
+
+    @property
+    def domain(self):
+        """Return the EIP-712 domain that messages are signed under, creating it on first use."""
+        if self._domain is None:
+            from eip712_structs import make_domain
+
+            self._domain = make_domain(
+                name="100x",
+                version="0.0.0",
+                chainId=CONTRACTS[self.env]["CHAIN_ID"],
+                verifyingContract=CONTRACTS[self.env]["VERIFYING_CONTRACT"],
+            )
+        return self._domain
+
+    def warmup(self, login: bool = True):
+        """Do the deferred setup now: register the referral, log in, compile the signers and open a connection."""
+        if self._referral_pending:
+            self.set_referral_code()
+        if login and self.wallet is not None and not self.session_cookie:
+            self.login()
+        self._compile_signers()
+        self.get_server_time()
+        return self
+
+    def _compile_signers(self):
+        """Build the signers of every message type."""
+        eip_712 = _eip_712()
+        for message_class in (
+            eip_712.Order,
+            eip_712.CancelOrder,
+            eip_712.CancelOrders,
+            eip_712.Withdraw,
+            eip_712.LoginMessage,
+            eip_712.Referral,
+        ):
+            self._signer(message_class)
+
+    def _needs_referral(self, endpoint: str) -> bool:
+        """Return whether the deferred referral must be registered before sending to ``endpoint``."""
+        return self._referral_pending and endpoint != "/v1/referral/add-referee"
+
+    def _needs_session(self) -> bool:
+        """Return whether a lazy client must log in before an authenticated request."""
+        return self.lazy and self.wallet is not None and not self.session_cookie
 
     def _validate_function(self,endpoint):
         """Check if the endpoint is a private function."""
@@ -100,18 +256,200 @@ class HundredXClient:
                 )
             return True
 
+    def __enter__(self):
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *args):
+        """Close the client when leaving the context manager."""
+        self.close()
+
+    def close(self):
+        """Close the pooled connections, the quote cache and the signing pool."""
+        if self.quote_cache is not None:
+            self.quote_cache.close()
+        self.session.close()
+        if self._signing_pool is not None:
+            self._signing_pool.close()
+            self._signing_pool = None
+
+    def stream(self, **kwargs):
+        """Return a websocket stream for this client's environment; private streams log in as this account."""
+        from hundred_x.stream import HundredXStream
+
+        return HundredXStream(client=self, **kwargs)
+
+    def _timeout(self, endpoint: str) -> float:
+        """Return the timeout for an endpoint."""
+        return self.timeouts.get(endpoint, TIMEOUT)
+
+    def add_request_hook(self, hook: RequestHook):
+        """Call ``hook`` with a ``RequestEvent`` after every request."""
+        self.request_hooks.append(hook)
+
+    def remove_request_hook(self, hook: RequestHook):
+        """Stop calling a request hook."""
+        self.request_hooks.remove(hook)
+
+    def enable_metrics(self, metrics: Metrics | None = None) -> Metrics:
+        """Start recording per-endpoint latencies, statuses, retries and payload sizes; see ``Metrics``.
+
+        Pass a ``Metrics`` to share it between clients.
+        """
+        if self.metrics is None:
+            self.metrics = metrics or Metrics()
+            self.add_request_hook(self.metrics.record)
+        return self.metrics
+
+    def enable_tracing(self, tracer: Tracer | None = None, capacity: int = TRACE_CAPACITY) -> Tracer:
+        """Start recording phase timings of order submission in a ring buffer; see ``hundred_x.tracing``.
+
+        Pass a ``Tracer`` to share it between clients.
+        """
+        if self.tracer is None:
+            self.tracer = tracer or Tracer(capacity)
+        return self.tracer
+
+    def _trace(self, operation: str) -> "Trace | nullcontext":
+        """Return a trace of an operation if tracing is enabled, else a context manager that does nothing."""
+        return nullcontext() if self.tracer is None else self.tracer.trace(operation)
+
+    def _run_request_hooks(self, event: RequestEvent):
+        """Call the request hooks; a failing hook is logged rather than failing the request."""
+        for hook in self.request_hooks:
+            try:
+                hook(event)
+            except Exception as exc:
+                logger.warning(f"Request hook {hook!r} failed on {event!r}: {exc!r}")
+
+    def _request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        """Send a request, and report it to the request hooks if there are any; see ``_send_request``."""
+        if not self.request_hooks:
+            return self._send_request(method, endpoint, None, **kwargs)
+        event = RequestEvent(method, endpoint, None, 0.0, sent=len(kwargs.get("data") or b""))
+        start = time.perf_counter()
+        try:
+            return self._send_request(method, endpoint, event, **kwargs)
+        except Exception as exc:
+            event.error = exc
+            raise
+        finally:
+            event.elapsed = time.perf_counter() - start
+            self._run_request_hooks(event)
+
+    def _send_request(
+        self, method: str, endpoint: str, event: RequestEvent | None, **kwargs
+    ) -> requests.Response:
+        """Send a request through the pooled session, raising ``RateLimitError`` if it is throttled.
+
+        With a rate limiter the request first waits for the endpoint's budget, cancels ahead of the rest,
+        and throttled GETs are retried once the budget allows, up to ``max_retries`` times. The outcome is
+        written to ``event``, if given.
+        """
+        priority = RequestPriority.HIGH if method == "DELETE" else RequestPriority.NORMAL
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(endpoint, priority)
+            response = self.session.request(
+                method, self.rest_url + endpoint, timeout=self._timeout(endpoint), **kwargs
+            )
+            if event is not None:
+                retries = getattr(response.raw, "retries", None)
+                event.status = response.status_code
+                event.received = len(response.content)
+                event.retries = attempt + (len(retries.history) if retries is not None else 0)
+            throttled = is_throttled(response.status_code, response.content)
+            retry_after = parse_retry_after(response.headers) if throttled else None
+            if self.rate_limiter is not None:
+                retry_after = self.rate_limiter.record(endpoint, throttled, retry_after)
+            if not throttled:
+                return response
+            if self.rate_limiter is None or method not in RETRY_METHODS or attempt >= self.max_retries:
+                raise throttled_error(endpoint, response.status_code, response.content, retry_after)
+            attempt += 1
+
+    def _get(self, endpoint: str, params: Dict[str, Any] | None = None, authenticated: bool = False) -> Any:
+        """Send a GET request and decode the response."""
+        if authenticated and self._needs_session():
+            self.login()
+        response = self._request(
+            "GET",
+            endpoint,
+            params=params,
+            headers=self.authenticated_headers if authenticated else None,
+        )
+        return json_backend.loads(response.content)
+
     def _current_timestamp(self):
         """Return current timestamp in milliseconds."""
         return int(time.time() * 1000)
 
+    def _signer(self, message_class) -> "StructSigner":
+        """Return the compiled signer for a message class, building it on first use."""
+        signer = self._signers.get(message_class)
+        if signer is None:
+            signer = self._signers[message_class] = _eip_712().StructSigner(message_class, self.domain)
+        return signer
+
     def generate_and_sign_message(self, message_class, **kwargs):
         """Generate and sign a message."""
-        message = message_class(**kwargs)
-        message = message.to_message(self.domain)
-        signable_message = encode_structured_data(message)
-        signed = self.wallet.sign_message(signable_message)
-        message["message"]["signature"] = signed.signature.hex()
-        return message["message"]
+        signer = self._signer(message_class)
+        tracing.mark("build")
+        return signer.sign(self.signing_key, **kwargs)
+
+    def sign_many(self, intents: List[Tuple[type, Dict[str, Any]]]) -> List[dict]:
+        """Sign a batch of ``(message_class, fields)`` intents across worker processes, returning them in order.
+
+        Build the intents with ``order_intent`` and ``cancel_order_intent``, then send each signed message
+        with ``send_message_to_endpoint``. The pool starts on first use, with ``signing_workers`` processes
+        that each load the key once, and is shut down by ``close``.
+        """
+        if self._signing_pool is None:
+            from hundred_x.signing import SigningPool
+
+            self._signing_pool = SigningPool(bytes(self.wallet.key), self.domain.data_dict(), self.signing_workers)
+        return self._signing_pool.sign_many(intents)
+
+    def enable_quote_cache(self, **kwargs) -> QuoteCache:
+        """Start pre-signing order ladders in the background; see ``QuoteCache`` for the options.
+
+        Once enabled, orders sent without an explicit nonce are taken from the cache when a fresh entry
+        matches, so a reprice onto a pre-signed level skips signing. Center the ladders with
+        ``client.quote_cache.set_ladder``.
+        """
+        if self.quote_cache is None:
+            self.quote_cache = QuoteCache(self, **kwargs)
+            self.quote_cache.start()
+        return self.quote_cache
+
+    def enable_order_tracker(self, **kwargs) -> OrderTracker:
+        """Start tracking open orders locally; see ``OrderTracker`` for the options.
+
+        Once enabled, every order placed, replaced or cancelled through the client is recorded as the
+        response arrives. Keep it current with ``client.order_tracker.on_orders`` on the orders stream
+        and ``reconcile_orders``.
+        """
+        if self.order_tracker is None:
+            self.order_tracker = OrderTracker(**kwargs)
+        return self.order_tracker
+
+    def _track_order(self, message: dict, response: Any, replaced: str | None = None):
+        """Record an accepted order in the order tracker, if enabled."""
+        if self.order_tracker is not None and isinstance(response, dict) and "id" in response:
+            self.order_tracker.add({**message, **response}, replaced=replaced)
+
+    def reconcile_orders(self, symbol: str | None = None) -> Tuple[List[TrackedOrder], List[TrackedOrder]]:
+        """Match the order tracker to the open orders on the exchange, optionally of one symbol.
+
+        Enables the tracker if needed. Returns the orders it was missing and the ones it had that are no
+        longer open.
+        """
+        tracker = self.enable_order_tracker()
+        since = time.monotonic()
+        open_orders = self.get_open_orders(symbol)
+        product_id = None if symbol is None else self._product_id(symbol)
+        return tracker.reconcile(open_orders, since, product_id)
 
     def get_shared_params(self, asset: str | None = None, subaccount_id: int | None = None):
         """Return shared parameters for requests."""
@@ -126,32 +464,56 @@ class HundredXClient:
         """Send a message to an endpoint."""
         if not self._validate_function(endpoint):
             raise ClientError(f"Invalid endpoint: {endpoint}")
+        if self._needs_referral(endpoint):
+            self.set_referral_code()
+            tracing.mark("referral")
         payload = from_message_to_payload(message)
-        response = requests.request(
+        tracing.mark("payload")
+        data = json_backend.dumps(payload)
+        tracing.mark("serialize")
+        response = self._request(
             method,
-            self.rest_url + endpoint,
-            headers=self.authenticated_headers if authenticated else {},
-            json=payload,
-            timeout=TIMEOUT,
+            endpoint,
+            headers={**headers, **self.authenticated_headers} if authenticated else headers,
+            data=data,
         )
-        if response.status_code != 200:
-            raise ConnectionError(f"Failed to send message: {response.text} {response.status_code} {self.rest_url} {payload}")
-        return response.json()
-
-    def withdraw(self, subaccount_id: int, quantity: int, asset: str = "USDB"):
-        """Generate a withdrawal message and sign it."""
-        message = self.generate_and_sign_message(
-            Withdraw,
-            quantity=int(quantity * 1e18),
+        tracing.mark("network")
+        if response.status_code != SUCCESS_CODE:
+            raise APIError(
+                f"Failed to send message: {response.text} {response.status_code} {self.rest_url} {payload}",
+                status=response.status_code,
+                body=response.content,
+                endpoint=endpoint,
+            )
+        body = json_backend.loads(response.content)
+        tracing.mark("decode")
+        return body
+
+    def _withdraw_message(self, subaccount_id: int, quantity: int, asset: str) -> dict:
+        """Build and sign a withdrawal message."""
+        return self.generate_and_sign_message(
+            _eip_712().Withdraw,
+            quantity=to_wei(quantity),
             nonce=self._current_timestamp(),
             **self.get_shared_params(subaccount_id=subaccount_id, asset=asset),
         )
-        return self.send_message_to_endpoint("/v1/withdraw", "POST", message)
 
-    def create_order(
+    def withdraw(self, subaccount_id: int, quantity: int, asset: str = "USDB"):
+        """Generate a withdrawal message and sign it."""
+        with self._trace("withdraw"):
+            message = self._withdraw_message(subaccount_id, quantity, asset)
+            return self.send_message_to_endpoint("/v1/withdraw", "POST", message)
+
+    def _next_nonce(self, timestamp: int) -> int:
+        """Return the timestamp as a nonce, bumped past the last one so no two orders share a nonce."""
+        with self._nonce_lock:
+            self._last_nonce = max(timestamp, self._last_nonce + 1)
+            return self._last_nonce
+
+    def order_intent(
         self,
         subaccount_id: int,
-        product_id: int,
+        product_id: int | str,
         quantity: int,
         price: int,
         side: OrderSide,
@@ -159,112 +521,233 @@ class HundredXClient:
         time_in_force: TimeInForce,
         nonce: int = 0,
         duration: int = 1000,
-    ):
-        """Create an order."""
+    ) -> Tuple[type, Dict[str, Any]]:
+        """Return the unsigned ``(Order, fields)`` for an order, as accepted by ``sign_many``."""
         ts = self._current_timestamp()
         if nonce == 0:
-            nonce = ts
-        message = self.generate_and_sign_message(
-            Order,
-            subAccountId=subaccount_id,
-            productId=product_id,
-            quantity=int(Decimal(str(quantity)) * Decimal(1e18)),
-            price=int(Decimal(str(price)) * Decimal(1e18)),
-            isBuy=side.value,
-            orderType=order_type.value,
-            timeInForce=time_in_force.value,
-            nonce=nonce,
-            expiration0=ts + duration,
+            nonce = self._next_nonce(ts)
+        return _eip_712().Order, {
+            "subAccountId": subaccount_id,
+            "productId": self._product_id(product_id),
+            "quantity": to_wei(quantity),
+            "price": to_wei(price),
+            "isBuy": side.value,
+            "orderType": order_type.value,
+            "timeInForce": time_in_force.value,
+            "nonce": nonce,
+            "expiration": ts + duration,
             **self.get_shared_params(),
+        }
+
+    def _order_message(
+        self,
+        subaccount_id: int,
+        product_id: int | str,
+        quantity: int,
+        price: int,
+        side: OrderSide,
+        order_type: OrderType,
+        time_in_force: TimeInForce,
+        nonce: int = 0,
+        duration: int = 1000,
+    ) -> dict:
+        """Build and sign an order message, or take it from the quote cache."""
+        product_id = self._product_id(product_id)
+        if nonce == 0 and self.quote_cache is not None:
+            message = self.quote_cache.take(
+                subaccount_id, product_id, quantity, price, side, order_type, time_in_force, duration
+            )
+            if message is not None:
+                tracing.mark("quote_cache")
+                return message
+        message_class, fields = self.order_intent(
+            subaccount_id, product_id, quantity, price, side, order_type, time_in_force, nonce, duration
         )
-        return self.send_message_to_endpoint("/v1/order", "POST", message)
+        return self.generate_and_sign_message(message_class, **fields)
 
-    def cancel_and_replace_order(
+    def create_order(
         self,
         subaccount_id: int,
-        product_id: int,
+        product_id: int | str,
         quantity: int,
         price: int,
         side: OrderSide,
-        order_id_to_cancel: str,
+        order_type: OrderType,
+        time_in_force: TimeInForce,
         nonce: int = 0,
         duration: int = 1000,
     ):
-        """Cancel and replace an order."""
-        ts = self._current_timestamp()
-        if nonce == 0:
-            nonce = ts
-        _message = self.generate_and_sign_message(
-            Order,
-            subAccountId=subaccount_id,
-            productId=product_id,
-            quantity=int(Decimal(str(quantity)) * Decimal(1e18)),
-            price=int(Decimal(str(price)) * Decimal(1e18)),
-            isBuy=side.value,
-            orderType=OrderType.LIMIT_MAKER.value,
-            timeInForce=TimeInForce.GTC.value,
-            nonce=nonce,
-            expiration=ts + duration,
-            **self.get_shared_params(),
+        """Create an order; ``product_id`` may also be a symbol such as ``ethperp``.
+
+        With a quote cache, a pre-signed order is sent only if its ladder's duration is at most ``duration``,
+        e.g. ``set_ladder(..., duration=1000)`` for the default; otherwise the order is signed inline.
+        """
+        with self._trace("create_order"):
+            message = self._order_message(
+                subaccount_id, product_id, quantity, price, side, order_type, time_in_force, nonce, duration
+            )
+            response = self.send_message_to_endpoint("/v1/order", "POST", message)
+            self._track_order(message, response)
+            return response
+
+    def _cancel_and_replace_message(
+        self,
+        subaccount_id: int,
+        product_id: int | str,
+        quantity: int,
+        price: int,
+        side: OrderSide,
+        order_id_to_cancel: str,
+        nonce: int = 0,
+        duration: int = 1000,
+        order_type: OrderType = OrderType.LIMIT_MAKER,
+        time_in_force: TimeInForce = TimeInForce.GTC,
+    ) -> dict:
+        """Build and sign a cancel-and-replace message."""
+        _message = self._order_message(
+            subaccount_id,
+            product_id,
+            quantity,
+            price,
+            side,
+            order_type,
+            time_in_force,
+            nonce,
+            duration,
         )
-        message = {
+        return {
             "newOrder": from_message_to_payload(_message),
             "idToCancel": order_id_to_cancel,
         }
-        return self.send_message_to_endpoint("/v1/order/cancel-and-replace", "POST", message)
 
-    def cancel_order(self, subaccount_id: int, product_id: int, order_id: int):
-        """Cancel an order."""
-        message = self.generate_and_sign_message(
-            CancelOrder,
-            subAccountId=subaccount_id,
-            productId=product_id,
-            orderId=order_id,
+    def cancel_and_replace_order(
+        self,
+        subaccount_id: int,
+        product_id: int | str,
+        quantity: int,
+        price: int,
+        side: OrderSide,
+        order_id_to_cancel: str,
+        nonce: int = 0,
+        duration: int = 1000,
+        order_type: OrderType = OrderType.LIMIT_MAKER,
+        time_in_force: TimeInForce = TimeInForce.GTC,
+    ):
+        """Cancel and replace an order; ``product_id`` may also be a symbol.
+
+        The replacement is taken from the quote cache under the same condition as in ``create_order``.
+        """
+        with self._trace("cancel_and_replace_order"):
+            message = self._cancel_and_replace_message(
+                subaccount_id,
+                product_id,
+                quantity,
+                price,
+                side,
+                order_id_to_cancel,
+                nonce,
+                duration,
+                order_type,
+                time_in_force,
+            )
+            response = self.send_message_to_endpoint("/v1/order/cancel-and-replace", "POST", message)
+            self._track_order(message["newOrder"], response, replaced=order_id_to_cancel)
+            return response
+
+    def cancel_order_intent(
+        self, subaccount_id: int, product_id: int | str, order_id: int
+    ) -> Tuple[type, Dict[str, Any]]:
+        """Return the unsigned ``(CancelOrder, fields)`` for a cancel, as accepted by ``sign_many``."""
+        return _eip_712().CancelOrder, {
+            "subAccountId": subaccount_id,
+            "productId": self._product_id(product_id),
+            "orderId": order_id,
             **self.get_shared_params(),
-        )
-        return self.send_message_to_endpoint("/v1/order", "DELETE", message)
+        }
 
-    def cancel_all_orders(self, subaccount_id: int, product_id: int):
-        """Cancel all orders."""
-        message = self.generate_and_sign_message(
-            CancelOrders,
+    def _cancel_order_message(self, subaccount_id: int, product_id: int | str, order_id: int) -> dict:
+        """Build and sign a cancel message."""
+        message_class, fields = self.cancel_order_intent(subaccount_id, product_id, order_id)
+        return self.generate_and_sign_message(message_class, **fields)
+
+    def cancel_order(self, subaccount_id: int, product_id: int | str, order_id: int):
+        """Cancel an order; ``product_id`` may also be a symbol."""
+        with self._trace("cancel_order"):
+            message = self._cancel_order_message(subaccount_id, product_id, order_id)
+            response = self.send_message_to_endpoint("/v1/order", "DELETE", message)
+            if self.order_tracker is not None:
+                self.order_tracker.remove(order_id)
+            return response
+
+    def _cancel_all_orders_message(self, subaccount_id: int, product_id: int | str) -> dict:
+        """Build and sign a cancel-all message."""
+        return self.generate_and_sign_message(
+            _eip_712().CancelOrders,
             subAccountId=subaccount_id,
-            productId=product_id,
+            productId=self._product_id(product_id),
             **self.get_shared_params(),
         )
-        return self.send_message_to_endpoint("/v1/openOrders", "DELETE", message)
 
-    def create_authenticated_session_with_service(self):
-        """Log in and return session cookie."""
-        login_payload = self.generate_and_sign_message(
-            LoginMessage,
+    def cancel_all_orders(self, subaccount_id: int, product_id: int | str):
+        """Cancel all orders; ``product_id`` may also be a symbol."""
+        message = self._cancel_all_orders_message(subaccount_id, product_id)
+        response = self.send_message_to_endpoint("/v1/openOrders", "DELETE", message)
+        if self.order_tracker is not None:
+            self.order_tracker.clear(self._product_id(product_id))
+        return response
+
+    def _login_message(self) -> dict:
+        """Build and sign a login message."""
+        return self.generate_and_sign_message(
+            _eip_712().LoginMessage,
             message=LOGIN_MESSAGE,
             timestamp=self._current_timestamp(),
             **self.get_shared_params(),
         )
+
+    def create_authenticated_session_with_service(self):
+        """Log in and return session cookie."""
+        login_payload = self._login_message()
         response = self.send_message_to_endpoint("/v1/session/login", "POST", login_payload, authenticated=False)
         self.session_cookie = response.get("value")
         return response
 
     def list_products(self) -> List[Any]:
         """Get a list of all available products."""
-        return requests.get(f"{self.rest_url}/v1/products", timeout=TIMEOUT).json()
+        return self._get("/v1/products")
 
     def get_product(self, product_symbol: str) -> Any:
         """Get the details of a specific product."""
-        return requests.get(f"{self.rest_url}/v1/products/{product_symbol}", timeout=TIMEOUT).json()
+        return self._get(f"/v1/products/{product_symbol}")
+
+    def lookup_product(self, product: str | int) -> Product:
+        """Return a product by symbol or id, refetching the cached list when it is stale or lacks the product."""
+        refreshed = self.products.stale
+        if refreshed:
+            self.products.update(self.list_products())
+        if self.products.get(product) is None and not refreshed:
+            self.products.update(self.list_products())
+        return self.products[product]
+
+    def _product_id(self, product: str | int) -> int:
+        """Return the id of a product given by id or by symbol."""
+        return product if isinstance(product, int) else self.lookup_product(product).id
 
     def get_trade_history(self, symbol: str, lookback: int) -> Any:
         """Get the trade history for a specific product symbol and lookback amount."""
-        return requests.get(
-            f"{self.rest_url}/v1/trade-history",
-            params={"symbol": symbol, "lookback": lookback},
-            timeout=TIMEOUT,
-        ).json()
+        return self._get("/v1/trade-history", params={"symbol": symbol, "lookback": lookback})
+
+    def get_trade_history_array(
+        self, symbol: str, lookback: int, tick: int | None = None, lot: int | None = None
+    ) -> "np.ndarray":
+        """Get the trade history as a structured array; see ``hundred_x.arrays``."""
+        from hundred_x.arrays import trades_array
+
+        return trades_array(self.get_trade_history(symbol, lookback).get("trades") or [], tick, lot)
 
     def get_server_time(self) -> Any:
         """Get the server time."""
-        return requests.get(f"{self.rest_url}/v1/time", timeout=TIMEOUT).json()
+        return self._get("/v1/time")
 
     def get_candlestick(self, symbol: str, **kwargs) -> Any:
         """Get the candlestick data for a specific product."""
@@ -273,12 +756,11 @@ class HundredXClient:
             var = kwargs.get(arg)
             if var is not None:
                 params[arg] = var
-        return requests.get(f"{self.rest_url}/v1/uiKlines", params=params, timeout=TIMEOUT).json()
+        return self._get("/v1/uiKlines", params=params)
 
     def get_symbol(self, symbol: str) -> Any:
         """Get the details of a specific symbol."""
-        endpoint = f"/v1/ticker/24hr?symbol={symbol}"
-        return requests.get(self.rest_url + endpoint, timeout=TIMEOUT).json()[0]
+        return self._get("/v1/ticker/24hr", params={"symbol": symbol})[0]
 
     def get_depth(self, symbol: str, **kwargs) -> Any:
         """Get the depth data for a specific product."""
@@ -287,7 +769,19 @@ class HundredXClient:
             var = kwargs.get(arg)
             if var is not None:
                 params[arg] = var
-        return requests.get(f"{self.rest_url}/v1/depth", params=params, timeout=TIMEOUT).json()
+        return self._get("/v1/depth", params=params)
+
+    def get_depth_arrays(
+        self, symbol: str, tick: int | None = None, lot: int | None = None, **kwargs
+    ) -> Dict[str, "np.ndarray"]:
+        """Get the depth data as ``bids`` and ``asks`` structured arrays; see ``hundred_x.arrays``."""
+        from hundred_x.arrays import depth_arrays
+
+        return depth_arrays(self.get_depth(symbol, **kwargs), tick, lot)
+
+    def get_order_book(self, symbol: str, **kwargs) -> OrderBook:
+        """Get the depth data for a specific product as a local order book."""
+        return OrderBook.from_depth(self.get_depth(symbol, **kwargs), symbol)
 
     def login(self):
         """Login to the exchange."""
@@ -297,11 +791,7 @@ class HundredXClient:
 
     def get_session_status(self):
         """Get the current session status."""
-        return requests.get(
-            f"{self.rest_url}/v1/session/status",
-            headers=self.authenticated_headers,
-            timeout=TIMEOUT,
-        ).json()
+        return self._get("/v1/session/status", authenticated=True)
 
     @property
     def authenticated_headers(self):
@@ -310,62 +800,60 @@ class HundredXClient:
 
     def logout(self):
         """Logout from the exchange."""
-        return requests.get(
-            f"{self.rest_url}/v1/session/logout",
-            headers=self.authenticated_headers,
-            timeout=TIMEOUT,
-        ).json()
+        return self._get("/v1/session/logout", authenticated=True)
 
     def get_spot_balances(self):
         """Get the spot balances."""
-        return requests.get(
-            f"{self.rest_url}/v1/balances",
-            headers=self.authenticated_headers,
+        return self._get(
+            "/v1/balances",
             params={
                 "account": self.public_key,
                 "subAccountId": self.subaccount_id,
             },
-            timeout=TIMEOUT,
-        ).json()
+            authenticated=True,
+        )
 
     def get_position(self):
         """Get all positions for the subaccount."""
-        return requests.get(
-            f"{self.rest_url}/v1/positionRisk",
-            headers=self.authenticated_headers,
+        return self._get(
+            "/v1/positionRisk",
             params={
                 "account": self.public_key,
                 "subAccountId": self.subaccount_id,
             },
-            timeout=TIMEOUT,
-        ).json()
+            authenticated=True,
+        )
 
     def get_approved_signers(self):
         """Get the approved signers."""
-        return requests.get(
-            f"{self.rest_url}/v1/approved-signers",
-            headers=self.authenticated_headers,
+        return self._get(
+            "/v1/approved-signers",
             params={
                 "account": self.public_key,
                 "subAccountId": self.subaccount_id,
             },
-            timeout=TIMEOUT,
-        ).json()
+            authenticated=True,
+        )
 
     def get_open_orders(self,symbol: str | None = None):
         """Get the open orders."""
         params = {"account": self.public_key, "subAccountId": self.subaccount_id}
         if symbol is not None:
             params["symbol"] = symbol
-        return requests.get(
-            f"{self.rest_url}/v1/openOrders",
-            headers=self.authenticated_headers,
-            params=params,
-            timeout=TIMEOUT,
-        ).json()
+        return self._get("/v1/openOrders", params=params, authenticated=True)
+
+    def get_open_orders_array(
+        self, symbol: str | None = None, tick: int | None = None, lot: int | None = None
+    ) -> "np.ndarray":
+        """Get the open orders as a structured array; see ``hundred_x.arrays``."""
+        from hundred_x.arrays import orders_array
+
+        return orders_array(self.get_open_orders(symbol), tick, lot)
 
     def get_orders(self, symbol: str | None = None, ids: List[str] | None = None):
         """Get the open orders."""
+        if self._needs_session():
+            self.login()
         params = {"account": self.public_key, "subAccountId": self.subaccount_id}
 
         if ids is not None:
@@ -373,36 +861,48 @@ class HundredXClient:
         if symbol is not None:
             params["symbol"] = symbol
 
-        response = requests.get(
-            f"{self.rest_url}/v1/orders",
-            headers=self.authenticated_headers,
-            params=params,
-            timeout=TIMEOUT,
-        )
+        response = self._request("GET", "/v1/orders", headers=self.authenticated_headers, params=params)
         if response.status_code != SUCCESS_CODE:
-            raise ConnectionError(
-                f"Failed to get orders: {response.text} {response.status_code} " + f"{self.rest_url} {params}"
+            raise APIError(
+                f"Failed to get orders: {response.text} {response.status_code} " + f"{self.rest_url} {params}",
+                status=response.status_code,
+                body=response.content,
+                endpoint="/v1/orders",
             )
-        return response.json()
+        return json_backend.loads(response.content)
 
-    def set_referral_code(self):
-        """Ensure sign a referral code."""
-        referral_payload = self.generate_and_sign_message(
-            Referral,
+    def get_orders_array(
+        self, symbol: str | None = None, ids: List[str] | None = None, tick: int | None = None, lot: int | None = None
+    ) -> "np.ndarray":
+        """Get the orders as a structured array; see ``hundred_x.arrays``."""
+        from hundred_x.arrays import orders_array
+
+        return orders_array(self.get_orders(symbol, ids), tick, lot)
+
+    def _referral_message(self) -> dict:
+        """Build and sign a referral message."""
+        return self.generate_and_sign_message(
+            _eip_712().Referral,
             code=REFERRAL_CODE,
             **self.get_shared_params(),
         )
+
+    def set_referral_code(self):
+        """Ensure sign a referral code."""
+        referral_payload = self._referral_message()
         try:
-            return self.send_message_to_endpoint("/v1/referral/add-referee", "POST", referral_payload)
+            response = self.send_message_to_endpoint("/v1/referral/add-referee", "POST", referral_payload)
         except Exception as exc:
-            if "user already referred" in str(exc):
-                return
-            raise exc
+            if "user already referred" not in str(exc):
+                raise exc
+            response = None
+        self._referral_pending = False
+        return response
 
     def deposit(self, subaccount_id: int, quantity: int, asset: str = "USDB"):
         """Deposit an asset."""
         # we need to check if we have sufficient balance to deposit
-        required_wei = int(Decimal(str(quantity)) * Decimal(1e18))
+        required_wei = to_wei(quantity)
         # we check the approvals
         asset_contract = self.get_contract(asset)
 
@@ -441,6 +941,8 @@ class HundredXClient:
 
     def wait_for_transaction(self, txn_hash, timeout=TIMEOUT):
         """Wait for a transaction to be confirmed."""
+        from web3.exceptions import TransactionNotFound
+
         while True:
             if timeout == 0:
                 raise ConnectionError("Timeout")
@@ -455,15 +957,15 @@ class HundredXClient:
 
     def get_contract_address(self, name: str):
         """Get the contract address for a specific asset."""
-        return self.web3.to_checksum_address(CONTRACTS[self.env][name])
+        from eth_utils import to_checksum_address
+
+        return to_checksum_address(CONTRACTS[self.env][name])
 
     def get_contract(self, name: str):
-        """Get the contract for a specific asset."""
-        abis = {
-            "USDB": ERC_20_ABI,
-            "PROTOCOL": PROTOCOL_ABI,
-        }
-        return self.web3.eth.contract(
-            address=self.get_contract_address(name),
-            abi=abis[name],
-        )
+        """Get the contract for a specific asset, built once per client."""
+        if name not in self._contracts:
+            self._contracts[name] = self.web3.eth.contract(
+                address=self.get_contract_address(name),
+                abi=get_abi(CONTRACT_ABIS[name]),
+            )
+        return self._contracts[name]
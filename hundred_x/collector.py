@@ -0,0 +1,165 @@
+"""Sample the depth of many products at once and write it as symbol-tagged line protocol.
+
+Each symbol is polled by its own task on its own interval, and all of them share the async client's
+connection pool. A symbol whose requests fail backs off on its own while the others carry on. Every sample
+becomes one ``orderbook,symbol=...`` line for a ``BatchWriter``, which writes the lines of all symbols
+together in batches:
+
+    write_api = influx.write_api(write_options=SYNCHRONOUS)
+    with BatchWriter(lambda lines: write_api.write(bucket, org, lines)) as writer:
+        async with AsyncHundredXClient(Environment.PROD) as client:
+            await DepthCollector(client, writer, intervals={"ethperp": 0.2}).run()
+
+Without ``symbols`` every active product from ``list_products`` is collected. Pass a ``TickStore`` as
+``store`` to record the samples locally, with or without a writer.
+"""
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+from hundred_x.async_client import AsyncHundredXClient
+from hundred_x.constants import COLLECTOR_INTERVAL, COLLECTOR_LEVELS, COLLECTOR_MAX_BACKOFF, COLLECTOR_RETRY_DELAY
+from hundred_x.exceptions import APIError
+from hundred_x.line_protocol import BatchWriter, depth_line
+
+if TYPE_CHECKING:
+    from hundred_x.tick_store import TickStore
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolStats:
+    """Samples taken and requests failed for one symbol."""
+
+    __slots__ = ("samples", "errors", "last_error")
+
+    def __init__(self):
+        """Start with no samples."""
+        self.samples = 0
+        self.errors = 0
+        self.last_error: Exception | None = None
+
+    def __repr__(self) -> str:
+        """Return the counts."""
+        return f"SymbolStats(samples={self.samples}, errors={self.errors})"
+
+
+class DepthCollector:
+    """Polls the depth of several symbols concurrently and queues each sample on a ``BatchWriter``.
+
+    ``intervals`` overrides ``interval`` (seconds between samples, 0 for as fast as the exchange answers) per
+    symbol. A response without depth, or with an empty book on both sides, counts as a failed request and is
+    neither written nor stored. After a failed request a symbol waits ``COLLECTOR_RETRY_DELAY`` seconds,
+    doubling with every further failure up to ``max_backoff``.
+
+    Samples can also, or instead, be appended to a local ``TickStore``; the collector does not close it.
+    """
+
+    def __init__(
+        self,
+        client: AsyncHundredXClient,
+        writer: BatchWriter | None = None,
+        symbols: Iterable[str] | None = None,
+        interval: float = COLLECTOR_INTERVAL,
+        intervals: Dict[str, float] | None = None,
+        levels: int = COLLECTOR_LEVELS,
+        measurement: str = "orderbook",
+        max_backoff: float = COLLECTOR_MAX_BACKOFF,
+        store: "TickStore | None" = None,
+    ):
+        """Initialize the collector; nothing is sent until ``start``."""
+        self.client = client
+        self.writer = writer
+        self.symbols = None if symbols is None else list(symbols)
+        self.interval = interval
+        self.intervals = dict(intervals or {})
+        self.levels = levels
+        self.measurement = measurement
+        self.max_backoff = max_backoff
+        self.store = store
+        self.stats: Dict[str, SymbolStats] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    async def __aenter__(self):
+        """Start collecting when entering the async context manager."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        """Stop collecting when leaving the async context manager."""
+        await self.stop()
+
+    async def start(self):
+        """Resolve the symbols if none were given and start one sampling task per symbol."""
+        if self.symbols is None:
+            products = await self.client.list_products()
+            self.symbols = [product["symbol"] for product in products if product.get("isActive", True)]
+            logger.info(f"Collecting the depth of {len(self.symbols)} products: {', '.join(self.symbols)}")
+        for symbol in self.symbols:
+            self.stats[symbol] = SymbolStats()
+            interval = self.intervals.get(symbol, self.interval)
+            self._tasks.append(asyncio.create_task(self._collect(symbol, interval), name=f"depth-{symbol}"))
+
+    async def run(self):
+        """Start if needed and collect until cancelled."""
+        if not self._tasks:
+            await self.start()
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """Stop the sampling tasks; lines already queued stay with the writer."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _collect(self, symbol: str, interval: float):
+        """Sample one symbol every ``interval`` seconds, skipping samples it has fallen behind on."""
+        from hundred_x.arrays import depth_arrays
+
+        stats = self.stats[symbol]
+        tags = {"symbol": symbol}
+        product = None
+        failures = 0
+        due = time.monotonic()
+        while True:
+            try:
+                if self.store is not None and product is None:
+                    product = await self.client.lookup_product(symbol)
+                response = await self.client.get_depth(symbol, limit=self.levels)
+                if not isinstance(response, dict) or "bids" not in response:
+                    raise APIError(f"no depth in the response: {response!r}", endpoint="/v1/depth")
+                if not response["bids"] and not response.get("asks"):
+                    raise APIError("the book is empty on both sides", endpoint="/v1/depth")
+                timestamp = time.time_ns()
+                if self.writer is not None:
+                    depth = depth_arrays(response)
+                    await self._queue(depth_line(self.measurement, tags, depth, self.levels, timestamp))
+                if self.store is not None:
+                    self.store.append(product, timestamp, depth_arrays(response, int(product.tick), int(product.lot)))
+            except Exception as exc:
+                failures += 1
+                stats.errors += 1
+                stats.last_error = exc
+                delay = min(COLLECTOR_RETRY_DELAY * 2 ** (failures - 1), self.max_backoff)
+                logger.warning(f"Failed to sample the depth of {symbol} ({failures} in a row): {exc!r}")
+                await asyncio.sleep(delay)
+                due = time.monotonic()
+                continue
+            failures = 0
+            stats.samples += 1
+            due += interval
+            now = time.monotonic()
+            due = max(due, now)
+            # sleeping even for 0 lets symbols polled as fast as possible take turns
+            await asyncio.sleep(due - now)
+
+    async def _queue(self, line: str):
+        """Queue a line, waiting off the event loop while the writer's buffer is full."""
+        if not self.writer.add(line, timeout=0):
+            await asyncio.to_thread(self.writer.add, line)
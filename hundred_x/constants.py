@@ -2,9 +2,10 @@
 
 import os
 
-from hundred_x.enums import ApiType, Environment
+from hundred_x.enums import ApiType, Environment, StreamType
 
 SUCCESS_CODE = 200
+TOO_MANY_REQUESTS = 429
 
 DEVNET_REST_URL = os.getenv("DEVNET_REST_URL", None)
 DEVNET_WEBSOCKET_URL = os.getenv("DEVNET_WEBSOCKET_URL", None)
@@ -61,3 +62,102 @@ CONTRACTS = {
         "CHAIN_ID": 168587773,
     },
 }
+
+TIMEOUT = 60
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.1
+
+# Per-endpoint timeouts in seconds; anything not listed falls back to TIMEOUT.
+ENDPOINT_TIMEOUTS = {
+    "/v1/depth": 5,
+    "/v1/ticker/24hr": 5,
+    "/v1/time": 5,
+    "/v1/order": 10,
+    "/v1/order/cancel-and-replace": 10,
+    "/v1/openOrders": 10,
+    "/v1/orders": 10,
+    "/v1/balances": 10,
+    "/v1/positionRisk": 10,
+    "/v1/session/status": 10,
+}
+
+# Streams that need a signed login before subscribing.
+PRIVATE_STREAMS = (StreamType.ORDERS, StreamType.FILLS)
+STREAM_RECONNECT_DELAY = 0.5
+STREAM_MAX_RECONNECT_DELAY = 30
+
+# Pre-signed quote ladders: signature lifetime and the minimum left on an entry before it is evicted,
+# both in milliseconds, and how often the background thread refills the ladders, in seconds.
+QUOTE_CACHE_DURATION = 60_000
+QUOTE_CACHE_MIN_REMAINING = 5_000
+QUOTE_CACHE_REFRESH_INTERVAL = 1.0
+
+# How long the product list is reused before it is fetched again, in seconds.
+PRODUCTS_TTL = 300
+
+# Client-side rate limits as (requests per second, burst), per endpoint with RATE_LIMIT for the rest.
+# Normal requests leave RATE_LIMIT_RESERVE of each burst to cancels. A throttled response multiplies the
+# rate by RATE_LIMIT_BACKOFF, and every success wins back RATE_LIMIT_RECOVERY of it.
+RATE_LIMIT = (10.0, 20)
+ENDPOINT_RATE_LIMITS = {
+    "/v1/order": (20.0, 40),
+    "/v1/order/cancel-and-replace": (20.0, 40),
+    "/v1/openOrders": (10.0, 20),
+}
+RATE_LIMIT_RESERVE = 0.25
+RATE_LIMIT_BACKOFF = 0.5
+RATE_LIMIT_RECOVERY = 0.05
+RATE_LIMIT_MIN_RATE = 0.5
+RATE_LIMIT_MAX_WAIT = 10.0
+# Error bodies that mean a request was throttled, matched in lower case; order and position limit errors
+# such as "size limit exceeded" are rejections, not throttling.
+RATE_LIMIT_MARKERS = (b"rate limit", b"too many requests")
+
+# Local address the request metrics are served on by ``Metrics.serve``.
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9464
+# How many order submissions the tracer keeps.
+TRACE_CAPACITY = 10_000
+
+# Quoting engine: order lifetime and how long before expiry an order is renewed, in milliseconds; how often
+# balances and positions are refreshed, the depth is polled without a stream and the open orders are
+# reconciled, in seconds; depth levels.
+ENGINE_ORDER_DURATION = 100_000
+ENGINE_RENEW_MARGIN = 10_000
+ENGINE_ACCOUNT_INTERVAL = 5.0
+ENGINE_POLL_INTERVAL = 1.0
+ENGINE_RECONCILE_INTERVAL = 30.0
+ENGINE_DEPTH_LIMIT = 5
+# Order statuses after which an order is no longer on the book.
+CLOSED_ORDER_STATUSES = frozenset(["FILLED", "CANCELLED", "CANCELED", "EXPIRED", "REJECTED"])
+# Error text of a cancel-and-replace whose order was already filled or cancelled.
+ORDER_NOT_FOUND = "order to cancel not found"
+
+# Local matching-engine simulator: where ``python -m hundred_x.simulator`` listens, the USDB a new
+# subaccount starts with (in wei), how many closed orders and trades are kept for the history routes, and
+# the leverage the reported position margin assumes.
+SIMULATOR_HOST = "127.0.0.1"
+SIMULATOR_PORT = 8100
+SIMULATOR_BALANCE = 1_000_000 * 10**18
+SIMULATOR_HISTORY = 100_000
+SIMULATOR_LEVERAGE = 10
+# Backtests: delay between a quote decision and the order resting on (or leaving) the book, in milliseconds;
+# how many events the time-ordering buffer of a source holds, and how many rows a source reads at a time.
+BACKTEST_LATENCY = 50
+BACKTEST_REORDER = 10_000
+BACKTEST_BATCH = 65_536
+# Batched line-protocol writer: lines per write, seconds a line may wait for its batch, lines buffered before
+# ``add`` blocks, and write attempts per batch before it is dropped.
+LINE_BATCH_SIZE = 5_000
+LINE_FLUSH_INTERVAL = 1.0
+LINE_MAX_PENDING = 100_000
+LINE_WRITE_ATTEMPTS = 3
+# Depth collector: seconds between samples of a symbol, depth levels kept per side, and the first and longest
+# pause after a symbol's request fails.
+COLLECTOR_INTERVAL = 1.0
+COLLECTOR_LEVELS = 5
+COLLECTOR_RETRY_DELAY = 0.5
+COLLECTOR_MAX_BACKOFF = 30.0
+# Local tick store: seconds of samples per segment file before a new one is started.
+TICK_SEGMENT_SECONDS = 3600
@@ -3,7 +3,15 @@ Eip structs for the hundred_x project
 
 """
 
+from typing import Any, Callable, Dict, List, Tuple
+
 from eip712_structs import Address, Boolean, EIP712Struct, String, Uint
+from eth_account.messages import SignableMessage
+from eth_keys import keys
+from eth_utils.crypto import keccak
+from hexbytes import HexBytes
+
+from hundred_x.tracing import mark
 
 
 class LoginMessage(EIP712Struct):
@@ -49,3 +57,93 @@ class CancelOrders(EIP712Struct):
 class Referral(EIP712Struct):
     account = Address()
     code = String()
+
+
+def _encode_address(value: str) -> bytes:
+    return bytes.fromhex(value[2:] if value[:2] in ("0x", "0X") else value).rjust(32, b"\0")
+
+
+def _encode_bool(value: bool) -> bytes:
+    return (b"\0" * 31) + (b"\1" if value else b"\0")
+
+
+def _encode_string(value: str) -> bytes:
+    return keccak(text=value)
+
+
+def _uint_encoder(bits: int) -> Callable[[int], bytes]:
+    limit = 2**bits
+
+    def encode(value: int) -> bytes:
+        if not 0 <= value < limit:
+            raise ValueError(f"Value {value} does not fit in uint{bits}")
+        return value.to_bytes(32, "big")
+
+    return encode
+
+
+def _field_encoder(field_type) -> Callable[[Any], bytes]:
+    """Return the 32-byte encoder for a field type."""
+    if isinstance(field_type, Address):
+        return _encode_address
+    if isinstance(field_type, Boolean):
+        return _encode_bool
+    if isinstance(field_type, String):
+        return _encode_string
+    if isinstance(field_type, Uint):
+        return _uint_encoder(int(field_type.type_name.removeprefix("uint")))
+    raise TypeError(f"Unsupported field type {field_type.type_name}")
+
+
+def sign_digest(private_key: keys.PrivateKey, digest: bytes) -> str:
+    """Sign a 32-byte digest and return the hex signature in the ``r || s || v`` form eth_account produces.
+
+    Taking an ``eth_keys`` key object avoids re-deriving the public key on every call, which is what
+    ``LocalAccount.sign_message`` does. Installing ``coincurve`` makes the ECDSA step itself native.
+    """
+    v, r, s = private_key.sign_msg_hash(digest).vrs
+    return HexBytes(r.to_bytes(32, "big") + s.to_bytes(32, "big") + bytes([v + 27])).hex()
+
+
+class StructSigner:
+    """Sign one struct type with its domain separator and type hash computed once.
+
+    Produces the same message and signature as building the struct, calling ``to_message`` and
+    ``encode_structured_data``, but only the field values are encoded and hashed per call.
+    """
+
+    def __init__(self, message_class: type, domain: EIP712Struct):
+        """Precompute the hashes for ``message_class`` in ``domain``."""
+        self.message_class = message_class
+        self.domain_separator = domain.hash_struct()
+        self.type_hash = message_class.type_hash()
+        self.fields: List[Tuple[str, str, Callable[[Any], bytes]]] = [
+            (name, field_type.type_name, _field_encoder(field_type)) for name, field_type in message_class.get_members()
+        ]
+
+    def hash_struct(self, values: Dict[str, Any]) -> bytes:
+        """Return the struct hash of the field values."""
+        encoded = [self.type_hash]
+        for name, type_name, encode in self.fields:
+            value = values.get(name)
+            if value is None:
+                raise ValueError(f"Missing value for field {name} of type {type_name}")
+            encoded.append(encode(value))
+        return keccak(b"".join(encoded))
+
+    def signable_message(self, values: Dict[str, Any]) -> SignableMessage:
+        """Return the EIP-712 signable message for the field values."""
+        return SignableMessage(b"\x01", self.domain_separator, self.hash_struct(values))
+
+    def digest(self, values: Dict[str, Any]) -> bytes:
+        """Return the EIP-712 digest that gets signed."""
+        return keccak(b"\x19\x01" + self.domain_separator + self.hash_struct(values))
+
+    def sign(self, private_key: keys.PrivateKey, **kwargs) -> Dict[str, Any]:
+        """Sign the field values and return the message with its signature."""
+        message = {name: kwargs.get(name) for name, _, _ in self.fields}
+        digest = self.digest(message)
+        mark("hash")
+        message["signature"] = sign_digest(private_key, digest)
+        mark("sign")
+        return message
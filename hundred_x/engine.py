@@ -0,0 +1,505 @@
+"""An event-driven quoting engine: a strategy decides the quotes and the engine keeps them on the book.
+
+The engine keeps one ``ProductState`` per product: the local order book, the position and the orders
+resting on each side, one per level of the strategy's ladder. Depth and order updates arrive over the
+websocket stream (or by polling the REST depth when there is no stream), fills trigger a position refresh,
+and balances and positions are also refreshed in the background. Every change wakes the product's quoter,
+which asks the ``Strategy`` for the quotes it wants and sends only the differences, all levels at once.
+Updates that arrive while orders are in flight are folded into the next requote, so the reaction time to a
+book move is one round trip. The client's ``OrderTracker`` is reconciled with the exchange periodically:
+orders the engine lost track of are cancelled and resting orders that are gone are requoted.
+
+    class Join(Strategy):
+        def quote(self, state, account):
+            bid, ask = state.book.best_bid, state.book.best_ask
+            return [Quote(OrderSide.BUY, bid[0], "0.01"), Quote(OrderSide.SELL, ask[0], "0.01")]
+
+    async with AsyncHundredXClient(env, private_key) as client:
+        await QuotingEngine(client, Join(), ["ethperp"]).run()
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+from hundred_x.async_client import AsyncHundredXClient
+from hundred_x.constants import (
+    CLOSED_ORDER_STATUSES,
+    ENGINE_ACCOUNT_INTERVAL,
+    ENGINE_DEPTH_LIMIT,
+    ENGINE_ORDER_DURATION,
+    ENGINE_POLL_INTERVAL,
+    ENGINE_RECONCILE_INTERVAL,
+    ENGINE_RENEW_MARGIN,
+    ORDER_NOT_FOUND,
+)
+from hundred_x.enums import OrderSide, OrderType, StreamType, TimeInForce
+from hundred_x.exceptions import APIError, RateLimitError
+from hundred_x.fixed_point import Fixed
+from hundred_x.order_book import OrderBook
+from hundred_x.order_tracker import OrderTracker
+from hundred_x.products import Product
+
+logger = logging.getLogger(__name__)
+
+# (side, level): level 0 is a side's first quote, level 1 the next one on the same side and so on.
+Slot = Tuple[OrderSide, int]
+
+
+class Quote:
+    """An order a strategy wants resting on one side of the book."""
+
+    __slots__ = ("side", "price", "quantity")
+
+    def __init__(self, side: OrderSide, price: Any, quantity: Any):
+        """Parse the price and quantity, which may be human readable amounts or ``Fixed``."""
+        self.side = side
+        self.price = Fixed.parse(price)
+        self.quantity = Fixed.parse(quantity)
+
+    def __eq__(self, other) -> bool:
+        """Compare side, price and quantity."""
+        if not isinstance(other, Quote):
+            return NotImplemented
+        return (self.side, self.price, self.quantity) == (other.side, other.price, other.quantity)
+
+    def __hash__(self) -> int:
+        """Hash like the tuple of side, price and quantity."""
+        return hash((self.side, self.price, self.quantity))
+
+    def __repr__(self) -> str:
+        """Return a short description of the quote."""
+        return f"Quote({self.side.name}, price={self.price}, quantity={self.quantity})"
+
+
+def quote_slots(quotes: Iterable[Quote]) -> Dict[Slot, Quote]:
+    """Key quotes by ``(side, level)``, numbering the levels of each side in the order they were given."""
+    slots: Dict[Slot, Quote] = {}
+    levels = dict.fromkeys(OrderSide, 0)
+    for quote in quotes:
+        slots[(quote.side, levels[quote.side])] = quote
+        levels[quote.side] += 1
+    return slots
+
+
+class RestingOrder:
+    """An order the engine has on the book, with the quote it was sent for."""
+
+    def __init__(self, order_id: str, quote: Quote, expiration: int):
+        """Record an accepted order; ``expiration`` is in milliseconds since the epoch."""
+        self.order_id = order_id
+        self.quote = quote
+        self.expiration = expiration
+
+    def __repr__(self) -> str:
+        """Return a short description of the order."""
+        return f"RestingOrder({self.order_id!r}, {self.quote!r})"
+
+
+class ProductState:
+    """What the engine knows about one product; strategies read it and the engine keeps it current."""
+
+    def __init__(self, product: Product):
+        """Start with an empty book, a flat position and nothing resting."""
+        self.product = product
+        self.book = OrderBook(product.symbol)
+        self.position = Fixed(0)
+        self.margin = Fixed(0)
+        self.resting: Dict[Slot, RestingOrder] = {}
+        self.fills: List[Dict[str, Any]] = []
+        self.book_updated = 0.0
+        self.changed = asyncio.Event()
+        self.lock = asyncio.Lock()
+
+    def __repr__(self) -> str:
+        """Return a short description of the state."""
+        return f"ProductState({self.product.symbol!r}, position={self.position}, resting={list(self.resting.values())})"
+
+
+class AccountState:
+    """Subaccount-wide values shared by every product."""
+
+    def __init__(self):
+        """Start with no balance until the first refresh."""
+        self.balance = Fixed(0)
+        self.updated = 0.0
+
+
+class Strategy:
+    """Decides the quotes; subclass it and override ``quote`` and, if needed, the event hooks."""
+
+    def quote(self, state: ProductState, account: AccountState) -> Iterable[Quote]:
+        """Return the quotes to keep on the book; leaving a side or level out cancels its order.
+
+        Several quotes on one side lay a ladder: each is a level of that side, numbered in the order given,
+        and is replaced in place when it moves.
+        """
+        raise NotImplementedError
+
+    def on_fill(self, state: ProductState, fill: Dict[str, Any]):
+        """Handle a fill from the fills stream, before the position is refreshed."""
+
+    def on_error(self, state: ProductState, side: OrderSide, exc: Exception):
+        """Handle a failed order or cancel; the side is requoted on the next update."""
+        logger.warning(f"Failed to update the {side.name} quote on {state.product.symbol}: {exc!r}")
+
+
+class QuotingEngine:
+    """Runs a ``Strategy`` on one or more products through an ``AsyncHundredXClient``.
+
+    Orders are ``order_type`` with ``time_in_force``, signed for ``duration`` milliseconds and renewed
+    ``ENGINE_RENEW_MARGIN`` before they expire. With ``use_stream`` the book, orders and fills come from the
+    websocket, and if the stream task dies the depth is polled while it restarts; otherwise the depth is polled
+    every ``poll_interval`` seconds. Balances and positions are refreshed every ``account_interval`` seconds
+    and the open orders reconciled every ``reconcile_interval``.
+    If the client has a quote cache, the engine centers its ladders on the latest quotes so the next
+    reprice can skip signing.
+    """
+
+    def __init__(
+        self,
+        client: AsyncHundredXClient,
+        strategy: Strategy,
+        symbols: Iterable[str],
+        use_stream: bool = True,
+        duration: int = ENGINE_ORDER_DURATION,
+        account_interval: float = ENGINE_ACCOUNT_INTERVAL,
+        poll_interval: float = ENGINE_POLL_INTERVAL,
+        reconcile_interval: float = ENGINE_RECONCILE_INTERVAL,
+        depth_limit: int = ENGINE_DEPTH_LIMIT,
+        order_type: OrderType = OrderType.LIMIT_MAKER,
+        time_in_force: TimeInForce = TimeInForce.GTC,
+    ):
+        """Initialize the engine; nothing is sent until ``start``."""
+        self.client = client
+        self.strategy = strategy
+        self.symbols = list(symbols)
+        self.use_stream = use_stream
+        self.duration = duration
+        self.account_interval = account_interval
+        self.poll_interval = poll_interval
+        self.reconcile_interval = reconcile_interval
+        self.depth_limit = depth_limit
+        self.order_type = order_type
+        self.time_in_force = time_in_force
+        self.account = AccountState()
+        self.states: Dict[str, ProductState] = {}
+        self.by_id: Dict[int, ProductState] = {}
+        self.tracker: OrderTracker = client.enable_order_tracker()
+        self.stream = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def __aenter__(self):
+        """Start the engine when entering the async context manager."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        """Stop the engine and pull its quotes when leaving the async context manager."""
+        await self.stop()
+
+    async def start(self):
+        """Load the products, clear their open orders, take a first snapshot and start the event loops."""
+        if self.client.wallet is not None and not self.client.session_cookie:
+            await self.client.login()
+        products = await asyncio.gather(*(self.client.lookup_product(symbol) for symbol in self.symbols))
+        for product in products:
+            state = self.states[product.symbol] = ProductState(product)
+            self.by_id[product.id] = state
+        await self._cancel_all()
+        await asyncio.gather(self.refresh_account(), *(self.refresh_book(state) for state in self.states.values()))
+        if self.use_stream:
+            await self._subscribe()
+            self._tasks.append(asyncio.create_task(self._watch_stream()))
+        else:
+            self._tasks.append(asyncio.create_task(self._poll_loop()))
+        self._tasks.append(asyncio.create_task(self._account_loop()))
+        self._tasks.append(asyncio.create_task(self._reconcile_loop()))
+        self._tasks.extend(asyncio.create_task(self._quote_loop(state)) for state in self.states.values())
+
+    async def run(self):
+        """Start if needed and quote until cancelled, then pull the quotes."""
+        if not self._tasks:
+            await self.start()
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            await self.stop()
+
+    async def stop(self, cancel_orders: bool = True):
+        """Stop the event loops and the stream, and cancel every open order of the products."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.stream is not None:
+            await self.stream.close()
+            self.stream = None
+        if cancel_orders and self.states:
+            await self._cancel_all()
+
+    async def _cancel_all(self):
+        """Cancel every open order of the products and forget the resting ones."""
+        subaccount_id = self.client.subaccount_id
+        await asyncio.gather(
+            *(self.client.cancel_all_orders(subaccount_id, state.product.id) for state in self.states.values())
+        )
+        for state in self.states.values():
+            state.resting.clear()
+
+    async def _subscribe(self):
+        """Subscribe to the depth of every product and to the account's orders and fills."""
+        self.stream = self.client.stream()
+        await self.stream.start()
+        for symbol in self.states:
+            await self.stream.subscribe(StreamType.DEPTH, symbol, callback=self.on_depth)
+        if self.client.wallet is not None:
+            await self.stream.subscribe(StreamType.ORDERS, callback=self.on_orders)
+            await self.stream.subscribe(StreamType.FILLS, callback=self.on_fills)
+
+    def _state_for(self, data: Dict[str, Any]) -> ProductState | None:
+        """Return the state a stream item belongs to, by product id or symbol."""
+        state = self.by_id.get(data.get("productId"))
+        return state if state is not None else self.states.get(data.get("productSymbol") or data.get("symbol"))
+
+    def _mark(self, state: ProductState):
+        """Wake the product's quoter."""
+        state.changed.set()
+
+    def on_depth(self, name: str, data: Dict[str, Any]):
+        """Apply a depth stream message and requote its product."""
+        state = self.states.get(name.split("@", 1)[0])
+        if state is not None:
+            state.book.on_stream_message(name, data)
+            state.book_updated = time.monotonic()
+            self._mark(state)
+
+    def on_orders(self, name: str, data: Any):
+        """Forget resting orders that were filled, cancelled or expired, and requote their products."""
+        self.tracker.on_orders(name, data)
+        for order in data if isinstance(data, list) else [data]:
+            state = self._state_for(order)
+            if state is None or order.get("status") not in CLOSED_ORDER_STATUSES:
+                continue
+            for slot, resting in list(state.resting.items()):
+                if resting.order_id == order.get("id"):
+                    del state.resting[slot]
+                    self._mark(state)
+
+    async def on_fills(self, name: str, data: Any):
+        """Pass fills to the strategy and refresh the positions they changed."""
+        filled = []
+        for fill in data if isinstance(data, list) else [data]:
+            state = self._state_for(fill)
+            if state is not None:
+                state.fills.append(fill)
+                self.strategy.on_fill(state, fill)
+                filled.append(state)
+        if filled:
+            try:
+                await self.refresh_account()
+            except Exception as exc:
+                logger.warning(f"Failed to refresh the account after a fill: {exc!r}")
+            for state in filled:
+                self._mark(state)
+
+    async def refresh_book(self, state: ProductState):
+        """Replace a product's book with a REST depth snapshot."""
+        depth = await self.client.get_depth(state.product.symbol, granularity=5, limit=self.depth_limit)
+        state.book.apply_snapshot(depth)
+        state.book_updated = time.monotonic()
+
+    async def refresh_account(self):
+        """Fetch the balance and the positions together."""
+        if self.client.wallet is None:
+            return
+        balances, positions = await asyncio.gather(self.client.get_spot_balances(), self.client.get_position())
+        if balances:
+            self.account.balance = Fixed.from_wei(balances[0]["quantity"])
+        self.account.updated = time.monotonic()
+        held = {}
+        for position in positions or []:
+            state = self._state_for(position)
+            if state is not None:
+                held[state.product.id] = position
+        for state in self.states.values():
+            position = held.get(state.product.id, {})
+            state.position = Fixed.from_wei(position.get("quantity") or 0)
+            state.margin = Fixed.from_wei(position.get("margin") or 0)
+
+    async def _poll_loop(self):
+        """Poll the depth of every product when there is no stream."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            results = await asyncio.gather(
+                *(self.refresh_book(state) for state in self.states.values()), return_exceptions=True
+            )
+            for state, result in zip(self.states.values(), results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to poll the depth of {state.product.symbol}: {result!r}")
+                else:
+                    self._mark(state)
+
+    async def _watch_stream(self):
+        """Restart the stream whenever its task dies, polling the depth until it is connected again."""
+        while True:
+            await asyncio.wait({self.stream._task})
+            self._log_stream_exit()
+            poller = asyncio.create_task(self._poll_loop())
+            delay = self.stream.reconnect_delay
+            try:
+                while not self.stream.connected.is_set():
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.stream.max_reconnect_delay)
+                    await self.stream.start()
+                    connected = asyncio.create_task(self.stream.connected.wait())
+                    await asyncio.wait({self.stream._task, connected}, return_when=asyncio.FIRST_COMPLETED)
+                    connected.cancel()
+                    if self.stream._task.done():
+                        self._log_stream_exit()
+            finally:
+                poller.cancel()
+                await asyncio.gather(poller, return_exceptions=True)
+            logger.info("Stream restarted, stopped polling the depth")
+            for state in self.states.values():
+                self._mark(state)
+
+    def _log_stream_exit(self):
+        """Log why the stream task ended."""
+        task = self.stream._task
+        exc = None if task.cancelled() else task.exception()
+        logger.error(f"The stream stopped ({exc!r}), polling the depth until it restarts")
+
+    async def _account_loop(self):
+        """Refresh the account in the background; this also renews quotes that are about to expire."""
+        while True:
+            await asyncio.sleep(self.account_interval)
+            try:
+                await self.refresh_account()
+            except Exception as exc:
+                logger.warning(f"Failed to refresh the account: {exc!r}")
+            for state in self.states.values():
+                self._mark(state)
+
+    async def reconcile(self):
+        """Reconcile the tracker with the exchange, cancel orphaned orders and requote orders that are gone.
+
+        Each product is checked while its quoter is idle, so orders in flight are never taken for orphans.
+        """
+        await self.client.reconcile_orders()
+        for state in self.states.values():
+            async with state.lock:
+                owned = {resting.order_id for resting in state.resting.values()}
+                for slot, resting in list(state.resting.items()):
+                    if resting.order_id not in self.tracker:
+                        del state.resting[slot]
+                        self._mark(state)
+                orphans = [order for order in self.tracker.open_orders(state.product.id) if order.order_id not in owned]
+                results = await asyncio.gather(
+                    *(
+                        self.client.cancel_order(self.client.subaccount_id, state.product.id, order.order_id)
+                        for order in orphans
+                    ),
+                    return_exceptions=True,
+                )
+            for order, result in zip(orphans, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to cancel orphaned order {order!r}: {result!r}")
+
+    async def _reconcile_loop(self):
+        """Reconcile the open orders in the background."""
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            try:
+                await self.reconcile()
+            except Exception as exc:
+                logger.warning(f"Failed to reconcile the open orders: {exc!r}")
+
+    async def _quote_loop(self, state: ProductState):
+        """Requote a product whenever it changes; changes during a requote are folded into the next one."""
+        self._mark(state)
+        while True:
+            await state.changed.wait()
+            state.changed.clear()
+            try:
+                await self.requote(state)
+            except Exception as exc:
+                logger.error(f"Failed to requote {state.product.symbol}: {exc!r}")
+
+    async def requote(self, state: ProductState):
+        """Ask the strategy for quotes and send the differences for every level concurrently."""
+        async with state.lock:
+            wanted = quote_slots(self.strategy.quote(state, self.account) or ())
+            slots = [*wanted, *(slot for slot in state.resting if slot not in wanted)]
+            await asyncio.gather(*(self._update_slot(state, slot, wanted.get(slot)) for slot in slots))
+        if self.client.quote_cache is not None:
+            for (side, level), quote in wanted.items():
+                if level:
+                    continue
+                self.client.quote_cache.set_ladder(
+                    self.client.subaccount_id,
+                    state.product.id,
+                    quote.price,
+                    state.product.tick,
+                    quantities={other.quantity for (other_side, _), other in wanted.items() if other_side == side},
+                    sides=(side,),
+                    order_type=self.order_type,
+                    time_in_force=self.time_in_force,
+                )
+
+    def _fresh(self, resting: RestingOrder) -> bool:
+        """Return whether a resting order has enough lifetime left to keep."""
+        return resting.expiration - self.client._current_timestamp() > ENGINE_RENEW_MARGIN
+
+    async def _update_slot(self, state: ProductState, slot: Slot, quote: Quote | None):
+        """Bring one level of one side of the book in line with the wanted quote."""
+        resting = state.resting.get(slot)
+        if resting is not None and resting.quote == quote and self._fresh(resting):
+            return
+        try:
+            if quote is None:
+                if resting is not None:
+                    await self.client.cancel_order(self.client.subaccount_id, state.product.id, resting.order_id)
+                    state.resting.pop(slot, None)
+                return
+            result = await self._send(state, quote, resting)
+            state.resting[slot] = RestingOrder(
+                result["id"], quote, int(result.get("expiration") or self.client._current_timestamp() + self.duration)
+            )
+        except Exception as exc:
+            # A rejection means the order is not resting; after a timeout or throttling it may still be, so it
+            # is kept and replaced (or found gone) on the next requote.
+            if isinstance(exc, APIError) and not isinstance(exc, RateLimitError):
+                state.resting.pop(slot, None)
+            self.strategy.on_error(state, slot[0], exc)
+
+    async def _send(self, state: ProductState, quote: Quote, resting: RestingOrder | None) -> Dict[str, Any]:
+        """Replace the resting order with the quote, or place it if there is none or it is already gone."""
+        if resting is not None:
+            try:
+                return await self.client.cancel_and_replace_order(
+                    self.client.subaccount_id,
+                    state.product.id,
+                    quote.quantity,
+                    quote.price,
+                    quote.side,
+                    resting.order_id,
+                    duration=self.duration,
+                    order_type=self.order_type,
+                    time_in_force=self.time_in_force,
+                )
+            except APIError as exc:
+                if ORDER_NOT_FOUND not in str(exc):
+                    raise
+                self.tracker.remove(resting.order_id)
+        return await self.client.create_order(
+            self.client.subaccount_id,
+            state.product.id,
+            quote.quantity,
+            quote.price,
+            quote.side,
+            self.order_type,
+            self.time_in_force,
+            duration=self.duration,
+        )
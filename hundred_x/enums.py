@@ -55,3 +55,24 @@ class OrderSide(Enum):
 
     BUY = True
     SELL = False
+
+
+class RequestPriority(Enum):
+    """
+    Enum for the priority of a request under the client-side rate limit.
+    """
+
+    NORMAL = 0
+    HIGH = 1
+
+
+class StreamType(Enum):
+    """
+    Enum for the websocket stream type.
+    """
+
+    DEPTH = "depth"
+    TRADE = "trade"
+    TICKER = "ticker"
+    ORDERS = "orders"
+    FILLS = "fills"
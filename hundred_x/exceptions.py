@@ -7,3 +7,23 @@ class UserInputValidationError(Exception):
 
 class ClientError(Exception):
     """Exception raised when there is an error with the client."""
+
+
+class APIError(ConnectionError):
+    """Exception raised when the API rejects a request."""
+
+    def __init__(self, message: str, status: int | None = None, body: bytes = b"", endpoint: str | None = None):
+        """Keep the status, raw body and endpoint of the rejected request."""
+        super().__init__(message)
+        self.status = status
+        self.body = body
+        self.endpoint = endpoint
+
+
+class RateLimitError(APIError):
+    """Exception raised when a request is throttled, by the API or by the client's own rate limiter."""
+
+    def __init__(self, message: str, retry_after: float | None = None, **kwargs):
+        """Keep how many seconds to wait before retrying, if known."""
+        super().__init__(message, **kwargs)
+        self.retry_after = retry_after
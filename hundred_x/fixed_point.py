@@ -0,0 +1,164 @@
+"""Fixed-point prices and quantities held as integer wei."""
+
+from decimal import (
+    ROUND_CEILING,
+    ROUND_DOWN,
+    ROUND_FLOOR,
+    ROUND_HALF_DOWN,
+    ROUND_HALF_EVEN,
+    ROUND_HALF_UP,
+    ROUND_UP,
+    Context,
+    Decimal,
+)
+from typing import Any
+
+DECIMALS = 18
+SCALE = 10**DECIMALS
+# Exact scaling of parsed amounts, whatever the caller's decimal context.
+_CONTEXT = Context(prec=100)
+_DECIMAL_SCALE = Decimal(SCALE)
+
+
+class Fixed(int):
+    """A price or quantity stored as an integer count of wei (1e-18 units).
+
+    ``Fixed`` is an ``int``, so it hashes, compares and serializes exactly like the wei integers the API
+    sends and the order book keeps, and the client converts it without going through ``Decimal``. It
+    prints in human units and rounds to ticks and lots with ``quantize``:
+
+        price = Fixed.parse("3000.15").quantize(product.tick, ROUND_HALF_DOWN)  # Fixed('3000.1')
+        size = Fixed.from_wei(order["quantity"])
+
+    Adding, subtracting and negating give a ``Fixed``; plain ``int`` operands count as wei, like every
+    amount in the API. Scaling by an ``int`` gives a ``Fixed``, multiplying two ``Fixed`` values rescales
+    the product, and ``//`` by a ``Fixed`` gives a plain ``int`` ratio. ``parse`` is the one place where
+    an ``int`` means whole units, matching the amounts ``create_order`` accepts.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_wei(cls, wei: str | int) -> "Fixed":
+        """Wrap a wei amount, such as a price or quantity string from the API."""
+        return cls(wei)
+
+    @classmethod
+    def parse(cls, value: Any) -> "Fixed":
+        """Convert a human readable amount (``str``, ``int``, ``float``, ``Decimal`` or ``Fixed``) to wei.
+
+        Floats go through ``str`` so ``0.1`` means one tenth; digits past the 18th decimal are truncated.
+        """
+        if isinstance(value, Fixed):
+            return value
+        if isinstance(value, int):
+            return cls(value * SCALE)
+        if not isinstance(value, Decimal):
+            value = Decimal(str(value))
+        return cls(int(_CONTEXT.multiply(value, _DECIMAL_SCALE)))
+
+    @property
+    def wei(self) -> str:
+        """Return the amount as the API's wei string."""
+        return int.__repr__(self)
+
+    def to_decimal(self) -> Decimal:
+        """Return the amount in human units as an exact ``Decimal``."""
+        return Decimal(str(self))
+
+    def __str__(self) -> str:
+        """Return the amount in human units, e.g. ``3000.1``."""
+        whole, fraction = divmod(abs(int(self)), SCALE)
+        text = f"{whole}.{fraction:0{DECIMALS}d}".rstrip("0").rstrip(".") if fraction else str(whole)
+        return f"-{text}" if self < 0 else text
+
+    def __repr__(self) -> str:
+        """Return the constructor form in human units."""
+        return f"Fixed('{self}')"
+
+    def __format__(self, spec: str) -> str:
+        """Format in human units; format specs such as ``.2f`` are applied to the exact decimal value."""
+        return format(self.to_decimal(), spec) if spec else str(self)
+
+    def __float__(self) -> float:
+        """Return the amount in human units as a float."""
+        return int(self) / SCALE
+
+    def quantize(self, step: int, rounding: str = ROUND_HALF_EVEN) -> "Fixed":
+        """Round to a multiple of ``step`` wei, such as a product's tick or lot, using a ``decimal`` rounding mode."""
+        quotient, remainder = divmod(int(self), step)
+        if remainder:
+            positive = self >= 0
+            twice = 2 * remainder
+            if rounding == ROUND_FLOOR:
+                up = False
+            elif rounding == ROUND_CEILING:
+                up = True
+            elif rounding == ROUND_DOWN:
+                up = not positive
+            elif rounding == ROUND_UP:
+                up = positive
+            elif twice != step:
+                up = twice > step
+            elif rounding == ROUND_HALF_UP:
+                up = positive
+            elif rounding == ROUND_HALF_DOWN:
+                up = not positive
+            elif rounding == ROUND_HALF_EVEN:
+                up = quotient % 2 == 1
+            else:
+                raise ValueError(f"Unsupported rounding mode: {rounding}")
+            quotient += up
+        return Fixed(quotient * step)
+
+    def __add__(self, other):
+        """Add wei amounts."""
+        result = int.__add__(self, other)
+        return result if result is NotImplemented else Fixed(result)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        """Subtract wei amounts."""
+        result = int.__sub__(self, other)
+        return result if result is NotImplemented else Fixed(result)
+
+    def __rsub__(self, other):
+        """Subtract from a wei amount."""
+        result = int.__rsub__(self, other)
+        return result if result is NotImplemented else Fixed(result)
+
+    def __neg__(self):
+        """Negate the amount."""
+        return Fixed(-int(self))
+
+    def __abs__(self):
+        """Return the absolute amount."""
+        return Fixed(abs(int(self)))
+
+    def __mul__(self, other):
+        """Scale by a count, or multiply two fixed-point amounts."""
+        if isinstance(other, Fixed):
+            return Fixed(int(self) * int(other) // SCALE)
+        result = int.__mul__(self, other)
+        return result if result is NotImplemented else Fixed(result)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        """Divide by a count, or divide two fixed-point amounts, rounding down to a whole wei.
+
+        Other divisors raise ``TypeError`` rather than return a float in wei; convert with ``float`` first.
+        """
+        if isinstance(other, Fixed):
+            return Fixed(int(self) * SCALE // int(other))
+        if isinstance(other, int) and not isinstance(other, bool):
+            return Fixed(int(self) // other)
+        raise TypeError(f"Fixed can only be divided by an int or a Fixed, not {type(other).__name__}")
+
+    def __floordiv__(self, other):
+        """Divide by a count, or return how many times a fixed-point amount fits."""
+        result = int.__floordiv__(self, other)
+        if result is NotImplemented or isinstance(other, Fixed):
+            return result
+        return Fixed(result)
@@ -0,0 +1,85 @@
+"""JSON encoding and decoding of REST and stream traffic.
+
+``orjson`` is used when it is installed (``pip install hundred-keks[json]``): it decodes straight from the
+response bytes and encodes to bytes, faster than the standard library on depth and trade history payloads.
+Without it the standard ``json`` module does the same job. ``use_backend`` switches between the two, e.g. to
+compare them.
+
+The API sends wei amounts as strings, but orjson would decode a bare integer wider than 64 bits as a float,
+losing precision. Bodies with a bare run of 19 or more digits are therefore decoded with the standard library,
+which keeps such integers exact, as are bodies orjson refuses. The scan for such runs costs about as much
+as orjson's decoding itself on large bodies, which narrows its lead there.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKENDS = ("orjson", "json") if orjson is not None else ("json",)
+BACKEND = BACKENDS[0]
+
+# Maps digits to "0", letters, quotes, dots and backslashes (what digits inside strings are next to) to '"' and
+# everything else to "\x01", so a number outside a string that may not fit in 64 bits shows up as _WIDE_INTEGER.
+_NUMBER_CLASSES = bytes(
+    ord("0") if chr(byte).isdigit() else ord('"') if chr(byte).isalpha() or chr(byte) in '".\\' else 1
+    for byte in range(128)
+) + bytes([ord('"')]) * 128
+_WIDE_INTEGER = b"\x01" + b"0" * 19
+
+
+def _json_loads(data: bytes | str) -> Any:
+    """Decode with the standard library, which accepts bytes directly."""
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Encode compactly with the standard library."""
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _may_have_wide_integers(data: bytes | str) -> bool:
+    """Return whether a body may hold a bare integer of 19 or more digits, which orjson could turn into a float."""
+    if isinstance(data, str):
+        data = data.encode()
+    return _WIDE_INTEGER in b"\x01" + data.translate(_NUMBER_CLASSES)
+
+
+def _orjson_loads(data: bytes | str) -> Any:
+    """Decode with orjson, or with the standard library when that is needed to keep every integer exact."""
+    if _may_have_wide_integers(data):
+        return _json_loads(data)
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return _json_loads(data)
+
+
+def _orjson_dumps(obj: Any) -> bytes:
+    """Encode with orjson, falling back to the standard library for integers wider than 64 bits."""
+    try:
+        return orjson.dumps(obj)
+    except orjson.JSONEncodeError:
+        return _json_dumps(obj)
+
+
+loads = _json_loads
+dumps = _json_dumps
+
+
+def use_backend(name: str):
+    """Select ``"orjson"`` or ``"json"`` for every later ``loads`` and ``dumps``."""
+    global BACKEND, loads, dumps  # noqa: PLW0603
+    if name not in BACKENDS:
+        raise ValueError(f"Unavailable JSON backend: {name}; choose from {BACKENDS}")
+    BACKEND = name
+    if name == "orjson":
+        loads, dumps = _orjson_loads, _orjson_dumps
+    else:
+        loads, dumps = _json_loads, _json_dumps
+
+
+use_backend(BACKEND)
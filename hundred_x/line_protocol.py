@@ -0,0 +1,202 @@
+"""InfluxDB line protocol encoding and a batching writer that sends lines from a background thread.
+
+The depth collector encodes each sample straight to a line of line protocol and hands it to a
+``BatchWriter``, which buffers the lines and writes them in batches by count or by age, so the collection
+loop never waits on the database:
+
+    write_api = influx.write_api(write_options=SYNCHRONOUS)
+    with BatchWriter(lambda lines: write_api.write(bucket, org, lines)) as writer:
+        writer.add(depth_line("orderbook", {"symbol": "ethperp"}, depth, 5, time.time_ns()))
+
+``write`` is any callable taking a list of lines; a batch that fails is retried and then dropped, so a
+database outage loses samples instead of stopping collection. When ``max_pending`` lines are waiting, ``add``
+blocks until the writer catches up.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Tuple
+
+from hundred_x.constants import LINE_BATCH_SIZE, LINE_FLUSH_INTERVAL, LINE_MAX_PENDING, LINE_WRITE_ATTEMPTS
+
+logger = logging.getLogger(__name__)
+
+_MEASUREMENT_ESCAPES = str.maketrans({",": r"\,", " ": r"\ "})
+_KEY_ESCAPES = str.maketrans({",": r"\,", " ": r"\ ", "=": r"\="})
+
+
+def _field_value(value: Any) -> str | None:
+    """Format a field value: floats as floats, integers with the ``i`` suffix and strings quoted.
+
+    Returns None for NaN and infinite floats, which line protocol cannot represent.
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        return repr(value) if math.isfinite(value) else None
+    if isinstance(value, int):
+        return f"{value}i"
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def encode_line(
+    measurement: str, tags: Dict[str, str], fields: Iterable[Tuple[str, Any]], timestamp: int | None = None
+) -> str:
+    """Return one line of line protocol; ``timestamp`` is in nanoseconds, or None for the server's time.
+
+    Non-finite float fields are left out, and a line left without fields raises ValueError, so a bad sample
+    fails on its own instead of getting a whole batch rejected by the database.
+    """
+    encoded = []
+    for key, value in fields:
+        formatted = _field_value(value)
+        if formatted is not None:
+            encoded.append(f"{key.translate(_KEY_ESCAPES)}={formatted}")
+    if not encoded:
+        raise ValueError(f"No fields to write for {measurement} {tags}.")
+    line = [measurement.translate(_MEASUREMENT_ESCAPES)]
+    for key in sorted(tags):
+        line.append(f",{key.translate(_KEY_ESCAPES)}={str(tags[key]).translate(_KEY_ESCAPES)}")
+    line.append(" ")
+    line.append(",".join(encoded))
+    if timestamp is not None:
+        line.append(f" {timestamp}")
+    return "".join(line)
+
+
+def depth_line(measurement: str, tags: Dict[str, str], depth: Dict[str, Any], levels: int, timestamp: int) -> str:
+    """Encode the best ``levels`` of ``get_depth_arrays`` output as ``bid1_price``, ``bid1_amount``, ... fields."""
+    fields: List[Tuple[str, float]] = []
+    for side, prefix in (("bids", "bid"), ("asks", "ask")):
+        rows = depth[side][:levels]
+        for i, (price, amount) in enumerate(zip(rows["price"].tolist(), rows["size"].tolist()), start=1):
+            fields.append((f"{prefix}{i}_price", float(price)))
+            fields.append((f"{prefix}{i}_amount", float(amount)))
+    return encode_line(measurement, tags, fields, timestamp)
+
+
+class BatchWriter:
+    """Buffers lines and writes them with ``write(lines)`` from a background thread.
+
+    A batch goes out when ``batch_size`` lines are waiting or the oldest has waited ``flush_interval``
+    seconds. A failing write is retried ``attempts`` times with a growing pause, then the batch is dropped
+    and counted in ``dropped``.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[List[str]], Any],
+        batch_size: int = LINE_BATCH_SIZE,
+        flush_interval: float = LINE_FLUSH_INTERVAL,
+        max_pending: int = LINE_MAX_PENDING,
+        attempts: int = LINE_WRITE_ATTEMPTS,
+    ):
+        """Start the writer thread."""
+        self.write = write
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.attempts = attempts
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self._lines: Deque[Tuple[float, str]] = deque()
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="line-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "BatchWriter":
+        """Return the running writer."""
+        return self
+
+    def __exit__(self, *args):
+        """Write what is left and stop."""
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the number of lines waiting, including the batch being written."""
+        with self._condition:
+            return len(self._lines) + self._in_flight
+
+    def add(self, line: str, timeout: float | None = None) -> bool:
+        """Queue a line, waiting up to ``timeout`` seconds while the buffer is full; False if it was not queued."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("BatchWriter is closed")
+            if len(self._lines) >= self.max_pending and not self._condition.wait_for(
+                lambda: len(self._lines) < self.max_pending or self._closed, timeout
+            ):
+                return False
+            self._lines.append((time.monotonic(), line))
+            if len(self._lines) >= self.batch_size or len(self._lines) == 1:
+                self._condition.notify_all()
+            return True
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Write everything queued so far now; False if it was not all written within ``timeout`` seconds."""
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: not self._lines and not self._in_flight, timeout)
+
+    def close(self, timeout: float | None = None):
+        """Write what is left and stop the thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _next_batch(self) -> List[str] | None:
+        """Wait until a batch is due and take it off the buffer; None once closed and empty."""
+        with self._condition:
+            while True:
+                if self._lines:
+                    due = self._lines[0][0] + self.flush_interval
+                    if self._closed or self._flush_requested or len(self._lines) >= self.batch_size:
+                        break
+                    if time.monotonic() >= due:
+                        break
+                    self._condition.wait(due - time.monotonic())
+                elif self._closed:
+                    return None
+                else:
+                    self._flush_requested = False
+                    self._condition.wait()
+            count = min(self.batch_size, len(self._lines))
+            batch = [self._lines.popleft()[1] for _ in range(count)]
+            self._in_flight = count
+            if not self._lines:
+                self._flush_requested = False
+            self._condition.notify_all()
+            return batch
+
+    def _send(self, batch: List[str]) -> bool:
+        """Write a batch, retrying failures; return whether it was written."""
+        for attempt in range(1, self.attempts + 1):
+            try:
+                self.write(batch)
+                return True
+            except Exception as exc:
+                logger.warning(f"Writing {len(batch)} lines failed (attempt {attempt}/{self.attempts}): {exc!r}")
+                if attempt < self.attempts and not self._closed:
+                    time.sleep(min(0.1 * 2**attempt, self.flush_interval))
+        return False
+
+    def _run(self):
+        """Write batches until closed."""
+        while (batch := self._next_batch()) is not None:
+            sent = self._send(batch)
+            with self._condition:
+                if sent:
+                    self.written += len(batch)
+                    self.batches += 1
+                else:
+                    self.dropped += len(batch)
+                self._in_flight = 0
+                self._condition.notify_all()
@@ -0,0 +1,209 @@
+"""Request hooks and per-endpoint latency metrics for the REST clients.
+
+Every request a client sends goes through ``_request``, which calls each of the client's request hooks
+with a ``RequestEvent`` once the response (or the error) is in. With no hooks that costs a list check.
+``client.enable_metrics()`` installs a ``Metrics`` hook that keeps a latency histogram, status codes,
+retries and payload sizes per endpoint:
+
+    metrics = client.enable_metrics()
+    ...
+    metrics.snapshot()["POST /v1/order"]["p99_ms"]
+    metrics.serve()  # JSON snapshot on http://127.0.0.1:9464/
+"""
+
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Tuple
+
+from hundred_x import json_backend
+from hundred_x.constants import METRICS_HOST, METRICS_PORT
+
+# Latencies are bucketed in microseconds with 2**SUB_BUCKET_BITS buckets per power of two, so a reported
+# percentile is within 1 / 2**SUB_BUCKET_BITS (about 6%) of the true value.
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99, "p999": 0.999}
+
+
+class RequestEvent:
+    """One request as seen by the request hooks; ``status`` is None if no response came back."""
+
+    __slots__ = ("method", "endpoint", "status", "elapsed", "sent", "received", "retries", "error")
+
+    def __init__(
+        self,
+        method: str,
+        endpoint: str,
+        status: int | None,
+        elapsed: float,
+        sent: int = 0,
+        received: int = 0,
+        retries: int = 0,
+        error: BaseException | None = None,
+    ):
+        """Record a finished request; ``elapsed`` is in seconds and covers every retry."""
+        self.method = method
+        self.endpoint = endpoint
+        self.status = status
+        self.elapsed = elapsed
+        self.sent = sent
+        self.received = received
+        self.retries = retries
+        self.error = error
+
+    def __repr__(self) -> str:
+        """Return a short description of the request."""
+        return f"RequestEvent({self.method} {self.endpoint} {self.status} in {self.elapsed * 1000:.1f}ms)"
+
+
+RequestHook = Callable[[RequestEvent], Any]
+
+
+def bucket_index(micros: int) -> int:
+    """Return the histogram bucket of a latency in microseconds."""
+    if micros < SUB_BUCKETS:
+        return max(micros, 0)
+    shift = micros.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (micros >> shift) - SUB_BUCKETS
+
+
+def bucket_floor(index: int) -> int:
+    """Return the smallest latency in microseconds that falls in a bucket."""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    return (index % SUB_BUCKETS + SUB_BUCKETS) << shift
+
+
+class LatencyHistogram:
+    """A log-bucketed latency histogram with constant memory per power of two."""
+
+    def __init__(self):
+        """Start empty."""
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        """Add a latency in seconds."""
+        index = bucket_index(int(seconds * 1e6))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """Return the latency in seconds below which ``fraction`` of the requests fall, 0 if empty."""
+        if not self.count:
+            return 0.0
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(bucket_floor(index + 1) / 1e6, self.max)
+        return self.max
+
+
+class EndpointMetrics:
+    """What the metrics keep for one method and endpoint."""
+
+    def __init__(self):
+        """Start with no requests."""
+        self.latency = LatencyHistogram()
+        self.statuses: Counter = Counter()
+        self.errors = 0
+        self.retries = 0
+        self.sent = 0
+        self.received = 0
+        self.max_received = 0
+
+    def record(self, event: RequestEvent):
+        """Add a request."""
+        self.latency.record(event.elapsed)
+        if event.status is None:
+            self.errors += 1
+        else:
+            self.statuses[event.status] += 1
+        self.retries += event.retries
+        self.sent += event.sent
+        self.received += event.received
+        self.max_received = max(self.max_received, event.received)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the counters and latency percentiles, in milliseconds, as plain values."""
+        latency = self.latency
+        summary = {"count": latency.count, "errors": self.errors, "retries": self.retries}
+        summary["mean_ms"] = latency.total / latency.count * 1000 if latency.count else 0.0
+        summary.update({f"{name}_ms": latency.percentile(q) * 1000 for name, q in PERCENTILES.items()})
+        summary["max_ms"] = latency.max * 1000
+        summary["statuses"] = {str(status): count for status, count in sorted(self.statuses.items())}
+        summary["bytes_sent"] = self.sent
+        summary["bytes_received"] = self.received
+        summary["max_bytes_received"] = self.max_received
+        return summary
+
+
+class Metrics:
+    """Per-endpoint request metrics; a request hook, so pass ``record`` to ``client.add_request_hook``.
+
+    One ``Metrics`` can be shared by several clients. ``snapshot`` returns plain dictionaries keyed by
+    ``"METHOD /endpoint"`` and ``serve`` publishes them as JSON on a local port.
+    """
+
+    def __init__(self):
+        """Start with no requests."""
+        self.endpoints: Dict[Tuple[str, str], EndpointMetrics] = {}
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    def record(self, event: RequestEvent):
+        """Add a finished request."""
+        key = (event.method, event.endpoint)
+        with self._lock:
+            endpoint = self.endpoints.get(key)
+            if endpoint is None:
+                endpoint = self.endpoints[key] = EndpointMetrics()
+            endpoint.record(event)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return the metrics of every endpoint seen so far."""
+        with self._lock:
+            return {f"{method} {endpoint}": stats.snapshot() for (method, endpoint), stats in self.endpoints.items()}
+
+    def reset(self):
+        """Forget every request recorded so far."""
+        with self._lock:
+            self.endpoints.clear()
+
+    def serve(self, host: str = METRICS_HOST, port: int = METRICS_PORT) -> ThreadingHTTPServer:
+        """Serve ``snapshot`` as JSON over HTTP from a background thread; port 0 picks a free port."""
+        if self._server is not None:
+            return self._server
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                """Return the snapshot."""
+                body = json_backend.dumps(metrics.snapshot())
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                """Keep scrapes out of the logs."""
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="hundred_x-metrics").start()
+        return self._server
+
+    def close(self):
+        """Stop the metrics endpoint, if it is running."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,181 @@
+"""Local order book kept up to date from REST snapshots and stream updates."""
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Tuple
+
+from hundred_x.fixed_point import Fixed
+
+Level = Tuple[Fixed, Fixed]
+
+
+class BookSide:
+    """One side of the book, with prices and sizes as integer wei in parallel sorted lists.
+
+    Prices, sizes and volumes are returned as ``Fixed``, which compare equal to the wei integers.
+
+    Levels are ordered best first. Bids are keyed by their negated price so both sides sort ascending
+    and the best level is always at index 0. Running totals used by the size and volume queries are
+    rebuilt lazily, once per batch of updates, and then answered with a binary search.
+    """
+
+    def __init__(self, is_bid: bool):
+        """Initialize an empty side."""
+        self.is_bid = is_bid
+        self._keys: List[int] = []
+        self.sizes: List[int] = []
+        self._cumulative: List[int] | None = None
+        self._running_max: List[int] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of levels."""
+        return len(self._keys)
+
+    def _key(self, price: int) -> int:
+        return -price if self.is_bid else price
+
+    def _invalidate(self):
+        self._cumulative = self._running_max = None
+
+    @property
+    def prices(self) -> List[Fixed]:
+        """Return the level prices, best first."""
+        return [Fixed(-key) for key in self._keys] if self.is_bid else [Fixed(key) for key in self._keys]
+
+    def replace(self, levels: Iterable[Level]):
+        """Replace every level with ``(price, size)`` pairs, skipping empty levels."""
+        keyed = sorted((self._key(price), size) for price, size in levels if size)
+        self._keys = [key for key, _ in keyed]
+        self.sizes = [size for _, size in keyed]
+        self._invalidate()
+
+    def update(self, price: int, size: int):
+        """Set the size at a price level; a size of zero removes the level."""
+        key = self._key(price)
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            if size:
+                self.sizes[index] = size
+            else:
+                del self._keys[index]
+                del self.sizes[index]
+        elif size:
+            self._keys.insert(index, key)
+            self.sizes.insert(index, size)
+        else:
+            return
+        self._invalidate()
+
+    def level(self, index: int) -> Level | None:
+        """Return the ``(price, size)`` at a depth index, 0 being the best level."""
+        if index >= len(self._keys):
+            return None
+        key = self._keys[index]
+        return Fixed(-key if self.is_bid else key), Fixed(self.sizes[index])
+
+    @property
+    def best(self) -> Level | None:
+        """Return the best level."""
+        return self.level(0)
+
+    def size_at(self, price: int) -> Fixed:
+        """Return the size resting at a price."""
+        key = self._key(price)
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            return Fixed(self.sizes[index])
+        return Fixed(0)
+
+    def first_level_above(self, min_size: int) -> Level | None:
+        """Return the best level whose size is strictly greater than ``min_size``."""
+        if self._running_max is None:
+            self._running_max = list(accumulate(self.sizes, max))
+        return self.level(bisect_right(self._running_max, min_size))
+
+    def cumulative_volume(self, levels: int | None = None) -> Fixed:
+        """Return the total size in the best ``levels`` levels, or in the whole side."""
+        if self._cumulative is None:
+            self._cumulative = list(accumulate(self.sizes))
+        if not self._cumulative or levels == 0:
+            return Fixed(0)
+        return Fixed(self._cumulative[-1 if levels is None else min(levels, len(self._cumulative)) - 1])
+
+    def volume_through(self, price: int) -> Fixed:
+        """Return the total size at prices as good as or better than ``price``."""
+        return self.cumulative_volume(bisect_right(self._keys, self._key(price)))
+
+    def price_for_volume(self, volume: int) -> Fixed | None:
+        """Return the worst price reached when taking ``volume`` from this side, or None if it is too thin."""
+        self.cumulative_volume()
+        level = self.level(bisect_left(self._cumulative, volume))
+        return None if level is None else level[0]
+
+
+class OrderBook:
+    """Local order book for one product.
+
+    Feed it REST snapshots with ``apply_snapshot(client.get_depth(symbol))`` and stream updates by
+    subscribing ``on_stream_message`` to the depth stream. Best bid/ask and mid are O(1); size, volume
+    and price-for-volume queries are O(log n) between updates.
+    """
+
+    def __init__(self, symbol: str | None = None):
+        """Initialize an empty book."""
+        self.symbol = symbol
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+
+    @classmethod
+    def from_depth(cls, depth: Dict[str, List[List[Any]]], symbol: str | None = None) -> "OrderBook":
+        """Build a book from a ``get_depth`` response."""
+        book = cls(symbol)
+        book.apply_snapshot(depth)
+        return book
+
+    @staticmethod
+    def _levels(levels: Iterable[List[Any]]) -> Iterable[Level]:
+        """Parse ``[price, size, ...]`` wei strings into integer pairs."""
+        return ((int(level[0]), int(level[1])) for level in levels)
+
+    def apply_snapshot(self, depth: Dict[str, List[List[Any]]]):
+        """Replace the book with a full depth snapshot."""
+        self.bids.replace(self._levels(depth.get("bids", ())))
+        self.asks.replace(self._levels(depth.get("asks", ())))
+
+    def apply_delta(self, depth: Dict[str, List[List[Any]]]):
+        """Apply changed levels in place; levels with a zero size are removed."""
+        for price, size in self._levels(depth.get("bids", ())):
+            self.bids.update(price, size)
+        for price, size in self._levels(depth.get("asks", ())):
+            self.asks.update(price, size)
+
+    def on_stream_message(self, name: str, data: Dict[str, Any]):
+        """Apply a depth stream message; use as the callback of a depth subscription."""
+        if data.get("type") == "delta":
+            self.apply_delta(data)
+        else:
+            self.apply_snapshot(data)
+
+    @property
+    def best_bid(self) -> Level | None:
+        """Return the best bid."""
+        return self.bids.best
+
+    @property
+    def best_ask(self) -> Level | None:
+        """Return the best ask."""
+        return self.asks.best
+
+    @property
+    def mid(self) -> Fixed | None:
+        """Return the mid price, rounded down to the wei."""
+        if not self.bids or not self.asks:
+            return None
+        return (self.bids.best[0] + self.asks.best[0]) // 2
+
+    @property
+    def spread(self) -> Fixed | None:
+        """Return the distance between the best ask and the best bid."""
+        if not self.bids or not self.asks:
+            return None
+        return self.asks.best[0] - self.bids.best[0]
@@ -0,0 +1,221 @@
+"""Local open-order state, kept current from order responses and the orders stream."""
+
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+from hundred_x.constants import CLOSED_ORDER_STATUSES
+from hundred_x.enums import OrderSide
+from hundred_x.fixed_point import Fixed
+
+# (product id, side, price wei)
+LevelKey = Tuple[int, OrderSide, Fixed]
+
+
+class TrackedOrder:
+    """An open order as the tracker knows it; amounts are ``Fixed``."""
+
+    __slots__ = ("order_id", "product_id", "side", "price", "quantity", "residual", "expiration", "status", "seen")
+
+    def __init__(
+        self,
+        order_id: str,
+        product_id: int,
+        side: OrderSide,
+        price: Fixed,
+        quantity: Fixed,
+        residual: Fixed | None = None,
+        expiration: int = 0,
+        status: str = "OPEN",
+    ):
+        """Record an order; ``expiration`` is in milliseconds since the epoch, 0 if unknown."""
+        self.order_id = order_id
+        self.product_id = product_id
+        self.side = side
+        self.price = price
+        self.quantity = quantity
+        self.residual = quantity if residual is None else residual
+        self.expiration = expiration
+        self.status = status
+        self.seen = time.monotonic()
+
+    @classmethod
+    def from_api(cls, order: Dict[str, Any]) -> "TrackedOrder":
+        """Build an order from an API or stream order, whose amounts are wei strings."""
+        residual = order.get("residualQuantity")
+        return cls(
+            order["id"],
+            int(order["productId"]),
+            OrderSide(bool(order["isBuy"])),
+            Fixed.from_wei(order["price"]),
+            Fixed.from_wei(order["quantity"]),
+            None if residual is None else Fixed.from_wei(residual),
+            int(order.get("expiration") or 0),
+            order.get("status") or "OPEN",
+        )
+
+    @property
+    def key(self) -> LevelKey:
+        """Return the ``(product id, side, price)`` level the order rests at."""
+        return self.product_id, self.side, self.price
+
+    def __repr__(self) -> str:
+        """Return a short description of the order."""
+        return f"TrackedOrder({self.order_id!r}, {self.side.name} {self.residual} @ {self.price})"
+
+
+class OrderTracker:
+    """The account's open orders, indexed by id and by ``(product id, side, price)``.
+
+    Enable it with ``client.enable_order_tracker()``: the client then records every order it places,
+    replaces or cancels, so deciding whether a price is already quoted is a dictionary lookup rather than
+    a ``get_open_orders`` call and a scan. Feed it the orders stream with ``on_orders`` to drop filled,
+    cancelled and expired orders as they happen, and call ``client.reconcile_orders()`` now and then to
+    pick up anything the responses and the stream missed:
+
+        client.enable_order_tracker()
+        client.create_order(0, "ethperp", "0.01", "3000.1", OrderSide.BUY, OrderType.LIMIT_MAKER, TimeInForce.GTC)
+        client.order_tracker.has(1002, OrderSide.BUY, "3000.1")  # True
+    """
+
+    def __init__(self, closed_statuses: Iterable[str] = CLOSED_ORDER_STATUSES):
+        """Start empty; orders reported with one of ``closed_statuses`` are dropped."""
+        self.closed_statuses = frozenset(closed_statuses)
+        self.orders: Dict[str, TrackedOrder] = {}
+        self._levels: Dict[LevelKey, Dict[str, TrackedOrder]] = {}
+        self._forgotten: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of open orders."""
+        return len(self.orders)
+
+    def __contains__(self, order_id: str) -> bool:
+        """Return whether an order is open."""
+        return order_id in self.orders
+
+    def _insert(self, order: TrackedOrder):
+        """Index an order, replacing any earlier version of it."""
+        self._discard(order.order_id)
+        self.orders[order.order_id] = order
+        self._levels.setdefault(order.key, {})[order.order_id] = order
+
+    def _discard(self, order_id: str) -> TrackedOrder | None:
+        """Unindex an order and return it."""
+        order = self.orders.pop(order_id, None)
+        if order is not None:
+            level = self._levels[order.key]
+            del level[order_id]
+            if not level:
+                del self._levels[order.key]
+        return order
+
+    def _forget(self, order_id: str) -> TrackedOrder | None:
+        """Unindex an order and remember that it closed, so a stale snapshot does not bring it back."""
+        self._forgotten[order_id] = time.monotonic()
+        return self._discard(order_id)
+
+    def add(self, order: Dict[str, Any], replaced: str | None = None) -> TrackedOrder:
+        """Record an accepted order, dropping the order it replaced if any.
+
+        An order that closed on arrival, such as a filled ``IOC`` order, is not recorded as open.
+        """
+        tracked = TrackedOrder.from_api(order)
+        with self._lock:
+            if replaced is not None:
+                self._forget(replaced)
+            if tracked.status in self.closed_statuses:
+                self._forget(tracked.order_id)
+            else:
+                self._insert(tracked)
+        return tracked
+
+    def remove(self, order_id: str) -> TrackedOrder | None:
+        """Drop a cancelled or closed order and return it, or None if it was not tracked."""
+        with self._lock:
+            return self._forget(order_id)
+
+    def clear(self, product_id: int | None = None) -> List[TrackedOrder]:
+        """Drop every order, or those of one product after a cancel-all, and return them."""
+        with self._lock:
+            return [
+                self._forget(order.order_id)
+                for order in list(self.orders.values())
+                if product_id is None or order.product_id == product_id
+            ]
+
+    def update(self, order: Dict[str, Any]) -> TrackedOrder | None:
+        """Apply an order update, such as a partial fill or a close, and return the order if it is still open."""
+        order_id = order.get("id")
+        with self._lock:
+            if order.get("status") in self.closed_statuses:
+                self._forget(order_id)
+                return None
+            tracked = self.orders.get(order_id)
+            if tracked is None:
+                if order_id in self._forgotten or "price" not in order or "isBuy" not in order:
+                    return None
+                tracked = TrackedOrder.from_api(order)
+                self._insert(tracked)
+                return tracked
+            if order.get("residualQuantity") is not None:
+                tracked.residual = Fixed.from_wei(order["residualQuantity"])
+            tracked.status = order.get("status") or tracked.status
+            tracked.seen = time.monotonic()
+            return tracked
+
+    def on_orders(self, name: str, data: Any):
+        """Apply order updates from the orders stream; subscribe it with ``StreamType.ORDERS``."""
+        for order in data if isinstance(data, list) else [data]:
+            if isinstance(order, dict) and order.get("id") is not None:
+                self.update(order)
+
+    def reconcile(
+        self, open_orders: Iterable[Dict[str, Any]], since: float, product_id: int | None = None
+    ) -> Tuple[List[TrackedOrder], List[TrackedOrder]]:
+        """Match the tracker to a ``get_open_orders`` snapshot requested at ``since`` (``time.monotonic``).
+
+        Orders recorded or closed after ``since`` are newer than the snapshot and left alone. Returns the
+        orders that were missing locally and the ones that are no longer open on the exchange. Pass the
+        ``product_id`` the snapshot was limited to, if any.
+        """
+        snapshot = {order["id"]: order for order in open_orders}
+        added, removed = [], []
+        with self._lock:
+            for order_id, order in snapshot.items():
+                if order_id not in self.orders and self._forgotten.get(order_id, 0.0) < since:
+                    tracked = TrackedOrder.from_api(order)
+                    self._insert(tracked)
+                    added.append(tracked)
+            for tracked in list(self.orders.values()):
+                if tracked.order_id in snapshot or tracked.seen >= since:
+                    continue
+                if product_id is None or tracked.product_id == product_id:
+                    removed.append(self._forget(tracked.order_id))
+            self._forgotten = {order_id: at for order_id, at in self._forgotten.items() if at >= since}
+        return added, removed
+
+    def get(self, order_id: str) -> TrackedOrder | None:
+        """Return an open order by id."""
+        return self.orders.get(order_id)
+
+    def at(self, product_id: int, side: OrderSide, price: Any) -> List[TrackedOrder]:
+        """Return the open orders at a price; ``price`` may be human readable or ``Fixed``."""
+        return list(self._levels.get((product_id, side, Fixed.parse(price)), {}).values())
+
+    def has(self, product_id: int, side: OrderSide, price: Any) -> bool:
+        """Return whether there is an open order at a price."""
+        return (product_id, side, Fixed.parse(price)) in self._levels
+
+    def open_orders(self, product_id: int | None = None, side: OrderSide | None = None) -> List[TrackedOrder]:
+        """Return the open orders, optionally of one product and side."""
+        return [
+            order
+            for order in list(self.orders.values())
+            if (product_id is None or order.product_id == product_id) and (side is None or order.side is side)
+        ]
+
+    def prices(self, product_id: int, side: OrderSide) -> List[Fixed]:
+        """Return the prices with open orders on one side of a product, best first."""
+        prices = [key[2] for key in list(self._levels) if key[0] == product_id and key[1] is side]
+        return sorted(prices, reverse=side is OrderSide.BUY)
@@ -0,0 +1,109 @@
+"""Cached product metadata, looked up by symbol or product id."""
+
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterator, List
+
+from hundred_x.constants import PRODUCTS_TTL
+from hundred_x.exceptions import UserInputValidationError
+from hundred_x.fixed_point import Fixed
+from hundred_x.utils import DEFAULT_ENCODING
+
+logger = logging.getLogger(__name__)
+
+
+class Product:
+    """A listed product with its wei-scaled fields decoded.
+
+    ``tick`` and ``lot`` are the price increment and minimum quantity as ``Fixed``, ready for
+    ``Fixed.quantize``; ``increment`` and ``lot_size`` are the same values as ``Decimal``.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        """Decode a product entry of ``/v1/products``."""
+        self.data = data
+        self.id: int = data["id"]
+        self.symbol: str = data["symbol"]
+        self.tick = Fixed.from_wei(data["increment"])
+        self.lot = Fixed.from_wei(data.get("minQuantity") or 0)
+        self.max_quantity = Fixed.from_wei(data.get("maxQuantity") or 0)
+        self.increment = self.tick.to_decimal()
+        self.lot_size = self.lot.to_decimal()
+
+    def __repr__(self) -> str:
+        """Return a short description of the product."""
+        return f"Product(id={self.id}, symbol={self.symbol!r}, increment={self.increment}, lot_size={self.lot_size})"
+
+
+class ProductRegistry:
+    """The product list, kept for ``ttl`` seconds and indexed by symbol and by id.
+
+    The registry holds no connection: clients refresh it from ``list_products`` when ``stale`` is set.
+    With a ``cache_path`` every refresh is also written to disk, so a restarted process reuses the list
+    until it is ``ttl`` seconds old instead of fetching it again.
+    """
+
+    def __init__(self, ttl: float = PRODUCTS_TTL, cache_path: str | None = None):
+        """Initialize the registry, loading the on-disk copy if there is one."""
+        self.ttl = ttl
+        self.cache_path = cache_path
+        self.fetched_at = 0.0
+        self.by_symbol: Dict[str, Product] = {}
+        self.by_id: Dict[int, Product] = {}
+        if cache_path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        """Return the number of products."""
+        return len(self.by_id)
+
+    def __iter__(self) -> Iterator[Product]:
+        """Iterate over the products."""
+        return iter(self.by_id.values())
+
+    @property
+    def stale(self) -> bool:
+        """Return whether the list is missing or older than the TTL."""
+        return time.time() - self.fetched_at >= self.ttl
+
+    def update(self, products: List[Dict[str, Any]], fetched_at: float | None = None):
+        """Replace the products with a ``/v1/products`` response and persist it."""
+        decoded = [Product(data) for data in products]
+        self.by_symbol = {product.symbol: product for product in decoded}
+        self.by_id = {product.id: product for product in decoded}
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+        if self.cache_path is not None and fetched_at is None:
+            self._save(products)
+
+    def get(self, product: str | int) -> Product | None:
+        """Return a product by symbol or id, or None if it is not listed."""
+        if isinstance(product, int):
+            return self.by_id.get(product)
+        return self.by_symbol.get(product)
+
+    def __getitem__(self, product: str | int) -> Product:
+        """Return a product by symbol or id."""
+        found = self.get(product)
+        if found is None:
+            raise UserInputValidationError(f"Unknown product: {product}")
+        return found
+
+    def _load(self):
+        """Read the on-disk copy, ignoring a missing or unreadable file."""
+        try:
+            with open(self.cache_path, "r", encoding=DEFAULT_ENCODING) as f:
+                cached = json.load(f)
+            self.update(cached["products"], fetched_at=cached["fetched_at"])
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning(f"Ignoring unreadable product cache {self.cache_path}: {exc}")
+
+    def _save(self, products: List[Dict[str, Any]]):
+        """Write the products to disk, replacing the previous copy atomically."""
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w", encoding=DEFAULT_ENCODING) as f:
+            json.dump({"fetched_at": self.fetched_at, "products": products}, f)
+        os.replace(tmp_path, self.cache_path)
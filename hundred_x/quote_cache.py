@@ -0,0 +1,284 @@
+"""Pre-signed order ladders, so repricing does not have to sign on the critical path."""
+
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Tuple
+
+from hundred_x.constants import QUOTE_CACHE_DURATION, QUOTE_CACHE_MIN_REMAINING, QUOTE_CACHE_REFRESH_INTERVAL
+from hundred_x.enums import OrderSide, OrderType, TimeInForce
+from hundred_x.fixed_point import Fixed
+from hundred_x.utils import to_wei
+
+logger = logging.getLogger(__name__)
+
+# (subaccount id, product id, quantity wei, price wei, is buy, order type, time in force)
+QuoteKey = Tuple[int, int, int, int, bool, int, int]
+
+
+def quote_key(
+    subaccount_id: int,
+    product_id: int,
+    quantity: Any,
+    price: Any,
+    side: OrderSide,
+    order_type: OrderType,
+    time_in_force: TimeInForce,
+) -> QuoteKey:
+    """Return the cache key of an order; amounts are compared in wei so ``3000.1`` and ``Decimal("3000.1")`` match."""
+    return (
+        subaccount_id,
+        product_id,
+        to_wei(quantity),
+        to_wei(price),
+        side.value,
+        order_type.value,
+        time_in_force.value,
+    )
+
+
+def ladder_id(key: QuoteKey) -> Tuple[int, int, bool]:
+    """Return the ``(subaccount id, product id, is buy)`` of the ladder an entry belongs to."""
+    return key[0], key[1], key[4]
+
+
+class Ladder:
+    """The orders to keep pre-signed for one subaccount, product and side."""
+
+    def __init__(
+        self,
+        subaccount_id: int,
+        product_id: int,
+        side: OrderSide,
+        price: Any,
+        increment: Any,
+        levels: int,
+        quantities: Iterable[Any],
+        order_type: OrderType,
+        time_in_force: TimeInForce,
+        duration: int,
+    ):
+        """Lay ``levels`` increments either side of ``price`` for every quantity, signed to last ``duration`` ms."""
+        self.subaccount_id = subaccount_id
+        self.product_id = product_id
+        self.side = side
+        self.order_type = order_type
+        self.time_in_force = time_in_force
+        self.duration = duration
+        center, step = Fixed.parse(price), Fixed.parse(increment)
+        self.orders: Dict[QuoteKey, Tuple[Fixed, Fixed]] = {}
+        for quantity in map(Fixed.parse, quantities):
+            for level in range(-levels, levels + 1):
+                level_price = center + level * step
+                key = quote_key(subaccount_id, product_id, quantity, level_price, side, order_type, time_in_force)
+                self.orders[key] = (quantity, level_price)
+
+
+class QuoteCache:
+    """Orders signed ahead of time at the prices a market maker is likely to quote next.
+
+    Call ``set_ladder`` whenever the fair price moves; a background thread signs the orders at
+    ``price ± k * increment`` that are not cached yet, each with its own reserved nonce and an expiration
+    ``duration`` milliseconds out, or the ladder's own ``duration``. ``create_order`` and
+    ``cancel_and_replace_order`` take a matching entry instead of signing inline, as long as it expires within
+    the ``duration`` they were called with, so orders sent with the default one second duration need a ladder
+    set with ``duration=1000``. Entries are used once, because the nonce is spent, and are evicted when fewer
+    than ``min_remaining`` milliseconds of their lifetime are left, or half the lifetime of a shorter-lived
+    ladder, or when the ladder no longer contains them.
+    """
+
+    def __init__(
+        self,
+        client,
+        duration: int = QUOTE_CACHE_DURATION,
+        min_remaining: int = QUOTE_CACHE_MIN_REMAINING,
+        refresh_interval: float = QUOTE_CACHE_REFRESH_INTERVAL,
+        use_pool: bool = False,
+    ):
+        """Initialize an empty cache; ``use_pool`` signs the ladders with ``client.sign_many``."""
+        if min_remaining >= duration:
+            raise ValueError("min_remaining must be shorter than duration.")
+        self.client = client
+        self.duration = duration
+        self.min_remaining = min_remaining
+        self.refresh_interval = refresh_interval
+        self.use_pool = use_pool
+        self.ladders: Dict[Tuple[int, int, bool], Ladder] = {}
+        self.entries: Dict[QuoteKey, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        """Return the number of signed orders ready to send."""
+        return len(self.entries)
+
+    def start(self):
+        """Start refilling the ladders in a background thread."""
+        if self._thread is None:
+            self._closed.clear()
+            self._thread = threading.Thread(target=self._run, name="quote-cache", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Stop the background thread and drop every entry."""
+        self._closed.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            self.entries.clear()
+
+    def set_ladder(
+        self,
+        subaccount_id: int,
+        product_id: int,
+        price: Any,
+        increment: Any,
+        levels: int = 2,
+        quantities: Iterable[Any] = (1,),
+        sides: Iterable[OrderSide] = (OrderSide.BUY, OrderSide.SELL),
+        order_type: OrderType = OrderType.LIMIT_MAKER,
+        time_in_force: TimeInForce = TimeInForce.GTC,
+        duration: int | None = None,
+    ):
+        """Center the ladders of a subaccount and product on ``price``, evicting orders that fell off them.
+
+        Each side has its own ladder, so bids and asks can be centered on different prices. ``duration``
+        overrides the cache's for the orders of these ladders; it must not exceed the duration they are sent with.
+        """
+        quantities = list(quantities)
+        duration = self.duration if duration is None else duration
+        if duration <= 0:
+            raise ValueError("duration must be positive.")
+        with self._lock:
+            for side in sides:
+                ladder = Ladder(
+                    subaccount_id,
+                    product_id,
+                    side,
+                    price,
+                    increment,
+                    levels,
+                    quantities,
+                    order_type,
+                    time_in_force,
+                    duration,
+                )
+                self.ladders[(subaccount_id, product_id, side.value)] = ladder
+            self._evict(lambda key, _: key not in self._ladder_orders(key))
+        self._wake.set()
+
+    def _ladder_orders(self, key: QuoteKey) -> Dict[QuoteKey, Tuple[Fixed, Fixed]]:
+        """Return the orders of the current ladder an entry belongs to; call with the lock held."""
+        ladder = self.ladders.get(ladder_id(key))
+        return {} if ladder is None else ladder.orders
+
+    def _min_remaining(self, key: QuoteKey) -> int:
+        """Return how many milliseconds an entry must have left to be sent; call with the lock held."""
+        ladder = self.ladders.get(ladder_id(key))
+        if ladder is None or ladder.duration >= self.duration:
+            return self.min_remaining
+        return min(self.min_remaining, ladder.duration // 2)
+
+    def clear_ladder(self, subaccount_id: int, product_id: int):
+        """Stop pre-signing for a subaccount and product and drop their entries."""
+        with self._lock:
+            for side in OrderSide:
+                self.ladders.pop((subaccount_id, product_id, side.value), None)
+            self._evict(lambda key, _: key[:2] == (subaccount_id, product_id))
+
+    def take(
+        self,
+        subaccount_id: int,
+        product_id: int,
+        quantity: Any,
+        price: Any,
+        side: OrderSide,
+        order_type: OrderType,
+        time_in_force: TimeInForce,
+        duration: int | None = None,
+    ) -> dict | None:
+        """Remove and return the signed order with these parameters, or None if there is no fresh one.
+
+        With ``duration``, an entry that would stay valid longer than ``duration`` milliseconds from now is
+        left for callers that allow it, so a cached order never outlives the caller's expiration.
+        """
+        key = quote_key(subaccount_id, product_id, quantity, price, side, order_type, time_in_force)
+        now = self.client._current_timestamp()
+        with self._lock:
+            message = self.entries.get(key)
+            if message is not None and duration is not None and message["expiration"] > now + duration:
+                message = None
+            elif message is not None:
+                del self.entries[key]
+                if message["expiration"] - now < self._min_remaining(key):
+                    message = None
+        if message is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._wake.set()
+        return message
+
+    def _evict(self, predicate):
+        """Drop the entries matching ``predicate(key, message)``; call with the lock held."""
+        for key in [key for key, message in self.entries.items() if predicate(key, message)]:
+            del self.entries[key]
+
+    def refresh(self) -> int:
+        """Evict expiring entries and sign the missing ones, returning how many were signed."""
+        now = self.client._current_timestamp()
+        with self._lock:
+            self._evict(lambda key, message: message["expiration"] - now < self._min_remaining(key))
+            missing = [
+                (key, ladder, order)
+                for ladder in self.ladders.values()
+                for key, order in ladder.orders.items()
+                if key not in self.entries
+            ]
+        if not missing:
+            return 0
+        intents: List[Tuple[type, Dict[str, Any]]] = [
+            self.client.order_intent(
+                ladder.subaccount_id,
+                ladder.product_id,
+                quantity,
+                price,
+                ladder.side,
+                ladder.order_type,
+                ladder.time_in_force,
+                duration=ladder.duration,
+            )
+            for _, ladder, (quantity, price) in missing
+        ]
+        if self.use_pool:
+            signed = self.client.sign_many(intents)
+        else:
+            signed = [self.client.generate_and_sign_message(cls, **fields) for cls, fields in intents]
+        with self._lock:
+            for (key, _, _), message in zip(missing, signed):
+                # The ladder may have moved while we were signing.
+                if key in self._ladder_orders(key):
+                    self.entries[key] = message
+        return len(signed)
+
+    def _run(self):
+        """Refill the ladders when woken or every ``refresh_interval`` seconds until closed.
+
+        Short-lived ladders are refilled at least four times per lifetime, so they are not empty half the time.
+        """
+        while not self._closed.is_set():
+            with self._lock:
+                durations = [ladder.duration for ladder in self.ladders.values()]
+            self._wake.wait(min([self.refresh_interval, *(duration / 4000 for duration in durations)]))
+            self._wake.clear()
+            if self._closed.is_set():
+                break
+            try:
+                self.refresh()
+            except Exception as exc:
+                logger.error(f"Failed to refresh the quote cache: {exc}")
@@ -0,0 +1,192 @@
+"""Client-side rate limiting shared by every request a process sends."""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Tuple
+
+from hundred_x.constants import (
+    ENDPOINT_RATE_LIMITS,
+    RATE_LIMIT,
+    RATE_LIMIT_BACKOFF,
+    RATE_LIMIT_MARKERS,
+    RATE_LIMIT_MAX_WAIT,
+    RATE_LIMIT_MIN_RATE,
+    RATE_LIMIT_RECOVERY,
+    RATE_LIMIT_RESERVE,
+    SUCCESS_CODE,
+    TOO_MANY_REQUESTS,
+)
+from hundred_x.enums import RequestPriority
+from hundred_x.exceptions import RateLimitError
+
+
+def is_throttled(status: int, body: bytes) -> bool:
+    """Return whether a response means the request was rate limited."""
+    if status == TOO_MANY_REQUESTS:
+        return True
+    if status == SUCCESS_CODE:
+        return False
+    lowered = body.lower()
+    return any(marker in lowered for marker in RATE_LIMIT_MARKERS)
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> float | None:
+    """Return the ``Retry-After`` header in seconds, whether sent as seconds or as a date."""
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def throttled_error(endpoint: str, status: int, body: bytes, retry_after: float | None) -> RateLimitError:
+    """Build the error raised for a throttled response."""
+    return RateLimitError(
+        f"Rate limited on {endpoint}: {body.decode(errors='replace')} {status}",
+        retry_after=retry_after,
+        status=status,
+        body=body,
+        endpoint=endpoint,
+    )
+
+
+class TokenBucket:
+    """A token bucket for one endpoint that slows down when throttled and speeds back up on success.
+
+    Normal requests leave ``reserve`` of the burst for high priority ones, so cancels still go out while
+    quotes are queueing. A throttled response halves the rate (down to ``min_rate``), empties the bucket and
+    blocks it for the server's ``Retry-After``; each success then wins back ``recovery`` of the base rate.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        reserve: float = RATE_LIMIT_RESERVE,
+        backoff: float = RATE_LIMIT_BACKOFF,
+        recovery: float = RATE_LIMIT_RECOVERY,
+        min_rate: float = RATE_LIMIT_MIN_RATE,
+    ):
+        """Start with a full bucket refilling at ``rate`` tokens per second."""
+        self.base_rate = self.rate = rate
+        self.capacity = capacity
+        self.reserve = reserve * capacity
+        self.backoff = backoff
+        self.recovery = recovery
+        self.min_rate = min(min_rate, rate)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.throttled = 0
+
+    def _refill(self, now: float):
+        """Add the tokens earned since the last update."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, priority: RequestPriority = RequestPriority.NORMAL) -> float:
+        """Take a token and return 0, or return how many seconds to wait before trying again."""
+        now = time.monotonic()
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        needed = 1.0 if priority is RequestPriority.HIGH else 1.0 + self.reserve
+        if self.tokens >= needed:
+            self.tokens -= 1
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def on_success(self):
+        """Recover part of the rate lost to earlier throttling."""
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * self.recovery)
+
+    def on_throttled(self, retry_after: float | None = None) -> float:
+        """Back off after a throttled response, returning how long the bucket is blocked for."""
+        now = time.monotonic()
+        self._refill(now)
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate * self.backoff)
+        self.tokens = 0.0
+        wait = 1.0 / self.rate if retry_after is None else retry_after
+        self.blocked_until = max(self.blocked_until, now + wait)
+        return wait
+
+
+class RateLimiter:
+    """Per-endpoint token buckets shared by every client that is given the limiter.
+
+    Pass one limiter to all the clients of a process so they spend one budget:
+
+        limiter = RateLimiter()
+        client = HundredXClient(..., rate_limiter=limiter)
+
+    ``limits`` maps endpoints to ``(requests per second, burst)`` on top of ``ENDPOINT_RATE_LIMITS``;
+    anything else gets ``default``. A request waits up to ``max_wait`` seconds for a token and otherwise
+    raises ``RateLimitError`` with the remaining wait as ``retry_after``.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Tuple[float, float]] | None = None,
+        default: Tuple[float, float] = RATE_LIMIT,
+        max_wait: float = RATE_LIMIT_MAX_WAIT,
+        **bucket_options,
+    ):
+        """Initialize the limiter; ``bucket_options`` are passed on to every ``TokenBucket``."""
+        self.limits = {**ENDPOINT_RATE_LIMITS, **(limits or {})}
+        self.default = default
+        self.max_wait = max_wait
+        self.bucket_options = bucket_options
+        self.buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, endpoint: str) -> TokenBucket:
+        """Return the bucket of an endpoint, creating it on first use."""
+        bucket = self.buckets.get(endpoint)
+        if bucket is None:
+            rate, capacity = self.limits.get(endpoint, self.default)
+            bucket = self.buckets[endpoint] = TokenBucket(rate, capacity, **self.bucket_options)
+        return bucket
+
+    def try_acquire(self, endpoint: str, priority: RequestPriority = RequestPriority.NORMAL) -> float:
+        """Take a token for an endpoint and return 0, or return how long to wait before trying again."""
+        with self._lock:
+            return self.bucket(endpoint).try_acquire(priority)
+
+    def _check_deadline(self, endpoint: str, wait: float, deadline: float):
+        """Raise if waiting ``wait`` more seconds would pass the deadline."""
+        if time.monotonic() + wait > deadline:
+            raise RateLimitError(f"Rate limit budget exhausted for {endpoint}", retry_after=wait, endpoint=endpoint)
+
+    def acquire(self, endpoint: str, priority: RequestPriority = RequestPriority.NORMAL):
+        """Block until a token for the endpoint is available."""
+        deadline = time.monotonic() + self.max_wait
+        while (wait := self.try_acquire(endpoint, priority)) > 0:
+            self._check_deadline(endpoint, wait, deadline)
+            time.sleep(wait)
+
+    async def acquire_async(self, endpoint: str, priority: RequestPriority = RequestPriority.NORMAL):
+        """Wait without blocking the event loop until a token for the endpoint is available."""
+        import asyncio
+
+        deadline = time.monotonic() + self.max_wait
+        while (wait := self.try_acquire(endpoint, priority)) > 0:
+            self._check_deadline(endpoint, wait, deadline)
+            await asyncio.sleep(wait)
+
+    def record(self, endpoint: str, throttled: bool, retry_after: float | None = None) -> float | None:
+        """Adapt an endpoint's bucket to a response, returning how long it is blocked if it was throttled."""
+        with self._lock:
+            bucket = self.bucket(endpoint)
+            if throttled:
+                return bucket.on_throttled(retry_after)
+            bucket.on_success()
+            return None
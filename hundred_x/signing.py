@@ -0,0 +1,64 @@
+"""Parallel signing of message batches across worker processes."""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from eip712_structs import make_domain
+from eth_keys import keys
+
+from hundred_x import eip_712
+from hundred_x.eip_712 import StructSigner
+
+# Per-process state, set once by the pool initializer.
+_worker_key: keys.PrivateKey | None = None
+_worker_domain = None
+_worker_signers: Dict[str, StructSigner] = {}
+
+
+def _init_worker(private_key: bytes, domain: Dict[str, Any]):
+    """Load the key and domain once per worker process."""
+    global _worker_key, _worker_domain  # noqa: PLW0603
+    _worker_key = keys.PrivateKey(private_key)
+    _worker_domain = make_domain(**domain)
+    _worker_signers.clear()
+
+
+def _sign_batch(batch: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Sign a chunk of ``(struct name, fields)`` pairs in a worker."""
+    signed = []
+    for name, fields in batch:
+        signer = _worker_signers.get(name)
+        if signer is None:
+            signer = _worker_signers[name] = StructSigner(getattr(eip_712, name), _worker_domain)
+        signed.append(signer.sign(_worker_key, **fields))
+    return signed
+
+
+class SigningPool:
+    """A pool of worker processes that each hold the signing key and sign message batches in parallel.
+
+    Workers are spawned rather than forked, so they do not inherit the parent's sockets and threads.
+    """
+
+    def __init__(self, private_key: bytes, domain: Dict[str, Any], workers: int | None = None):
+        """Start the pool; ``domain`` holds the ``make_domain`` fields and ``workers`` defaults to the cores."""
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(private_key, domain),
+        )
+
+    def sign_many(self, intents: List[Tuple[type, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Sign ``(message_class, fields)`` intents, returning the signed messages in the same order."""
+        batch = [(message_class.__name__, fields) for message_class, fields in intents]
+        size = -(-len(batch) // self.workers) or 1
+        chunks = [batch[start:start + size] for start in range(0, len(batch), size)]
+        return [message for signed in self._executor.map(_sign_batch, chunks) for message in signed]
+
+    def close(self):
+        """Shut the workers down."""
+        self._executor.shutdown(cancel_futures=True)
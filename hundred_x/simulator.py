@@ -0,0 +1,925 @@
+"""A local matching engine that speaks the 100x REST API, for testing quoting code without the exchange.
+
+``Simulator`` serves the ``/v1/*`` routes the clients use from a background thread, backed by a
+``MatchingEngine`` with one price-time-priority book per product. Signed messages are checked against the
+``hundred_x.eip_712`` structs in the devnet domain, so an order the simulator accepts is one the exchange
+would find correctly signed. Point a client at it through the devnet URLs:
+
+    with Simulator() as simulator:
+        simulator.use_devnet()
+        client = HundredXClient(env=Environment.DEVNET, private_key=key, subaccount_id=1)
+        client.create_order(1, "ethperp", "0.1", 3000, OrderSide.BUY, OrderType.LIMIT_MAKER, TimeInForce.GTC)
+
+or run ``python -m hundred_x.simulator`` and set ``DEVNET_REST_URL`` to the address it prints.
+
+Matching follows the exchange's order types: ``LIMIT_MAKER`` orders that would cross are rejected, ``IOC``
+orders cancel whatever does not fill at once, ``FOK`` orders are rejected unless they fill completely and
+``MARKET`` orders take liquidity at any price, cancelling the rest. Orders expire at their ``expiration``.
+Fills move positions and realize PnL into the USDB balance of each subaccount; margin is not enforced.
+The websocket streams are not simulated: poll ``/v1/depth`` and ``/v1/openOrders`` instead.
+"""
+
+import argparse
+import heapq
+import secrets
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from typing import Any, Callable, Deque, Dict, Iterator, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from eip712_structs import make_domain
+from eth_keys import keys
+
+from hundred_x import json_backend
+from hundred_x.constants import (
+    APIS,
+    CONTRACTS,
+    ORDER_NOT_FOUND,
+    SIMULATOR_BALANCE,
+    SIMULATOR_HISTORY,
+    SIMULATOR_HOST,
+    SIMULATOR_LEVERAGE,
+    SIMULATOR_PORT,
+    SUCCESS_CODE,
+)
+from hundred_x.eip_712 import CancelOrder, CancelOrders, LoginMessage, Order, Referral, StructSigner, Withdraw
+from hundred_x.enums import ApiType, Environment, OrderType, TimeInForce
+
+WEI = 10**18
+BAD_REQUEST = 400
+UNAUTHORIZED = 401
+NOT_FOUND = 404
+
+OPEN = "OPEN"
+PARTIALLY_FILLED = "PARTIALLY_FILLED"
+FILLED = "FILLED"
+CANCELLED = "CANCELLED"
+EXPIRED = "EXPIRED"
+
+# The devnet products, as ``/v1/products`` returns them.
+DEFAULT_PRODUCTS: List[Dict[str, Any]] = [
+    {
+        "id": 1002,
+        "productType": "PERP",
+        "symbol": "ethperp",
+        "baseAsset": "ETH",
+        "quoteAsset": "USDB",
+        "increment": "100000000000000000",
+        "minQuantity": "10000000000000000",
+        "maxQuantity": "1000000000000000000000",
+        "isActive": True,
+    },
+    {
+        "id": 1006,
+        "productType": "PERP",
+        "symbol": "blastperp",
+        "baseAsset": "BLAST",
+        "quoteAsset": "USDB",
+        "increment": "10000000000000",
+        "minQuantity": "1000000000000000000",
+        "maxQuantity": "10000000000000000000000000",
+        "isActive": True,
+    },
+]
+
+
+class SimulatorError(Exception):
+    """A request the simulator refuses, answered with ``status`` and the message as the error."""
+
+    def __init__(self, message: str, status: int = BAD_REQUEST):
+        """Keep the HTTP status of the refusal."""
+        super().__init__(message)
+        self.status = status
+
+
+def _now() -> int:
+    """Return the current time in milliseconds."""
+    return int(time.time() * 1000)
+
+
+def _field_parser(type_name: str) -> Callable[[Any], Any]:
+    """Return the function turning a payload value into the value of an EIP-712 field."""
+    if type_name.startswith("uint"):
+        return int
+    if type_name == "bool":
+        return lambda value: value if isinstance(value, bool) else str(value).lower() == "true"
+    return str
+
+
+def _recover(digest: bytes, signature: str) -> bytes:
+    """Return the 20-byte address that signed a digest, from an ``r || s || v`` hex signature."""
+    raw = bytes.fromhex(signature[2:] if signature[:2] in ("0x", "0X") else signature)
+    if len(raw) != 65:
+        raise ValueError("signature must be 65 bytes")
+    v = raw[64] - 27 if raw[64] >= 27 else raw[64]
+    vrs = (v, int.from_bytes(raw[:32], "big"), int.from_bytes(raw[32:64], "big"))
+    return keys.Signature(vrs=vrs).recover_public_key_from_msg_hash(digest).to_canonical_address()
+
+
+class Verifier:
+    """Checks signed messages against the ``hundred_x.eip_712`` structs of one domain."""
+
+    def __init__(self, env: Environment = Environment.DEVNET, verify: bool = True):
+        """Compile the struct signers of the environment's domain; ``verify=False`` skips signature recovery."""
+        domain = make_domain(
+            name="100x",
+            version="0.0.0",
+            chainId=CONTRACTS[env]["CHAIN_ID"],
+            verifyingContract=CONTRACTS[env]["VERIFYING_CONTRACT"],
+        )
+        self.verify = verify
+        self._signers: Dict[type, Tuple[StructSigner, List[Tuple[str, Callable[[Any], Any]]]]] = {}
+        for message_class in (LoginMessage, Withdraw, Order, CancelOrder, CancelOrders, Referral):
+            signer = StructSigner(message_class, domain)
+            parsers = [(name, _field_parser(type_name)) for name, type_name, _ in signer.fields]
+            self._signers[message_class] = (signer, parsers)
+
+    def check(self, message_class: type, message: Dict[str, Any]) -> Tuple[Dict[str, Any], bytes]:
+        """Return the parsed fields of a signed message and its digest, or raise ``SimulatorError``."""
+        signer, parsers = self._signers[message_class]
+        try:
+            fields = {name: parse(message[name]) for name, parse in parsers}
+            digest = signer.digest(fields)
+        except (KeyError, TypeError, ValueError) as exc:
+            raise SimulatorError(f"invalid {message_class.__name__} message: {exc!r}") from exc
+        if self.verify:
+            try:
+                signer_address = _recover(digest, str(message.get("signature") or ""))
+            except Exception as exc:
+                raise SimulatorError(f"invalid signature: {exc}", UNAUTHORIZED) from exc
+            if signer_address.hex() != fields["account"].lower().removeprefix("0x"):
+                raise SimulatorError("invalid signature: signer does not match account", UNAUTHORIZED)
+        return fields, digest
+
+
+class SimOrder:
+    """An order as the simulator keeps it, with integer wei prices and quantities."""
+
+    __slots__ = (
+        "id",
+        "account",
+        "subaccount_id",
+        "product_id",
+        "is_buy",
+        "order_type",
+        "time_in_force",
+        "price",
+        "quantity",
+        "residual",
+        "expiration",
+        "nonce",
+        "status",
+        "created_at",
+    )
+
+    def __init__(self, order_id: str, fields: Dict[str, Any], created_at: int):
+        """Take the parsed fields of an ``Order`` message."""
+        self.id = order_id
+        self.account: str = fields["account"]
+        self.subaccount_id: int = fields["subAccountId"]
+        self.product_id: int = fields["productId"]
+        self.is_buy: bool = fields["isBuy"]
+        self.order_type: int = fields["orderType"]
+        self.time_in_force: int = fields["timeInForce"]
+        self.price: int = fields["price"]
+        self.quantity: int = fields["quantity"]
+        self.residual = self.quantity
+        self.expiration: int = fields["expiration"]
+        self.nonce: int = fields["nonce"]
+        self.status = OPEN
+        self.created_at = created_at
+
+    @property
+    def owner(self) -> Tuple[str, int]:
+        """Return the account and subaccount the order belongs to."""
+        return self.account.lower(), self.subaccount_id
+
+    def to_api(self, symbol: str) -> Dict[str, Any]:
+        """Return the order in the format of the order routes."""
+        return {
+            "id": self.id,
+            "account": self.account,
+            "subAccountId": self.subaccount_id,
+            "productId": self.product_id,
+            "productSymbol": symbol,
+            "isBuy": self.is_buy,
+            "orderType": self.order_type,
+            "timeInForce": self.time_in_force,
+            "expiration": self.expiration,
+            "nonce": self.nonce,
+            "price": str(self.price),
+            "quantity": str(self.quantity),
+            "residualQuantity": str(self.residual),
+            "status": self.status,
+            "createdAt": self.created_at,
+        }
+
+
+class Position:
+    """A perpetual position: signed quantity and average entry price, both in wei."""
+
+    __slots__ = ("quantity", "entry")
+
+    def __init__(self):
+        """Start flat."""
+        self.quantity = 0
+        self.entry = 0
+
+    def trade(self, price: int, quantity: int) -> int:
+        """Apply a fill of signed ``quantity`` at ``price`` and return the realized PnL in wei."""
+        held = self.quantity
+        if held == 0 or (held > 0) == (quantity > 0):
+            total = held + quantity
+            self.entry = (self.entry * abs(held) + price * abs(quantity)) // abs(total)
+            self.quantity = total
+            return 0
+        closed = min(abs(held), abs(quantity))
+        pnl = (price - self.entry) * closed // WEI * (1 if held > 0 else -1)
+        self.quantity = held + quantity
+        if self.quantity == 0:
+            self.entry = 0
+        elif (self.quantity > 0) != (held > 0):
+            self.entry = price
+        return pnl
+
+
+class Account:
+    """The USDB balance, positions and open orders of one subaccount."""
+
+    __slots__ = ("balance", "positions", "orders", "referred")
+
+    def __init__(self, balance: int):
+        """Start with ``balance`` wei of USDB, flat and with no orders."""
+        self.balance = balance
+        self.positions: Dict[int, Position] = {}
+        self.orders: Dict[str, SimOrder] = {}
+        self.referred = False
+
+
+class Book:
+    """The resting orders of one product: price levels per side, each level in time priority."""
+
+    def __init__(self):
+        """Start empty."""
+        self.levels: Dict[bool, Dict[int, Deque[SimOrder]]] = {True: {}, False: {}}
+        # Sorted level keys with the best level last: bid prices, and negated ask prices.
+        self._keys: Dict[bool, List[int]] = {True: [], False: []}
+        self._expiries: List[Tuple[int, int, SimOrder]] = []
+        self._sequence = count()
+
+    def best(self, is_buy: bool) -> int | None:
+        """Return the best price of a side, or None if it is empty."""
+        keys = self._keys[is_buy]
+        if not keys:
+            return None
+        return keys[-1] if is_buy else -keys[-1]
+
+    def prices(self, is_buy: bool) -> Iterator[int]:
+        """Yield the prices of a side, best first."""
+        for key in reversed(self._keys[is_buy]):
+            yield key if is_buy else -key
+
+    def add(self, order: SimOrder):
+        """Queue an order at the back of its price level."""
+        levels = self.levels[order.is_buy]
+        level = levels.get(order.price)
+        if level is None:
+            level = levels[order.price] = deque()
+            insort(self._keys[order.is_buy], order.price if order.is_buy else -order.price)
+        level.append(order)
+        heapq.heappush(self._expiries, (order.expiration, next(self._sequence), order))
+
+    def remove(self, order: SimOrder):
+        """Take an order off the book."""
+        level = self.levels[order.is_buy][order.price]
+        level.remove(order)
+        if not level:
+            self.drop_level(order.is_buy, order.price)
+
+    def drop_level(self, is_buy: bool, price: int):
+        """Remove an empty price level."""
+        del self.levels[is_buy][price]
+        keys = self._keys[is_buy]
+        del keys[bisect_left(keys, price if is_buy else -price)]
+
+    def expire(self, now: int) -> List[SimOrder]:
+        """Take the orders whose expiration has passed off the book and return them."""
+        expired = []
+        while self._expiries and self._expiries[0][0] <= now:
+            order = heapq.heappop(self._expiries)[2]
+            if order.residual and order.status in (OPEN, PARTIALLY_FILLED):
+                self.remove(order)
+                expired.append(order)
+        return expired
+
+    def available(self, is_buy: bool, limit: int | None, wanted: int) -> bool:
+        """Return whether ``wanted`` can be taken from the side opposite ``is_buy`` within ``limit``."""
+        side = not is_buy
+        for price in self.prices(side):
+            if limit is not None and (price > limit if is_buy else price < limit):
+                return False
+            wanted -= sum(order.residual for order in self.levels[side][price])
+            if wanted <= 0:
+                return True
+        return False
+
+    def depth(self, limit: int | None = None) -> Dict[str, List[List[str]]]:
+        """Return the aggregated levels in the format of ``/v1/depth``, best first."""
+        depth = {}
+        for name, is_buy in (("bids", True), ("asks", False)):
+            rows = []
+            for price in self.prices(is_buy):
+                if limit is not None and len(rows) >= limit:
+                    break
+                level = self.levels[is_buy][price]
+                rows.append([str(price), str(sum(order.residual for order in level)), str(len(level))])
+            depth[name] = rows
+        return depth
+
+
+class MatchingEngine:
+    """Price-time-priority matching for every product, with the accounts of the subaccounts trading.
+
+    Methods taking a ``message`` check its signature and raise ``SimulatorError`` for anything the exchange
+    would refuse. ``place`` skips the signature, for seeding books from a test. The engine is thread safe:
+    every call holds ``lock``.
+    """
+
+    def __init__(
+        self,
+        products: List[Dict[str, Any]] | None = None,
+        balance: int = SIMULATOR_BALANCE,
+        verify_signatures: bool = True,
+        env: Environment = Environment.DEVNET,
+        history: int = SIMULATOR_HISTORY,
+    ):
+        """Open an empty book per product; every new subaccount starts with ``balance`` wei of USDB."""
+        self.products: Dict[int, Dict[str, Any]] = {product["id"]: product for product in products or DEFAULT_PRODUCTS}
+        self.symbols = {product["symbol"]: product_id for product_id, product in self.products.items()}
+        self.books = {product_id: Book() for product_id in self.products}
+        self.balance = balance
+        self.verifier = Verifier(env, verify_signatures)
+        self.usdb = CONTRACTS[env]["USDB"]
+        self.accounts: Dict[Tuple[str, int], Account] = {}
+        self.orders: Dict[str, SimOrder] = {}
+        self.closed: "OrderedDict[str, SimOrder]" = OrderedDict()
+        self.trades: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.sessions: Dict[str, str] = {}
+        self.history = history
+        self.lock = threading.RLock()
+        self._seen: Dict[bytes, int] = {}
+        self._seen_expiries: List[Tuple[int, bytes]] = []
+        self._ids = count(1)
+
+    def account(self, address: str, subaccount_id: int) -> Account:
+        """Return a subaccount, opening it with the starting balance on first use."""
+        key = (address.lower(), subaccount_id)
+        account = self.accounts.get(key)
+        if account is None:
+            account = self.accounts[key] = Account(self.balance)
+        return account
+
+    def product(self, product: int | str) -> Dict[str, Any]:
+        """Return a product by id or symbol, or raise ``SimulatorError``."""
+        product_id = self.symbols.get(product, product) if isinstance(product, str) else product
+        if product_id not in self.products:
+            raise SimulatorError(f"product not found: {product}", NOT_FOUND)
+        return self.products[product_id]
+
+    def symbol(self, product_id: int) -> str:
+        """Return the symbol of a product id."""
+        return self.products[product_id]["symbol"]
+
+    # signed messages
+
+    def submit(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Check a signed ``Order`` message, match it and return the order as the exchange reports it."""
+        fields, digest = self.verifier.check(Order, message)
+        with self.lock:
+            self._claim(digest, fields["expiration"])
+            return self._place(fields)
+
+    def cancel_and_replace(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Cancel ``idToCancel`` and submit ``newOrder``; the old order stays cancelled if the new one is rejected."""
+        fields, digest = self.verifier.check(Order, body.get("newOrder") or {})
+        with self.lock:
+            order = self.orders.get(str(body.get("idToCancel")))
+            if order is None or order.owner != (fields["account"].lower(), fields["subAccountId"]):
+                raise SimulatorError(ORDER_NOT_FOUND)
+            self._claim(digest, fields["expiration"])
+            self._close(order, CANCELLED)
+            self.books[order.product_id].remove(order)
+            return self._place(fields)
+
+    def cancel(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Check a signed ``CancelOrder`` message and take the order off the book."""
+        fields, _ = self.verifier.check(CancelOrder, message)
+        with self.lock:
+            order = self.orders.get(fields["orderId"])
+            if (
+                order is None
+                or order.product_id != fields["productId"]
+                or order.owner != (fields["account"].lower(), fields["subAccountId"])
+            ):
+                raise SimulatorError("order not found")
+            self._close(order, CANCELLED)
+            self.books[order.product_id].remove(order)
+            return {"success": True}
+
+    def cancel_all(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Check a signed ``CancelOrders`` message and cancel every open order of the product."""
+        fields, _ = self.verifier.check(CancelOrders, message)
+        with self.lock:
+            self.product(fields["productId"])
+            account = self.account(fields["account"], fields["subAccountId"])
+            book = self.books[fields["productId"]]
+            for order in [order for order in account.orders.values() if order.product_id == fields["productId"]]:
+                self._close(order, CANCELLED)
+                book.remove(order)
+            return {"success": True}
+
+    def login(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Check a signed ``LoginMessage`` and open a session for its account."""
+        fields, _ = self.verifier.check(LoginMessage, message)
+        cookie = secrets.token_hex(16)
+        with self.lock:
+            self.sessions[cookie] = fields["account"].lower()
+        return {"value": cookie}
+
+    def logout(self, cookie: str | None) -> Dict[str, Any]:
+        """Close a session."""
+        with self.lock:
+            self.sessions.pop(cookie or "", None)
+        return {"status": "success"}
+
+    def session(self, cookie: str | None) -> str | None:
+        """Return the account a session cookie belongs to, if it is open."""
+        return self.sessions.get(cookie or "")
+
+    def withdraw(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Check a signed ``Withdraw`` message and take the quantity out of the balance."""
+        fields, digest = self.verifier.check(Withdraw, message)
+        with self.lock:
+            if fields["asset"].lower() != self.usdb.lower():
+                raise SimulatorError(f"unsupported asset: {fields['asset']}")
+            self._claim(digest, _now() + 24 * 3600 * 1000)
+            account = self.account(fields["account"], fields["subAccountId"])
+            if fields["quantity"] > account.balance:
+                raise SimulatorError("insufficient balance")
+            account.balance -= fields["quantity"]
+            return {"success": True}
+
+    def refer(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Check a signed ``Referral`` message; an account can only be referred once."""
+        fields, _ = self.verifier.check(Referral, message)
+        with self.lock:
+            account = self.account(fields["account"], 0)
+            if account.referred:
+                raise SimulatorError("user already referred")
+            account.referred = True
+            return {}
+
+    def place(
+        self,
+        account: str,
+        subaccount_id: int,
+        product: int | str,
+        is_buy: bool,
+        price: int,
+        quantity: int,
+        order_type: OrderType = OrderType.LIMIT,
+        time_in_force: TimeInForce = TimeInForce.GTC,
+        duration: int = 3_600_000,
+    ) -> Dict[str, Any]:
+        """Place an unsigned order with wei price and quantity, for seeding books; it is matched like any other."""
+        now = _now()
+        with self.lock:
+            fields = {
+                "account": account,
+                "subAccountId": subaccount_id,
+                "productId": self.product(product)["id"],
+                "isBuy": is_buy,
+                "orderType": order_type.value,
+                "timeInForce": time_in_force.value,
+                "expiration": now + duration,
+                "price": price,
+                "quantity": quantity,
+                "nonce": now,
+            }
+            return self._place(fields)
+
+    # matching
+
+    def _claim(self, digest: bytes, expiration: int):
+        """Reject a message that was already accepted; it is remembered until it expires."""
+        now = _now()
+        while self._seen_expiries and self._seen_expiries[0][0] <= now:
+            self._seen.pop(heapq.heappop(self._seen_expiries)[1], None)
+        if digest in self._seen:
+            raise SimulatorError("duplicate message")
+        self._seen[digest] = expiration
+        heapq.heappush(self._seen_expiries, (expiration, digest))
+
+    def _validate(self, fields: Dict[str, Any], now: int) -> Dict[str, Any]:
+        """Check an order against its product and return the product."""
+        product = self.product(fields["productId"])
+        if fields["orderType"] not in (OrderType.LIMIT.value, OrderType.LIMIT_MAKER.value, OrderType.MARKET.value):
+            raise SimulatorError(f"unsupported order type: {fields['orderType']}")
+        if fields["timeInForce"] not in {tif.value for tif in TimeInForce}:
+            raise SimulatorError(f"unsupported time in force: {fields['timeInForce']}")
+        if fields["expiration"] <= now:
+            raise SimulatorError("order expired")
+        lot = int(product["minQuantity"])
+        quantity = fields["quantity"]
+        if quantity < lot or quantity > int(product["maxQuantity"]) or quantity % lot:
+            raise SimulatorError(f"invalid quantity: {quantity}")
+        price = fields["price"]
+        if fields["orderType"] != OrderType.MARKET.value and (price <= 0 or price % int(product["increment"])):
+            raise SimulatorError(f"invalid price: {price}")
+        return product
+
+    def _place(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate, match and rest or close an order; the caller holds the lock."""
+        now = _now()
+        product = self._validate(fields, now)
+        book = self.books[product["id"]]
+        for expired in book.expire(now):
+            self._close(expired, EXPIRED)
+        order = SimOrder(f"0x{next(self._ids):064x}", fields, now)
+        market = order.order_type == OrderType.MARKET.value
+        limit = None if market else order.price
+        opposite = book.best(not order.is_buy)
+        crosses = opposite is not None and (market or (opposite <= limit if order.is_buy else opposite >= limit))
+        if order.order_type == OrderType.LIMIT_MAKER.value and crosses:
+            raise SimulatorError("limit maker order would cross the book")
+        if order.time_in_force == TimeInForce.FOK.value and not book.available(order.is_buy, limit, order.quantity):
+            raise SimulatorError("fill or kill order cannot be filled")
+        if crosses:
+            self._match(book, order, limit, now)
+        account = self.account(order.account, order.subaccount_id)
+        if not order.residual:
+            self._close(order, FILLED)
+        elif market or order.time_in_force != TimeInForce.GTC.value:
+            self._close(order, CANCELLED)
+        else:
+            book.add(order)
+            self.orders[order.id] = order
+            account.orders[order.id] = order
+        return order.to_api(product["symbol"])
+
+    def _match(self, book: Book, taker: SimOrder, limit: int | None, now: int):
+        """Fill a taker against the opposite side, best price first and oldest first within a price."""
+        side = not taker.is_buy
+        while taker.residual:
+            price = book.best(side)
+            if price is None or (limit is not None and (price > limit if taker.is_buy else price < limit)):
+                return
+            level = book.levels[side][price]
+            maker = level[0]
+            quantity = min(taker.residual, maker.residual)
+            self._fill(maker, taker, price, quantity, now)
+            if not maker.residual:
+                level.popleft()
+                if not level:
+                    book.drop_level(side, price)
+                self._close(maker, FILLED)
+
+    def _fill(self, maker: SimOrder, taker: SimOrder, price: int, quantity: int, now: int):
+        """Trade ``quantity`` between two orders at ``price`` and settle both subaccounts."""
+        for order in (maker, taker):
+            order.residual -= quantity
+            order.status = PARTIALLY_FILLED if order.residual else FILLED
+            account = self.account(order.account, order.subaccount_id)
+            position = account.positions.get(order.product_id)
+            if position is None:
+                position = account.positions[order.product_id] = Position()
+            account.balance += position.trade(price, quantity if order.is_buy else -quantity)
+        self.trades.append(
+            {
+                "id": f"0x{next(self._ids):064x}",
+                "productId": taker.product_id,
+                "price": str(price),
+                "quantity": str(quantity),
+                "isBuyerMaker": maker.is_buy,
+                "makerAccount": maker.account,
+                "takerAccount": taker.account,
+                "createdAt": now,
+            }
+        )
+
+    def _close(self, order: SimOrder, status: str):
+        """Mark an order closed and move it to the history; the caller takes it off the book."""
+        order.status = status
+        self.orders.pop(order.id, None)
+        self.account(order.account, order.subaccount_id).orders.pop(order.id, None)
+        self.closed[order.id] = order
+        if len(self.closed) > self.history:
+            self.closed.popitem(last=False)
+
+    def _expire(self, product_id: int):
+        """Close the expired orders of a product."""
+        for order in self.books[product_id].expire(_now()):
+            self._close(order, EXPIRED)
+
+    # queries
+
+    def depth(self, symbol: str, limit: int | None = None) -> Dict[str, Any]:
+        """Return the depth of a product."""
+        with self.lock:
+            product_id = self.product(symbol)["id"]
+            self._expire(product_id)
+            return self.books[product_id].depth(limit)
+
+    def ticker(self, symbol: str | None = None) -> List[Dict[str, Any]]:
+        """Return the 24 hour ticker of one product or of all of them."""
+        with self.lock:
+            products = [self.product(symbol)] if symbol else list(self.products.values())
+            since = _now() - 24 * 3600 * 1000
+            tickers = []
+            for product in products:
+                self._expire(product["id"])
+                book = self.books[product["id"]]
+                trades = [t for t in self.trades if t["productId"] == product["id"] and t["createdAt"] >= since]
+                bid, ask = book.best(True), book.best(False)
+                tickers.append(
+                    {
+                        "productId": product["id"],
+                        "productSymbol": product["symbol"],
+                        "lastPrice": trades[-1]["price"] if trades else None,
+                        "bestBidPrice": None if bid is None else str(bid),
+                        "bestAskPrice": None if ask is None else str(ask),
+                        "volume": str(sum(int(t["quantity"]) for t in trades)),
+                        "count": len(trades),
+                    }
+                )
+            return tickers
+
+    def trade_history(self, symbol: str, lookback: int | None = None) -> Dict[str, Any]:
+        """Return the latest ``lookback`` trades of a product, newest first."""
+        with self.lock:
+            product_id = self.product(symbol)["id"]
+            trades = [trade for trade in reversed(self.trades) if trade["productId"] == product_id]
+        return {"trades": trades[:lookback] if lookback else trades}
+
+    def open_orders(self, address: str, subaccount_id: int, symbol: str | None = None) -> List[Dict[str, Any]]:
+        """Return the open orders of a subaccount, optionally of one product."""
+        with self.lock:
+            product_id = None if symbol is None else self.product(symbol)["id"]
+            for expiring in [product_id] if product_id is not None else list(self.books):
+                self._expire(expiring)
+            orders = self.account(address, subaccount_id).orders.values()
+            return [
+                order.to_api(self.symbol(order.product_id))
+                for order in orders
+                if product_id is None or order.product_id == product_id
+            ]
+
+    def order_history(
+        self, address: str, subaccount_id: int, symbol: str | None = None, ids: List[str] | None = None
+    ) -> List[Dict[str, Any]]:
+        """Return the open and recently closed orders of a subaccount, optionally by product or id."""
+        with self.lock:
+            product_id = None if symbol is None else self.product(symbol)["id"]
+            owner = (address.lower(), subaccount_id)
+            if ids is None:
+                candidates = [*self.orders.values(), *self.closed.values()]
+            else:
+                candidates = [self.orders.get(order_id) or self.closed.get(order_id) for order_id in ids]
+            return [
+                order.to_api(self.symbol(order.product_id))
+                for order in candidates
+                if order is not None
+                and order.owner == owner and (product_id is None or order.product_id == product_id)
+            ]
+
+    def balances(self, address: str, subaccount_id: int) -> List[Dict[str, Any]]:
+        """Return the USDB balance of a subaccount."""
+        with self.lock:
+            balance = self.account(address, subaccount_id).balance
+        return [{"account": address, "subAccountId": subaccount_id, "asset": self.usdb, "quantity": str(balance)}]
+
+    def positions(self, address: str, subaccount_id: int) -> List[Dict[str, Any]]:
+        """Return the open positions of a subaccount, with the margin they would use at full leverage."""
+        with self.lock:
+            held = list(self.account(address, subaccount_id).positions.items())
+        return [
+            {
+                "account": address,
+                "subAccountId": subaccount_id,
+                "productId": product_id,
+                "productSymbol": self.symbol(product_id),
+                "quantity": str(position.quantity),
+                "avgEntryPrice": str(position.entry),
+                "margin": str(abs(position.quantity) * position.entry // WEI // SIMULATOR_LEVERAGE),
+            }
+            for product_id, position in held
+            if position.quantity
+        ]
+
+
+def _param(params: Dict[str, List[str]], name: str, default: Any = None) -> Any:
+    """Return the first value of a query parameter."""
+    values = params.get(name)
+    return values[0] if values else default
+
+
+def _cookie(header: str | None) -> str | None:
+    """Return the session cookie of a ``cookie`` header."""
+    for part in (header or "").split(";"):
+        name, _, value = part.strip().partition("=")
+        if name == "connectedAddress":
+            return value
+    return None
+
+
+class Simulator:
+    """Serve a ``MatchingEngine`` over the ``/v1/*`` REST routes from a background thread.
+
+    ``latency`` adds a fixed delay, in seconds, to every response. The routes that need a session check
+    that the ``account`` asked for is the one logged in with the session cookie.
+    """
+
+    def __init__(
+        self,
+        engine: MatchingEngine | None = None,
+        host: str = SIMULATOR_HOST,
+        port: int = 0,
+        latency: float = 0.0,
+    ):
+        """Bind the server; port 0 picks a free port."""
+        self.engine = engine or MatchingEngine()
+        self.latency = latency
+        self.routes: Dict[Tuple[str, str], Callable[[Dict[str, List[str]], Any, str | None], Any]] = {
+            ("GET", "/v1/products"): lambda params, body, session: list(self.engine.products.values()),
+            ("GET", "/v1/time"): lambda params, body, session: {"serverTime": _now()},
+            ("GET", "/v1/depth"): self._depth,
+            ("GET", "/v1/ticker/24hr"): lambda params, body, session: self.engine.ticker(_param(params, "symbol")),
+            ("GET", "/v1/trade-history"): self._trade_history,
+            ("POST", "/v1/session/login"): self._message_route(self.engine.login),
+            ("GET", "/v1/session/status"): self._session_status,
+            ("GET", "/v1/session/logout"): self._logout,
+            ("POST", "/v1/referral/add-referee"): self._message_route(self.engine.refer),
+            ("POST", "/v1/order"): self._message_route(self.engine.submit),
+            ("POST", "/v1/order/cancel-and-replace"): self._message_route(self.engine.cancel_and_replace),
+            ("DELETE", "/v1/order"): self._message_route(self.engine.cancel),
+            ("DELETE", "/v1/openOrders"): self._message_route(self.engine.cancel_all),
+            ("POST", "/v1/withdraw"): self._message_route(self.engine.withdraw),
+            ("GET", "/v1/openOrders"): self._account_route(self.engine.open_orders, "symbol"),
+            ("GET", "/v1/orders"): self._account_route(self.engine.order_history, "symbol", "ids"),
+            ("GET", "/v1/balances"): self._account_route(self.engine.balances),
+            ("GET", "/v1/positionRisk"): self._account_route(self.engine.positions),
+            ("GET", "/v1/approved-signers"): self._account_route(lambda address, subaccount_id: []),
+        }
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "Simulator":
+        """Start serving from a daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="hundred_x-simulator")
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Stop serving and release the port."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "Simulator":
+        """Start serving."""
+        return self.start()
+
+    def __exit__(self, *args):
+        """Stop serving."""
+        self.close()
+
+    def use_devnet(self):
+        """Point the devnet URLs of clients created from now on at this simulator.
+
+        The websocket URL is set too, since the clients need one, but the simulator does not serve streams.
+        """
+        APIS[Environment.DEVNET][ApiType.REST] = self.url
+        APIS[Environment.DEVNET][ApiType.WEBSOCKET] = "ws" + self.url[len("http"):]
+
+    # routes
+
+    def _depth(self, params: Dict[str, List[str]], body: Any, session: str | None) -> Any:
+        """Return the depth of the ``symbol`` parameter."""
+        limit = _param(params, "limit")
+        return self.engine.depth(_param(params, "symbol", ""), None if limit is None else int(limit))
+
+    def _trade_history(self, params: Dict[str, List[str]], body: Any, session: str | None) -> Any:
+        """Return the trades of the ``symbol`` parameter."""
+        lookback = _param(params, "lookback")
+        return self.engine.trade_history(_param(params, "symbol", ""), None if lookback is None else int(lookback))
+
+    def _session_status(self, params: Dict[str, List[str]], body: Any, session: str | None) -> Any:
+        """Return whether the session cookie is logged in."""
+        account = self.engine.session(session)
+        if account is None:
+            raise SimulatorError("not logged in", UNAUTHORIZED)
+        return {"status": "success", "account": account}
+
+    def _logout(self, params: Dict[str, List[str]], body: Any, session: str | None) -> Any:
+        """Close the session."""
+        return self.engine.logout(session)
+
+    @staticmethod
+    def _message_route(handler: Callable[[Dict[str, Any]], Any]):
+        """Return a route passing the signed message in the body to ``handler``."""
+        return lambda params, body, session: handler(body)
+
+    def _account_route(self, query: Callable[..., Any], *optional: str):
+        """Return a route answering ``query(account, subaccount_id, ...)`` for the logged in account."""
+
+        def route(params: Dict[str, List[str]], body: Any, session: str | None) -> Any:
+            account = _param(params, "account", "")
+            if self.engine.session(session) != account.lower():
+                raise SimulatorError("not logged in", UNAUTHORIZED)
+            extra = {name: params.get(name) if name == "ids" else _param(params, name) for name in optional}
+            return query(account, int(_param(params, "subAccountId", 0)), **extra)
+
+        return route
+
+    def handle(self, method: str, path: str, query: str, body: bytes, cookie: str | None) -> Tuple[int, bytes]:
+        """Answer one request with a status and a JSON body."""
+        if self.latency:
+            time.sleep(self.latency)
+        params = parse_qs(query)
+        route = self.routes.get((method, path))
+        try:
+            if route is not None:
+                payload = route(params, json_backend.loads(body) if body else {}, cookie)
+            elif method == "GET" and path.startswith("/v1/products/"):
+                payload = self.engine.product(path.rsplit("/", 1)[1])
+            else:
+                raise SimulatorError(f"no route for {method} {path}", NOT_FOUND)
+        except SimulatorError as exc:
+            return exc.status, json_backend.dumps({"error": str(exc)})
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            # Malformed bodies, such as a JSON list where an object is expected, are the client's error.
+            return BAD_REQUEST, json_backend.dumps({"error": f"bad request: {exc!r}"})
+        return SUCCESS_CODE, json_backend.dumps(payload)
+
+    def _handler_class(self):
+        """Return the request handler class bound to this simulator."""
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _respond(self):
+                """Route the request and write the response."""
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                status, body = simulator.handle(
+                    self.command, url.path, url.query, self.rfile.read(length), _cookie(self.headers.get("cookie"))
+                )
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_DELETE = _respond  # noqa: N815
+
+            def log_message(self, *args):
+                """Keep requests out of the logs."""
+
+        return Handler
+
+
+def main():
+    """Run a simulator in the foreground until interrupted."""
+    parser = argparse.ArgumentParser(description="Local matching engine speaking the 100x REST API.")
+    parser.add_argument("--host", default=SIMULATOR_HOST)
+    parser.add_argument("--port", type=int, default=SIMULATOR_PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="delay added to every response, in seconds")
+    parser.add_argument("--no-verify", action="store_true", help="accept messages without checking signatures")
+    args = parser.parse_args()
+    simulator = Simulator(MatchingEngine(verify_signatures=not args.no_verify), args.host, args.port, args.latency)
+    print(f"DEVNET_REST_URL={simulator.url}")
+    try:
+        simulator._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
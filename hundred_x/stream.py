@@ -0,0 +1,210 @@
+"""Websocket streaming of market data and order updates."""
+
+import asyncio
+import inspect
+import itertools
+import json
+import logging
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+import websockets
+
+from hundred_x import json_backend
+from hundred_x.client import HundredXClient
+from hundred_x.constants import APIS, PRIVATE_STREAMS, STREAM_MAX_RECONNECT_DELAY, STREAM_RECONNECT_DELAY
+from hundred_x.enums import ApiType, Environment, StreamType
+from hundred_x.exceptions import UserInputValidationError
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[str, Any], Any]
+
+
+def to_websocket_url(url: str) -> str:
+    """Map the configured stream URL onto its websocket scheme."""
+    if url.startswith("https://"):
+        return "wss://" + url.removeprefix("https://")
+    if url.startswith("http://"):
+        return "ws://" + url.removeprefix("http://")
+    return url
+
+
+class HundredXStream:
+    """Push-based market data and order updates over the websocket API.
+
+    Subscriptions are kept across reconnects: when the connection drops the stream reconnects with
+    exponential backoff, logs in again if any private stream is subscribed, and resubscribes. Messages
+    are delivered to per-subscription callbacks (plain functions or coroutines) and to the async iterator:
+
+        async with client.stream() as stream:
+            await stream.subscribe(StreamType.DEPTH, "ethperp")
+            async for name, data in stream:
+                ...
+
+    The iterator keeps the latest ``queue_size`` messages and drops the oldest when nobody is reading.
+    """
+
+    def __init__(
+        self,
+        env: Environment = Environment.TESTNET,
+        client: HundredXClient | None = None,
+        queue_size: int = 1000,
+        reconnect_delay: float = STREAM_RECONNECT_DELAY,
+        max_reconnect_delay: float = STREAM_MAX_RECONNECT_DELAY,
+    ):
+        """Initialize the stream for an environment, or for the environment of ``client``."""
+        self.client = client
+        self.url = to_websocket_url(client.websocket_url if client is not None else APIS[env][ApiType.WEBSOCKET])
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.subscriptions: Dict[str, List[Callback]] = {}
+        self.private_subscriptions: Set[str] = set()
+        self.queue: asyncio.Queue[Tuple[str, Any]] = asyncio.Queue(maxsize=queue_size)
+        self.connected = asyncio.Event()
+        self._ids = itertools.count(1)
+        self._websocket = None
+        self._logged_in = False
+        self._closed = False
+        self._task: asyncio.Task | None = None
+
+    async def __aenter__(self):
+        """Connect when entering the async context manager."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        """Disconnect when leaving the async context manager."""
+        await self.close()
+
+    def __aiter__(self):
+        """Iterate over ``(stream name, data)`` pairs."""
+        return self
+
+    async def __anext__(self) -> Tuple[str, Any]:
+        """Wait for the next message."""
+        return await self.queue.get()
+
+    async def start(self):
+        """Start the connection task, or restart it if it ended."""
+        if self._task is None or self._task.done():
+            self._closed = False
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop reconnecting and close the connection."""
+        self._closed = True
+        if self._websocket is not None:
+            await self._websocket.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stream_name(self, stream_type: StreamType, symbol: str | None = None) -> str:
+        """Return the subscription name, e.g. ``ethperp@depth`` or ``<account>@orders`` for private streams."""
+        if stream_type in PRIVATE_STREAMS:
+            if self.client is None or getattr(self.client, "public_key", None) is None:
+                raise UserInputValidationError(f"{stream_type.value} stream requires a client with a private key.")
+            return f"{self.client.public_key.lower()}@{stream_type.value}"
+        if symbol is None:
+            raise UserInputValidationError(f"{stream_type.value} stream requires a symbol.")
+        return f"{symbol}@{stream_type.value}"
+
+    async def subscribe(
+        self, stream_type: StreamType, symbol: str | None = None, callback: Callback | None = None
+    ) -> str:
+        """Subscribe to a stream and return its name; ``callback`` is called with each message."""
+        name = self.stream_name(stream_type, symbol)
+        is_new = name not in self.subscriptions
+        callbacks = self.subscriptions.setdefault(name, [])
+        if callback is not None:
+            callbacks.append(callback)
+        if stream_type in PRIVATE_STREAMS:
+            self.private_subscriptions.add(name)
+        if is_new and self._websocket is not None:
+            if name in self.private_subscriptions and not self._logged_in:
+                await self._login()
+            await self._send("SUBSCRIBE", [name])
+        return name
+
+    async def unsubscribe(self, name: str):
+        """Unsubscribe from a stream by name."""
+        self.private_subscriptions.discard(name)
+        if self.subscriptions.pop(name, None) is not None and self._websocket is not None:
+            await self._send("UNSUBSCRIBE", [name])
+
+    async def _send(self, method: str, params: Any):
+        """Send a request over the open connection.
+
+        A request lost to a dropped connection is not an error: the subscriptions are replayed on reconnect.
+        """
+        try:
+            await self._websocket.send(json.dumps({"id": next(self._ids), "method": method, "params": params}))
+        except websockets.ConnectionClosed:
+            logger.debug(f"Connection closed before {method} was sent, it will be replayed on reconnect")
+
+    async def _login(self):
+        """Authenticate the connection with a signed login message."""
+        message = await asyncio.get_running_loop().run_in_executor(None, self.client._login_message)
+        await self._send("LOGIN", message)
+        self._logged_in = True
+
+    async def _on_connect(self):
+        """Restore the session and subscriptions on a fresh connection."""
+        self._logged_in = False
+        names = list(self.subscriptions)
+        if self.private_subscriptions:
+            await self._login()
+        if names:
+            await self._send("SUBSCRIBE", names)
+
+    async def _dispatch(self, raw: str | bytes):
+        """Route a message to its callbacks and the iterator queue.
+
+        A message that does not decode, or a callback that raises, is logged and skipped, so neither can end
+        the connection loop.
+        """
+        try:
+            message = json_backend.loads(raw)
+        except Exception:
+            logger.exception(f"Dropping a stream message that does not decode: {raw[:200]!r}")
+            return
+        if not isinstance(message, dict) or "stream" not in message:
+            if isinstance(message, dict) and message.get("error"):
+                logger.error(f"Stream request failed: {message}")
+            return
+        name, data = message["stream"], message.get("data")
+        for callback in self.subscriptions.get(name, ()):
+            try:
+                result = callback(name, data)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception(f"Stream callback {callback!r} failed on {name}")
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait((name, data))
+
+    async def _run(self):
+        """Keep a connection open, reconnecting with backoff until closed."""
+        delay = self.reconnect_delay
+        while not self._closed:
+            try:
+                async with websockets.connect(self.url) as websocket:
+                    self._websocket = websocket
+                    await self._on_connect()
+                    self.connected.set()
+                    delay = self.reconnect_delay
+                    async for raw in websocket:
+                        await self._dispatch(raw)
+            except (OSError, websockets.WebSocketException) as exc:
+                logger.warning(f"Stream connection to {self.url} lost: {exc}")
+            finally:
+                self._websocket = None
+                self.connected.clear()
+            if not self._closed:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
@@ -0,0 +1,256 @@
+"""A local, append-only store of depth samples in memory-mappable segment files.
+
+Each symbol gets a directory of segment files, one per ``segment_seconds`` of samples, named after the UTC
+second their period starts at. A segment is a 64 byte header followed by fixed-width little-endian records,
+one per sample:
+
+    time        int64            nanoseconds since the epoch
+    bid, ask    int64            best price, in ticks
+    *_gaps      uint32[levels-1] ticks between each level and the one before it
+    *_sizes     uint32[levels]   size of each level in lots, 0 where the book had fewer levels
+
+so five levels a side take 96 bytes. Records are written through a buffered file and only ever appended,
+and a reader maps the file and gets the records as a NumPy view without copying or parsing them:
+
+    with TickStore("ticks") as store:
+        store.append(product, time.time_ns(), client.get_depth_arrays(symbol, int(product.tick), int(product.lot)))
+
+    for records in TickStore("ticks").read("ethperp", start=time.time_ns() - 3600 * 10**9):
+        depth = decode(records)
+        spread = depth["ask_price"][:, 0] - depth["bid_price"][:, 0]
+
+Requires ``numpy`` (``pip install hundred-keks[arrays]``).
+"""
+
+import logging
+import os
+from typing import BinaryIO, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from hundred_x.constants import COLLECTOR_LEVELS, TICK_SEGMENT_SECONDS
+from hundred_x.products import Product
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"HXTICKS1"
+SEGMENT_SUFFIX = ".ticks"
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("levels", "<u4"),
+    ("reserved", "<u4"),
+    ("tick", "<u8"),
+    ("lot", "<u8"),
+    ("start", "<i8"),
+    ("padding", "V24"),
+])
+_UINT32_MAX = np.iinfo(np.uint32).max
+
+
+def record_dtype(levels: int) -> np.dtype:
+    """Return the dtype of one record holding ``levels`` levels a side."""
+    return np.dtype([
+        ("time", "<i8"),
+        ("bid", "<i8"),
+        ("ask", "<i8"),
+        ("bid_gaps", "<u4", (levels - 1,)),
+        ("ask_gaps", "<u4", (levels - 1,)),
+        ("bid_sizes", "<u4", (levels,)),
+        ("ask_sizes", "<u4", (levels,)),
+    ])
+
+
+def decode(records: np.ndarray) -> Dict[str, np.ndarray]:
+    """Undo the delta encoding of ``records``, vectorized over all of them.
+
+    Returns ``time`` and, per side, ``(n, levels)`` arrays of ``bid_price`` and ``ask_price`` in ticks and
+    ``bid_size`` and ``ask_size`` in lots. The time and size columns are views of the records; prices of
+    levels whose size is 0 are meaningless.
+    """
+    depth = {"time": records["time"]}
+    for side, sign in (("bid", -1), ("ask", 1)):
+        gaps = records[f"{side}_gaps"]
+        offsets = np.zeros((len(records), gaps.shape[1] + 1), np.int64)
+        np.cumsum(gaps, axis=1, dtype=np.int64, out=offsets[:, 1:])
+        depth[f"{side}_price"] = records[side][:, None] + sign * offsets
+        depth[f"{side}_size"] = records[f"{side}_sizes"]
+    return depth
+
+
+class Segment:
+    """One segment file: its header and a memory map of the whole records written so far."""
+
+    __slots__ = ("path", "levels", "tick", "lot", "start", "dtype")
+
+    def __init__(self, path: str):
+        """Read the header of the segment at ``path``."""
+        header = np.fromfile(path, HEADER_DTYPE, count=1)
+        if len(header) != 1 or header["magic"][0] != MAGIC:
+            raise ValueError(f"{path} is not a tick store segment")
+        self.path = path
+        self.levels = int(header["levels"][0])
+        self.tick = int(header["tick"][0])
+        self.lot = int(header["lot"][0])
+        self.start = int(header["start"][0])
+        self.dtype = record_dtype(self.levels)
+
+    def __len__(self) -> int:
+        """Return the number of whole records in the file."""
+        return (os.path.getsize(self.path) - HEADER_DTYPE.itemsize) // self.dtype.itemsize
+
+    def __repr__(self) -> str:
+        """Return the path and number of records."""
+        return f"Segment({self.path!r}, records={len(self)})"
+
+    @property
+    def records(self) -> np.ndarray:
+        """Return the records as a read-only view of the mapped file."""
+        count = len(self)
+        if count == 0:
+            return np.empty(0, self.dtype)
+        return np.memmap(self.path, self.dtype, mode="r", offset=HEADER_DTYPE.itemsize, shape=(count,))
+
+
+class _OpenSegment:
+    """The segment a symbol is currently appending to."""
+
+    __slots__ = ("file", "start", "end", "last", "record")
+
+    def __init__(self, file: BinaryIO, start: int, end: int, last: int, levels: int):
+        self.file = file
+        self.start = start
+        self.end = end
+        self.last = last
+        self.record = np.zeros(1, record_dtype(levels))
+
+
+class TickStore:
+    """Appends depth samples to per-symbol segment files under ``root`` and reads them back.
+
+    A new segment is started for every ``segment_seconds`` of samples. Appending to a segment that already
+    exists, after a restart, continues it, dropping a partial record left by a crash. Samples of a symbol
+    must be appended in time order; one older than the last is recorded at the last one's time.
+    """
+
+    def __init__(self, root: str, levels: int = COLLECTOR_LEVELS, segment_seconds: int = TICK_SEGMENT_SECONDS):
+        """Use ``root`` as the store's directory, creating it on the first append."""
+        self.root = root
+        self.levels = levels
+        self.segment_seconds = segment_seconds
+        self._open: Dict[str, _OpenSegment] = {}
+
+    def __enter__(self) -> "TickStore":
+        """Return the store."""
+        return self
+
+    def __exit__(self, *args):
+        """Close the open segments."""
+        self.close()
+
+    def append(self, product: Product, timestamp: int, depth: Dict[str, np.ndarray]):
+        """Record a sample of ``product`` taken at ``timestamp`` nanoseconds.
+
+        ``depth`` is ``get_depth_arrays`` output in ticks and lots, best level first; levels past
+        ``levels`` are dropped.
+        """
+        segment = self._open.get(product.symbol)
+        if segment is None or timestamp >= segment.end:
+            segment = self._rotate(product, timestamp)
+        record = segment.record
+        record["time"] = max(timestamp, segment.last)
+        for side in ("bid", "ask"):
+            rows = depth[f"{side}s"][: self.levels]
+            prices, sizes = rows["price"], rows["size"]
+            gaps = np.abs(np.diff(prices))
+            if (len(gaps) and gaps.max() > _UINT32_MAX) or (len(sizes) and sizes.max() > _UINT32_MAX):
+                raise ValueError(f"{product.symbol} depth does not fit a record: {rows}")
+            record[side] = prices[0] if len(prices) else 0
+            record[f"{side}_gaps"][0] = 0
+            record[f"{side}_gaps"][0, : len(gaps)] = gaps
+            record[f"{side}_sizes"][0] = 0
+            record[f"{side}_sizes"][0, : len(sizes)] = sizes
+        segment.last = int(record["time"][0])
+        segment.file.write(record.tobytes())
+
+    def flush(self):
+        """Write the buffered records of every open segment to disk."""
+        for segment in self._open.values():
+            segment.file.flush()
+
+    def close(self):
+        """Flush and close the open segments."""
+        for segment in self._open.values():
+            segment.file.close()
+        self._open.clear()
+
+    def _rotate(self, product: Product, timestamp: int) -> _OpenSegment:
+        """Close the symbol's open segment and open the one ``timestamp`` falls in."""
+        previous = self._open.pop(product.symbol, None)
+        if previous is not None:
+            previous.file.close()
+        period = self.segment_seconds * 10**9
+        start = timestamp - timestamp % period
+        directory = os.path.join(self.root, product.symbol)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{start // 10**9}{SEGMENT_SUFFIX}")
+        tick, lot = int(product.tick), int(product.lot)
+        last = previous.last if previous is not None else 0
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER_DTYPE.itemsize:
+            existing = Segment(path)
+            if (existing.levels, existing.tick, existing.lot) != (self.levels, tick, lot):
+                raise ValueError(f"{path} was written with other levels, tick or lot")
+            count = len(existing)
+            os.truncate(path, HEADER_DTYPE.itemsize + count * existing.dtype.itemsize)
+            if count:
+                last = max(last, int(existing.records["time"][-1]))
+            file = open(path, "ab")  # noqa: SIM115
+        else:
+            file = open(path, "wb")  # noqa: SIM115
+            header = np.zeros(1, HEADER_DTYPE)
+            header[0] = (MAGIC, self.levels, 0, tick, lot, start, b"")
+            file.write(header.tobytes())
+            logger.info(f"Started tick segment {path}")
+        segment = self._open[product.symbol] = _OpenSegment(file, start, start + period, last, self.levels)
+        return segment
+
+    def segments(self, symbol: str) -> List[Segment]:
+        """Return the segments of ``symbol``, oldest first."""
+        directory = os.path.join(self.root, symbol)
+        if not os.path.isdir(directory):
+            return []
+        names = [name for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX)]
+        names.sort(key=lambda name: int(name[: -len(SEGMENT_SUFFIX)]))
+        return [Segment(os.path.join(directory, name)) for name in names]
+
+    def symbols(self) -> List[str]:
+        """Return the symbols that have segments."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def read(self, symbol: str, start: int | None = None, stop: int | None = None) -> Iterator[np.ndarray]:
+        """Yield views of the records of ``symbol`` from ``start`` up to ``stop`` nanoseconds, a segment at a time.
+
+        Records still buffered by an open store are not visible until it is flushed.
+        """
+        segments = self.segments(symbol)
+        for segment, following in zip(segments, segments[1:] + [None]):
+            if start is not None and following is not None and following.start <= start:
+                continue
+            if stop is not None and segment.start >= stop:
+                break
+            records = segment.records
+            times = records["time"]
+            first = 0 if start is None else int(np.searchsorted(times, start))
+            last = len(records) if stop is None else int(np.searchsorted(times, stop))
+            if first < last:
+                yield records[first:last]
+
+    def stats(self, symbol: str | None = None) -> Tuple[int, int]:
+        """Return the number of records and the bytes on disk, for one symbol or the whole store."""
+        records = size = 0
+        for name in [symbol] if symbol is not None else self.symbols():
+            for segment in self.segments(name):
+                records += len(segment)
+                size += os.path.getsize(segment.path)
+        return records, size
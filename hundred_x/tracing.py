@@ -0,0 +1,191 @@
+"""Phase-level tracing of order submission, for finding where a slow order spent its time.
+
+With ``client.enable_tracing()``, every ``create_order``, ``cancel_and_replace_order``, ``cancel_order``
+and ``withdraw`` records a ``Trace``: the time spent in each phase between the call and its return.
+
+    ``resolve``      looking up a product symbol (async client)
+    ``offload``      waiting for the signing executor (async client)
+    ``quote_cache``  taking a pre-signed order from the quote cache
+    ``build``        nonce, expiration and field values of the struct
+    ``hash``         EIP-712 encoding and hashing of the struct
+    ``sign``         ECDSA signature
+    ``payload``      ``from_message_to_payload``
+    ``serialize``    JSON encoding of the request body
+    ``network``      the request, including rate limit waits and retries
+    ``decode``       JSON decoding of the response
+
+The traces are kept in a ring buffer of the last ``capacity`` operations:
+
+    tracer = client.enable_tracing()
+    ...
+    tracer.summary()["create_order"]["sign"]["p99_ms"]
+    tracer.export("traces.jsonl")
+
+Code on the order path calls ``mark`` at each phase boundary; with no trace active that is one context
+variable lookup.
+"""
+
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar, copy_context
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+from hundred_x import json_backend
+from hundred_x.constants import TRACE_CAPACITY
+
+_current: ContextVar["Trace | None"] = ContextVar("hundred_x_trace", default=None)
+
+
+def mark(phase: str):
+    """End ``phase`` of the active trace, if any: the time since the previous mark is attributed to it."""
+    trace = _current.get()
+    if trace is not None:
+        trace.mark(phase)
+
+
+def active() -> bool:
+    """Return whether a trace is being recorded in this context."""
+    return _current.get() is not None
+
+
+def carry(func: Callable[[], Any], phase: str) -> Callable[[], Any]:
+    """Wrap ``func`` to run in the current context from another thread, marking ``phase`` when it starts."""
+    context = copy_context()
+
+    def run():
+        mark(phase)
+        return func()
+
+    return lambda: context.run(run)
+
+
+class Trace:
+    """The phase timings of one operation; use it as a context manager around the operation."""
+
+    __slots__ = ("operation", "started", "start", "end", "marks", "error", "_tracer", "_token")
+
+    def __init__(self, operation: str, tracer: "Tracer | None" = None):
+        """Start timing an operation; it is added to ``tracer`` when the ``with`` block exits."""
+        self.operation = operation
+        self.started = time.time()
+        self.start = self.end = time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+        self.error: str | None = None
+        self._tracer = tracer
+        self._token = None
+
+    def __enter__(self) -> "Trace":
+        """Make this the active trace of the current context."""
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        """Stop timing, note any error and hand the trace to its tracer."""
+        self.end = time.perf_counter()
+        _current.reset(self._token)
+        if exc is not None:
+            self.error = repr(exc)
+        if self._tracer is not None:
+            self._tracer.add(self)
+
+    def mark(self, phase: str):
+        """End a phase now."""
+        self.marks.append((phase, time.perf_counter()))
+
+    @property
+    def total(self) -> float:
+        """Return the duration of the operation in seconds."""
+        return self.end - self.start
+
+    def phases(self) -> Dict[str, float]:
+        """Return the seconds spent in each phase, in order; time after the last mark is ``other``."""
+        phases: Dict[str, float] = {}
+        previous = self.start
+        for phase, at in self.marks:
+            phases[phase] = phases.get(phase, 0.0) + at - previous
+            previous = at
+        if self.end > previous:
+            phases["other"] = phases.get("other", 0.0) + self.end - previous
+        return phases
+
+    def record(self) -> Dict[str, Any]:
+        """Return the trace as plain values, with durations in milliseconds."""
+        return {
+            "operation": self.operation,
+            "started": self.started,
+            "total_ms": self.total * 1000,
+            "error": self.error,
+            "phases": {phase: seconds * 1000 for phase, seconds in self.phases().items()},
+        }
+
+    def __repr__(self) -> str:
+        """Return a short description of the trace."""
+        phases = ", ".join(f"{phase}={seconds * 1000:.2f}ms" for phase, seconds in self.phases().items())
+        return f"Trace({self.operation}, {phases})"
+
+
+def _nearest_rank(ordered: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of a sorted list."""
+    return ordered[max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))]
+
+
+class Tracer:
+    """Keeps the traces of the last ``capacity`` operations; may be shared by several clients."""
+
+    def __init__(self, capacity: int = TRACE_CAPACITY):
+        """Start with an empty ring buffer."""
+        self.traces: Deque[Trace] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of traces kept."""
+        return len(self.traces)
+
+    def trace(self, operation: str) -> Trace:
+        """Return a trace of an operation, to be used as a context manager."""
+        return Trace(operation, self)
+
+    def add(self, trace: Trace):
+        """Keep a finished trace, dropping the oldest one if the buffer is full."""
+        with self._lock:
+            self.traces.append(trace)
+
+    def clear(self):
+        """Drop every trace."""
+        with self._lock:
+            self.traces.clear()
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Return every trace as plain values, oldest first."""
+        with self._lock:
+            traces = list(self.traces)
+        return [trace.record() for trace in traces]
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Return the count, mean, p50 and p99 in milliseconds of every phase, per operation."""
+        samples: Dict[str, Dict[str, List[float]]] = {}
+        for record in self.records():
+            phases = samples.setdefault(record["operation"], {})
+            for phase, ms in [*record["phases"].items(), ("total", record["total_ms"])]:
+                phases.setdefault(phase, []).append(ms)
+        summary = {}
+        for operation, phases in samples.items():
+            summary[operation] = {}
+            for phase, values in phases.items():
+                values.sort()
+                summary[operation][phase] = {
+                    "count": len(values),
+                    "mean_ms": sum(values) / len(values),
+                    "p50_ms": _nearest_rank(values, 0.5),
+                    "p99_ms": _nearest_rank(values, 0.99),
+                }
+        return summary
+
+    def export(self, path: str) -> int:
+        """Write the traces to ``path`` as JSON lines and return how many were written."""
+        records = self.records()
+        with open(path, "wb") as f:
+            for record in records:
+                f.write(json_backend.dumps(record) + b"\n")
+        return len(records)
@@ -0,0 +1,35 @@
+"""HTTP transport for the hundred_x package."""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from hundred_x.constants import DEFAULT_BACKOFF_FACTOR, DEFAULT_MAX_RETRIES, DEFAULT_POOL_SIZE
+
+RETRY_STATUS_CODES = (502, 503, 504)
+# Only idempotent requests are retried on a bad status; connection failures are retried for any method
+# because the request never reached the server.
+RETRY_METHODS = frozenset(["GET"])
+
+
+def create_session(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+    keep_alive: bool = True,
+) -> requests.Session:
+    """Create a pooled session that keeps connections to the REST API open between calls."""
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=RETRY_METHODS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
@@ -8,6 +8,7 @@ from pathlib import Path
 from typing import Any, Dict
 
 from hundred_x.enums import Environment
+from hundred_x.fixed_point import Fixed
 
 INSTALL_DIR = os.path.dirname(os.path.abspath(__file__))
 DEFAULT_ENCODING = "utf-8"
@@ -34,3 +35,8 @@ def from_message_to_payload(message: Dict[str, Any]):
         if key in STRING_KEYS:
             message[key] = str(value)
     return message
+
+
+def to_wei(value: Any) -> int:
+    """Convert a human readable amount, or a ``Fixed``, to integer wei."""
+    return int(Fixed.parse(value))
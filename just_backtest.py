@@ -0,0 +1,42 @@
+import json
+import os
+import sys
+
+from dotenv import load_dotenv
+from influxdb_client import InfluxDBClient
+
+from hundred_x.backtest import Backtest, influx_depth, merge, parquet_trades
+from hundred_x.client import HundredXClient
+from hundred_x.enums import Environment
+from just_mm import JustMM, opts
+
+# Load configuration
+load_dotenv()
+INFLUXDB_URL = os.getenv("INFLUXDB_URL", "http://localhost:8086")
+INFLUXDB_ORG = os.getenv("INFLUXDB_ORG", "keks")
+INFLUXDB_USERNAME = os.getenv("INFLUXDB_USERNAME")
+INFLUXDB_PASSWORD = os.getenv("INFLUXDB_PASSWORD")
+INFLUXDB_BUCKET = os.getenv("INFLUXDB_BUCKET", "prices")
+SYMBOL = opts["SYMBOL"]
+START = sys.argv[1] if len(sys.argv) > 1 else "-7d"  # any Flux time, e.g. -30d or 2024-05-01T00:00:00Z
+LATENCY_MILLISECONDS = 50  # from deciding on a quote to it resting on the book
+MAKER_FEE = 0  # fraction of the notional, negative for a rebate
+
+def main():
+    product = HundredXClient(env=Environment.PROD, lazy=True).lookup_product(SYMBOL)
+    influx_client = InfluxDBClient(
+        url=INFLUXDB_URL, org=INFLUXDB_ORG, username=INFLUXDB_USERNAME, password=INFLUXDB_PASSWORD
+    )
+    try:
+        # both sources stream from storage, so memory stays flat however long the window is
+        depth = influx_depth(influx_client.query_api(), INFLUXDB_BUCKET, product, START)
+        trades = parquet_trades(f"{SYMBOL}.parquet", product) if os.path.exists(f"{SYMBOL}.parquet") else []
+        strategy = JustMM(opts["MYSIZE"], opts["MAXSIZE"], verbose=False)
+        backtest = Backtest(strategy, product, latency=LATENCY_MILLISECONDS, maker_fee=MAKER_FEE)
+        result = backtest.run(merge(depth, trades))
+    finally:
+        influx_client.close()
+    print(json.dumps(result.summary(), indent=2))
+
+if __name__ == "__main__":
+    main()
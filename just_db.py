@@ -1,13 +1,16 @@
 import os
+import sys
 import time
-from datetime import datetime, timedelta, timezone
-from decimal import Decimal
 
 import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
+import numpy as np
 from dotenv import load_dotenv
 from influxdb_client import InfluxDBClient
 
+from hundred_x.fixed_point import SCALE
+from hundred_x.tick_store import TickStore, record_dtype
+
 # InfluxDB connection details
 load_dotenv()
 INFLUXDB_URL = os.getenv("INFLUXDB_URL", "http://localhost:8086")
@@ -15,6 +18,13 @@ INFLUXDB_ORG = os.getenv("INFLUXDB_ORG", "keks")
 INFLUXDB_USERNAME = os.getenv("INFLUXDB_USERNAME")
 INFLUXDB_PASSWORD = os.getenv("INFLUXDB_PASSWORD")
 INFLUXDB_BUCKET = os.getenv("INFLUXDB_BUCKET", "prices")
+TICK_STORE = os.getenv("TICK_STORE")
+MAX_LEVELS = 5  # levels a side just_prices.py records
+REPORT_SECONDS = 24 * 3600
+REPORT_WINDOW = f"-{REPORT_SECONDS}s"
+LARGE_SIZE = 5  # the spread is also averaged over samples with more than this size at the best bid and ask
+PLOT_SYMBOL = sys.argv[1] if len(sys.argv) > 1 else "ethperp"
+PLOT_RESOLUTION = "1m"
 
 client = InfluxDBClient(url=INFLUXDB_URL, org=INFLUXDB_ORG, username=INFLUXDB_USERNAME, password=INFLUXDB_PASSWORD)
 query_api = client.query_api()
@@ -24,7 +34,7 @@ def save_plot(timestamps, bids, asks):
     plt.step(timestamps, bids, label='Best Bid')
     plt.step(timestamps, asks, label='Best Ask')
     
-    plt.title('Best Bid and Ask Prices Over Time')
+    plt.title(f'Best Bid and Ask Prices of {PLOT_SYMBOL} Over Time')
     plt.xlabel('Time')
     plt.ylabel('Price')
     plt.legend()
@@ -37,61 +47,93 @@ def save_plot(timestamps, bids, asks):
     plt.savefig('bid_ask_plot.png', dpi=300, bbox_inches='tight')
     print("Plot saved as bid_ask_plot.png")
 
-def parse_data():
-    start_time = time.time()
-    # Time range for the query (last 24 hours)
-    start = (datetime.now(timezone.utc) - timedelta(hours=24)).strftime('%Y-%m-%dT%H:%M:%SZ')
+def print_spreads(symbol, count, total, large_count, large_total, source):
+    print(f"{symbol} ({source}, {count} samples, {large_count} with both sizes > {LARGE_SIZE}):")
+    print(f"  Average bid-ask spread: {total / count if count else 0:.10g}")
+    print(f"  Average bid-ask spread for orders > {LARGE_SIZE}: {large_total / large_count if large_count else 0:.10g}")
 
+def spread_stats():
+    """Average the spread of every symbol over the report window, aggregated by the server in one pass."""
+    start_time = time.time()
     query = f'''
     from(bucket:"{INFLUXDB_BUCKET}")
-    |> range(start: {start})
+    |> range(start: {REPORT_WINDOW})
     |> filter(fn: (r) => r._measurement == "orderbook")
+    |> filter(fn: (r) => r._field == "bid1_price" or r._field == "ask1_price"
+        or r._field == "bid1_amount" or r._field == "ask1_amount")
     |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+    |> filter(fn: (r) => exists r.bid1_price and exists r.ask1_price)
+    |> map(fn: (r) => ({{r with
+        spread: r.ask1_price - r.bid1_price,
+        large: exists r.bid1_amount and exists r.ask1_amount
+            and r.bid1_amount > {float(LARGE_SIZE)} and r.ask1_amount > {float(LARGE_SIZE)}
+    }}))
+    |> reduce(
+        identity: {{count: 0, total: 0.0, large_count: 0, large_total: 0.0}},
+        fn: (r, accumulator) => ({{
+            count: accumulator.count + 1,
+            total: accumulator.total + r.spread,
+            large_count: accumulator.large_count + (if r.large then 1 else 0),
+            large_total: accumulator.large_total + (if r.large then r.spread else 0.0)
+        }})
+    )
     '''
 
-    result = query_api.query(query)
+    # one row per symbol comes back, however many samples the window holds
+    for record in query_api.query_stream(query):
+        values = record.values
+        print_spreads(
+            values["symbol"], values["count"], values["total"], values["large_count"], values["large_total"], "InfluxDB"
+        )
+    print(f"  Calculated in: {(time.time() - start_time)*1000:,.0f}ms")
 
-    total_spread = Decimal(0)
-    total_large_spread = Decimal(0)
-    count = 0
-    large_count = 0
+def store_spread_stats():
+    """Average the spreads recorded in the local tick store, vectorized over the mapped records."""
+    start_time = time.time()
+    store = TickStore(TICK_STORE)
+    start = time.time_ns() - REPORT_SECONDS * 10**9
+    for symbol in store.symbols():
+        segments = store.segments(symbol)
+        if not segments:
+            continue
+        segment = segments[-1]
+        large_size = LARGE_SIZE * SCALE // segment.lot
+        count = total = large_count = large_total = 0
+        for records in store.read(symbol, start=start):
+            bid_size, ask_size = records["bid_sizes"][:, 0], records["ask_sizes"][:, 0]
+            both = (bid_size > 0) & (ask_size > 0)
+            spread = (records["ask"] - records["bid"])[both]
+            large = ((bid_size > large_size) & (ask_size > large_size))[both]
+            count += len(spread)
+            total += int(spread.sum())
+            large_count += int(large.sum())
+            large_total += int(spread[large].sum())
+        tick = segment.tick / SCALE
+        print_spreads(symbol, count, total * tick, large_count, large_total * tick, "tick store")
+    print(f"  Calculated in: {(time.time() - start_time)*1000:,.0f}ms")
+
+def plot_data():
+    """Return the best bid and ask of PLOT_SYMBOL over the report window, one sample per PLOT_RESOLUTION."""
+    start_time = time.time()
+    query = f'''
+    from(bucket:"{INFLUXDB_BUCKET}")
+    |> range(start: {REPORT_WINDOW})
+    |> filter(fn: (r) => r._measurement == "orderbook" and r.symbol == "{PLOT_SYMBOL}")
+    |> filter(fn: (r) => r._field == "bid1_price" or r._field == "ask1_price")
+    |> aggregateWindow(every: {PLOT_RESOLUTION}, fn: last, createEmpty: false)
+    |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+    '''
 
     timestamps = []
     bids = []
     asks = []
+    for record in query_api.query_stream(query):
+        timestamps.append(record.get_time())
+        bids.append(record.values.get("bid1_price", np.nan))
+        asks.append(record.values.get("ask1_price", np.nan))
+    print(f"Fetched {len(timestamps)} plot points in {(time.time() - start_time)*1000:,.0f}ms")
 
-    for table in result:
-        for record in table.records:
-            # fetch values
-            timestamp = record.get_time()
-            best_bid = Decimal(record.values.get("bid1_price", "0"))
-            best_ask = Decimal(record.values.get("ask1_price", "0"))
-            bid_amount = Decimal(record.values.get("bid1_amount", "0"))
-            ask_amount = Decimal(record.values.get("ask1_amount", "0"))
-
-            # save bids, asks, and timestamps
-            timestamps.append(timestamp)
-            bids.append(Decimal(record.values.get("bid1_price", "0")))
-            asks.append(Decimal(record.values.get("ask1_price", "0")))
-
-            # calculate spread
-            spread = best_ask - best_bid
-            total_spread += spread
-            count += 1
-
-            # calculate spread for orders > 5
-            if bid_amount > Decimal("5") and ask_amount > Decimal("5"):
-                total_large_spread += spread
-                large_count += 1
-
-    avg_spread = total_spread / count if count > 0 else Decimal(0)
-    avg_large_spread = total_large_spread / large_count if large_count > 0 else Decimal(0)
-
-    print(f"Average bid-ask spread: {avg_spread:.18f}")
-    print(f"Average bid-ask spread for orders > 5: {avg_large_spread:.18f}")
-    print(f"  Calculated in: {(time.time() - start_time)*1000:,.0f}ms")
-
-    return timestamps, bids, asks
+    return timestamps, np.array(bids, dtype=float), np.array(asks, dtype=float)
 
 def check_latest_order():
     """Return the very latest observation. This should only return 1 record."""
@@ -112,25 +154,30 @@ def check_db_size():
     query = f'''
     from(bucket:"{INFLUXDB_BUCKET}")
     |> range(start: 0)
-    |> filter(fn: (r) => r._measurement == "orderbook")
+    |> filter(fn: (r) => r._measurement == "orderbook" and r._field == "bid1_price")
     |> count()
     '''
     
     result = query_api.query(query)
     
+    # one field per point, so the count is of points rather than of values
     total_points = sum(record.values["_value"] for table in result for record in table.records)
     
     print(f"Total number of data points: {total_points}")
-    
-    # Estimate size (very rough estimate, actual size may vary)
-    estimated_size_bytes = total_points * 100  # Assume average of 100 bytes per point
-    estimated_size_mb = estimated_size_bytes / (1024 * 1024)
-    
-    print(f"Estimated database size: {estimated_size_mb:.2f} MB")
+
+    # a point is exactly one fixed-width record in the local tick store
+    record_size = record_dtype(MAX_LEVELS).itemsize
+    print(f"Size as a local tick store: {total_points * record_size / 2**20:.2f} MB ({record_size} bytes per point)")
+    if TICK_STORE:
+        records, size = TickStore(TICK_STORE).stats()
+        print(f"Tick store in {TICK_STORE}: {records} points in {size / 2**20:.2f} MB")
     print(f"  Calculated in: {(time.time() - start_time)*1000:,.0f}ms")
 
 if __name__ == "__main__":
-    timestamps, bids, asks = parse_data()
+    spread_stats()
+    if TICK_STORE:
+        store_spread_stats()
+    timestamps, bids, asks = plot_data()
     check_db_size()
     check_latest_order()
     save_plot(timestamps, bids, asks)
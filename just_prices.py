@@ -1,15 +1,17 @@
+import asyncio
 import logging
 import os
-import time
-from decimal import Decimal
-from typing import Dict, List
+import sys
 
 from dotenv import load_dotenv
-from influxdb_client import InfluxDBClient, Point
+from influxdb_client import InfluxDBClient
 from influxdb_client.client.write_api import SYNCHRONOUS
 
-from hundred_x.client import HundredXClient
+from hundred_x.async_client import AsyncHundredXClient
+from hundred_x.collector import DepthCollector
 from hundred_x.enums import Environment
+from hundred_x.line_protocol import BatchWriter
+from hundred_x.tick_store import TickStore
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -22,63 +24,70 @@ INFLUXDB_ORG = os.getenv("INFLUXDB_ORG", "keks")
 INFLUXDB_USERNAME = os.getenv("INFLUXDB_USERNAME")
 INFLUXDB_PASSWORD = os.getenv("INFLUXDB_PASSWORD")
 INFLUXDB_BUCKET = os.getenv("INFLUXDB_BUCKET", "prices")
-PRIVATE_KEY = os.getenv("PRIVATE_KEY")
-SYMBOL = "ethperp"
+TICK_STORE = os.getenv("TICK_STORE")  # a directory to record to instead of InfluxDB
+SYMBOLS = sys.argv[1:] or None  # e.g. ethperp btcperp; every active product if none are given
 COLLECTION_INTERVAL_MILLISECONDS = 0
+SYMBOL_INTERVAL_MILLISECONDS = {}  # per-symbol overrides, e.g. {"ethperp": 100}
 MAX_LEVELS = 5  # Number of levels to store for each side of the orderbook
-SCALING_FACTOR = Decimal('1e18')
-d2 = Decimal("2")
+POOL_SIZE = 20  # connections shared by all symbols
 
 def setup_influxdb_client() -> InfluxDBClient:
     client = InfluxDBClient(url=INFLUXDB_URL, org=INFLUXDB_ORG, username=INFLUXDB_USERNAME, password=INFLUXDB_PASSWORD)
-    
+
     buckets_api = client.buckets_api()
     if INFLUXDB_BUCKET not in [bucket.name for bucket in buckets_api.find_buckets().buckets]:
         logger.info(f"Creating bucket: {INFLUXDB_BUCKET}")
         buckets_api.create_bucket(bucket_name=INFLUXDB_BUCKET, org=INFLUXDB_ORG)
-    
-    return client
 
-def setup_hundredx_client() -> HundredXClient:
-    client = HundredXClient(env=Environment.PROD, private_key=PRIVATE_KEY, subaccount_id=0)
-    client.login()
     return client
 
-def process_depth(depth: Dict[str, List[List[str]]]) -> Point:
-    point = Point("orderbook")
-    point.tag("symbol", SYMBOL)
+async def collect(writer: BatchWriter | None, store: TickStore | None = None):
+    intervals = {symbol: ms / 1000 for symbol, ms in SYMBOL_INTERVAL_MILLISECONDS.items()}
+    async with AsyncHundredXClient(env=Environment.PROD, pool_size=POOL_SIZE) as hundredx_client:
+        collector = DepthCollector(
+            hundredx_client,
+            writer,
+            SYMBOLS,
+            interval=COLLECTION_INTERVAL_MILLISECONDS / 1000,
+            intervals=intervals,
+            levels=MAX_LEVELS,
+            store=store,
+        )
+        try:
+            await collector.run()
+        finally:
+            for symbol, stats in collector.stats.items():
+                logger.info(f"{symbol}: {stats.samples} samples, {stats.errors} errors")
 
-    for side in ['bids', 'asks']:
-        for i, (price, amount, _) in enumerate(depth[side][:MAX_LEVELS], start=1):
-            price_scaled = float(Decimal(price) / SCALING_FACTOR)
-            amount_scaled = float(Decimal(amount) / SCALING_FACTOR)
-            point.field(f"{side[:-1]}{i}_price", price_scaled)
-            point.field(f"{side[:-1]}{i}_amount", amount_scaled)
-    return point
+def record_locally():
+    logger.info(f"Recording to the tick store in {TICK_STORE}...")
+    with TickStore(TICK_STORE, levels=MAX_LEVELS) as store:
+        try:
+            asyncio.run(collect(None, store))
+        except KeyboardInterrupt:
+            logger.info("Shutting down...")
+    records, size = store.stats()
+    logger.info(f"Tick store holds {records} points in {size / 2**20:.2f} MB")
 
 def main():
+    if TICK_STORE:
+        record_locally()
+        return
+
     influx_client = setup_influxdb_client()
     write_api = influx_client.write_api(write_options=SYNCHRONOUS)
-    hundredx_client = setup_hundredx_client()
+    # lines are written in batches from a background thread; add() blocks only if the database falls far behind
+    writer = BatchWriter(lambda lines: write_api.write(INFLUXDB_BUCKET, INFLUXDB_ORG, lines))
 
     logger.info("Starting data collection...")
 
     try:
-        while True:
-            try:
-                start_time = time.time()
-                depth = hundredx_client.get_depth(SYMBOL, granularity=5, limit=MAX_LEVELS)
-                point = process_depth(depth)
-                write_api.write(INFLUXDB_BUCKET, INFLUXDB_ORG, point)
-                logger.info(f"Orderbook data point written for {SYMBOL} in {(time.time() - start_time)*1000:.0f} ms")
-            except Exception as e:
-                logger.error(f"Error collecting or writing data: {e}")
-
-            if COLLECTION_INTERVAL_MILLISECONDS > 0:
-                time.sleep(COLLECTION_INTERVAL_MILLISECONDS/1000)
+        asyncio.run(collect(writer))
     except KeyboardInterrupt:
         logger.info("Shutting down...")
     finally:
+        writer.close()
+        logger.info(f"Wrote {writer.written} points in {writer.batches} batches, dropped {writer.dropped}")
         influx_client.close()
         logger.info("Data collection stopped.")
 
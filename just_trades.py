@@ -1,6 +1,5 @@
 import os
 import time
-from decimal import Decimal, getcontext
 
 import pandas as pd
 import seaborn as sns
@@ -8,6 +7,7 @@ from dotenv import load_dotenv
 from matplotlib import pyplot as plt
 from tabulate import tabulate
 
+from hundred_x.arrays import trades_array
 from hundred_x.client import HundredXClient
 from hundred_x.enums import Environment
 
@@ -16,15 +16,12 @@ load_dotenv()
 def format_value(value, column):
     if isinstance(value, str):
         return value[:7]  # Truncate strings to 7 characters
-    elif isinstance(value, Decimal):
+    elif isinstance(value, float):
         return f'{value:.1%}' if "Share" in column else f'{value:.2f}'
     elif isinstance(value, int):
         return str(value)
     return str(value)
 
-getcontext().prec = 70
-de18 = Decimal(1e18)
-
 SYMBOL = "ethperp"
 SUBACCOUNT_ID = 0
 PRIVATE_KEY = os.environ.get("PRIVATE_KEY")
@@ -44,8 +41,10 @@ while True:
         trades = trade_history["trades"]
 
         df = pd.DataFrame(trades)
-        df['price'] = df['price'].apply(lambda x: Decimal(x)/de18)
-        df['quantity'] = df['quantity'].apply(lambda x: Decimal(x)/de18)
+        # decode every price and quantity in one pass instead of a Decimal per cell
+        decoded = trades_array(trades)
+        df['price'] = decoded['price']
+        df['quantity'] = decoded['quantity']
 
         earliest_trade = df['createdAt'].min()
         earliest_trade_human_readable = pd.to_datetime(earliest_trade, unit='ms').strftime('%Y-%m-%d %H:%M:%S')
@@ -58,6 +57,8 @@ while True:
         previous_results = pd.DataFrame()
         if os.path.exists(f"{SYMBOL}.parquet"):
             previous_results = pd.read_parquet(f"{SYMBOL}.parquet")
+            # older files stored Decimal objects
+            previous_results[['price', 'quantity']] = previous_results[['price', 'quantity']].astype(float)
         merged_results = pd.concat([previous_results, df])
         merged_results = merged_results.drop_duplicates()
         merged_results.to_parquet(f"{SYMBOL}.parquet")
@@ -0,0 +1,88 @@
+"""Timing helpers and the machine-readable report of the benchmark suite."""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of a sorted list."""
+    return ordered[max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))]
+
+
+def latencies(func: Callable[[], Any], calls: int, warmup: int = 10) -> Dict[str, float]:
+    """Time ``calls`` calls one by one and return the latency distribution in microseconds."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        "calls": calls,
+        "mean_us": statistics.fmean(samples),
+        "p50_us": percentile(samples, 0.5),
+        "p99_us": percentile(samples, 0.99),
+        "max_us": samples[-1],
+    }
+
+
+def throughput(func: Callable[[], Any], calls: int, repeat: int = 5) -> Dict[str, float]:
+    """Run ``calls`` calls ``repeat`` times and return the best rate, in calls per second."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return {"calls": calls, "per_second": calls / best, "us_per_call": best / calls * 1e6}
+
+
+def _commit() -> str | None:
+    """Return the checked out commit, if this is a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class BenchReport:
+    """Collects benchmark results and writes them as one JSON document."""
+
+    def __init__(self):
+        """Start with no results."""
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, name: str, **values: Any):
+        """Record the values of one benchmark and print them."""
+        self.results[name] = values
+        shown = ", ".join(
+            f"{key}={value:,.1f}" if isinstance(value, float) else f"{key}={value}" for key, value in values.items()
+        )
+        print(f"{name}: {shown}")
+
+    def document(self) -> Dict[str, Any]:
+        """Return the results with the environment they were measured in."""
+        return {
+            "timestamp": time.time(),
+            "commit": _commit(),
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "results": self.results,
+        }
+
+    def write(self, path: str):
+        """Write the report to ``path``."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.document(), f, indent=2, sort_keys=True)
+            f.write("\n")
@@ -0,0 +1,53 @@
+"""Shared fixtures for the tests."""
+
+import pytest
+
+from hundred_x.async_client import AsyncHundredXClient
+from hundred_x.client import HundredXClient
+from hundred_x.constants import APIS
+from hundred_x.enums import ApiType, Environment
+from tests.bench import BenchReport
+from tests.stub_server import StubServer
+from tests.test_data import TEST_PRIVATE_KEY
+
+
+def pytest_addoption(parser):
+    """Add the option naming the benchmark report file."""
+    parser.addoption(
+        "--bench-json",
+        default="bench_results.json",
+        help="where '-m bench' writes its results as JSON (default: bench_results.json)",
+    )
+
+
+@pytest.fixture(scope="session")
+def bench_report(request):
+    """Collect benchmark results and write them as JSON once the session ends."""
+    report = BenchReport()
+    yield report
+    if report.results:
+        report.write(request.config.getoption("--bench-json"))
+
+
+@pytest.fixture
+def stub_server():
+    """Run a local stub of the REST API for the duration of a test."""
+    with StubServer() as server:
+        yield server
+
+
+@pytest.fixture
+def stub_client(stub_server, monkeypatch):
+    """Return a client pointed at the stub server through the devnet URLs."""
+    monkeypatch.setitem(APIS[Environment.DEVNET], ApiType.REST, stub_server.url)
+    monkeypatch.setitem(APIS[Environment.DEVNET], ApiType.WEBSOCKET, stub_server.url)
+    with HundredXClient(env=Environment.DEVNET, private_key=TEST_PRIVATE_KEY, subaccount_id=1) as client:
+        yield client
+
+
+@pytest.fixture
+def async_client(stub_server, monkeypatch):
+    """Return an async client pointed at the stub server; tests open it with ``async with`` in their loop."""
+    monkeypatch.setitem(APIS[Environment.DEVNET], ApiType.REST, stub_server.url)
+    monkeypatch.setitem(APIS[Environment.DEVNET], ApiType.WEBSOCKET, stub_server.url)
+    return AsyncHundredXClient(env=Environment.DEVNET, private_key=TEST_PRIVATE_KEY, subaccount_id=1)
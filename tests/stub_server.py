@@ -0,0 +1,133 @@
+"""A local stand-in for the 100x REST API, used by the offline tests and benchmarks."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from tests.test_data import DEPTH_RESPONSE, OPEN_ORDERS_RESPONSE, PRODUCTS_RESPONSE, TRADE_HISTORY_RESPONSE
+
+
+def _new_order(request: Dict[str, Any]) -> Tuple[int, Any]:
+    """Echo a submitted order back with an id, the way the exchange does."""
+    order = request["body"].get("newOrder", request["body"])
+    return 200, {**order, "id": "0x" + f"{int(order.get('nonce', 0)):064x}"}
+
+
+DEFAULT_ROUTES: Dict[Tuple[str, str], Any] = {
+    ("GET", "/v1/products"): PRODUCTS_RESPONSE,
+    ("GET", "/v1/products/ethperp"): PRODUCTS_RESPONSE[0],
+    ("GET", "/v1/depth"): DEPTH_RESPONSE,
+    ("GET", "/v1/trade-history"): TRADE_HISTORY_RESPONSE,
+    ("GET", "/v1/time"): {"serverTime": 1711722371000},
+    ("GET", "/v1/ticker/24hr"): [{"productSymbol": "ethperp"}],
+    ("GET", "/v1/openOrders"): OPEN_ORDERS_RESPONSE,
+    ("GET", "/v1/orders"): OPEN_ORDERS_RESPONSE,
+    ("GET", "/v1/balances"): [{"asset": "USDB", "quantity": "1000000000000000000000"}],
+    ("GET", "/v1/positionRisk"): [],
+    ("GET", "/v1/approved-signers"): [],
+    ("GET", "/v1/session/status"): {"status": "success"},
+    ("GET", "/v1/session/logout"): {"status": "success"},
+    ("POST", "/v1/session/login"): {"value": "stub-session"},
+    ("POST", "/v1/referral/add-referee"): {},
+    ("POST", "/v1/withdraw"): {"success": True},
+    ("POST", "/v1/order"): _new_order,
+    ("POST", "/v1/order/cancel-and-replace"): _new_order,
+    ("DELETE", "/v1/order"): {"success": True},
+    ("DELETE", "/v1/openOrders"): {"success": True},
+}
+
+
+class StubServer:
+    """Serve recorded payloads for the ``/v1/*`` routes from a background thread.
+
+    Route values are either the JSON payload to return, or a callable taking the parsed request and
+    returning ``(status, payload)``. ``latency`` adds a fixed delay (in seconds) to every response and
+    ``connect_latency`` to every new connection, standing in for the TCP and TLS handshakes.
+    """
+
+    def __init__(
+        self,
+        routes: Dict[Tuple[str, str], Any] | None = None,
+        latency: float = 0.0,
+        connect_latency: float = 0.0,
+    ):
+        """Bind the server to a free local port."""
+        self.routes = {**DEFAULT_ROUTES, **(routes or {})}
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.connections = 0
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        """Start serving."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        """Stop serving and release the port."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handle(self, method: str, path: str, query: str, body: bytes, content_type: str = "") -> Tuple[int, bytes]:
+        request = {
+            "method": method,
+            "path": path,
+            "params": parse_qs(query),
+            "body": json.loads(body) if body else {},
+            "content_type": content_type,
+        }
+        with self._lock:
+            self.requests.append(request)
+        if self.latency:
+            time.sleep(self.latency)
+        route = self.routes.get((method, path))
+        if route is None:
+            return 404, json.dumps({"error": f"no route for {method} {path}"}).encode()
+        status, payload = route(request) if callable(route) else (200, route)
+        return status, json.dumps(payload).encode()
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+                if stub.connect_latency:
+                    time.sleep(stub.connect_latency)
+
+            def _respond(self):
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                status, body = stub._handle(
+                    self.command, url.path, url.query, self.rfile.read(length), self.headers.get("Content-Type", "")
+                )
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_DELETE = _respond  # noqa: N815
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
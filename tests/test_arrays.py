@@ -0,0 +1,104 @@
+"""Tests for the hundred_x.arrays module."""
+
+from decimal import Decimal, localcontext
+
+import numpy as np
+import pytest
+
+from hundred_x.arrays import decode_amounts, depth_arrays, orders_array, trades_array
+from hundred_x.fixed_point import Fixed
+from tests.bench import throughput
+from tests.test_data import (
+    DEFAULT_SYMBOL,
+    DEPTH_RESPONSE,
+    OPEN_ORDERS_RESPONSE,
+    PRODUCTS_RESPONSE,
+    TRADE_HISTORY_RESPONSE,
+)
+
+TICK = int(PRODUCTS_RESPONSE[0]["increment"])
+LOT = int(PRODUCTS_RESPONSE[0]["minQuantity"])
+BENCH_ROUNDS = 200
+BENCH_REPEATS = 5
+
+
+def test_decode_amounts():
+    """Wei strings decode to human floats, or to whole ticks rounded down."""
+    values = ["3000100000000000000000", "1500000000000000000", "0"]
+    assert decode_amounts(values).tolist() == [3000.1, 1.5, 0.0]
+    ticks = decode_amounts(values, TICK)
+    assert ticks.dtype == np.int64
+    assert ticks.tolist() == [30001, 15, 0]
+    assert decode_amounts(["150000000000000001"], TICK).tolist() == [1]
+    assert decode_amounts([]).shape == (0,)
+
+
+def test_unknown_unit_is_rejected():
+    """A zero tick or lot, as for a product without ``minQuantity``, fails clearly instead of dividing by zero."""
+    with pytest.raises(ValueError, match="unit"):
+        decode_amounts(["1500000000000000000"], 0)
+
+
+def test_depth_arrays():
+    """Depth levels match the fixed point values, best level first."""
+    depth = depth_arrays(DEPTH_RESPONSE)
+    for side in ("bids", "asks"):
+        levels = DEPTH_RESPONSE[side]
+        assert len(depth[side]) == len(levels)
+        assert depth[side]["price"].tolist() == pytest.approx([float(Fixed.from_wei(level[0])) for level in levels])
+        assert depth[side]["size"].tolist() == pytest.approx([float(Fixed.from_wei(level[1])) for level in levels])
+    ticks = depth_arrays(DEPTH_RESPONSE, tick=TICK, lot=LOT)
+    assert ticks["bids"]["price"].tolist() == [int(level[0]) // TICK for level in DEPTH_RESPONSE["bids"]]
+    assert ticks["asks"]["size"].tolist() == [int(level[1]) // LOT for level in DEPTH_RESPONSE["asks"]]
+    assert len(depth_arrays({"bids": [], "asks": None})["asks"]) == 0
+
+
+def test_orders_array():
+    """Orders keep their id and side next to the decoded amounts."""
+    orders = orders_array(OPEN_ORDERS_RESPONSE, tick=TICK)
+    assert orders["id"].tolist() == [order["id"] for order in OPEN_ORDERS_RESPONSE]
+    assert orders["is_buy"].tolist() == [order["isBuy"] for order in OPEN_ORDERS_RESPONSE]
+    assert orders["price"].tolist() == [int(order["price"]) // TICK for order in OPEN_ORDERS_RESPONSE]
+    quantities = [float(Fixed.from_wei(order["quantity"])) for order in OPEN_ORDERS_RESPONSE]
+    assert orders["quantity"].tolist() == pytest.approx(quantities)
+    bids = orders[orders["is_buy"]]
+    assert Fixed.parse("2999.9") // Fixed(TICK) in bids["price"]
+
+
+def test_trades_array():
+    """Trades decode every row of a trade history."""
+    trades = TRADE_HISTORY_RESPONSE["trades"]
+    decoded = trades_array(trades)
+    assert len(decoded) == len(trades)
+    assert decoded["price"].tolist() == pytest.approx([float(Fixed.from_wei(trade["price"])) for trade in trades])
+    assert decoded["maker"][0] == trades[0]["makerAccount"]
+    assert decoded["created_at"][0] == trades[0]["createdAt"]
+
+
+def test_client_array_methods(stub_client):
+    """The client's array methods decode the same responses as the plain methods."""
+    depth = stub_client.get_depth_arrays(DEFAULT_SYMBOL, tick=TICK)
+    assert depth["bids"]["price"].tolist() == [int(level[0]) // TICK for level in DEPTH_RESPONSE["bids"]]
+    assert len(stub_client.get_open_orders_array(DEFAULT_SYMBOL)) == len(OPEN_ORDERS_RESPONSE)
+    assert len(stub_client.get_orders_array(DEFAULT_SYMBOL)) == len(OPEN_ORDERS_RESPONSE)
+    trades = stub_client.get_trade_history_array(DEFAULT_SYMBOL, lookback=10)
+    assert len(trades) == len(TRADE_HISTORY_RESPONSE["trades"])
+
+
+@pytest.mark.bench
+def test_bench_trade_history(bench_report):
+    """Scale a trade history: a Decimal per cell, as just_trades did, against one array decode."""
+    trades = TRADE_HISTORY_RESPONSE["trades"]
+    de18 = Decimal(1e18)
+
+    def decimal_scale():
+        with localcontext() as ctx:
+            ctx.prec = 70
+            [(Decimal(trade["price"]) / de18, Decimal(trade["quantity"]) / de18) for trade in trades]
+
+    bench_report.add("decimal_trade_history", **throughput(decimal_scale, BENCH_ROUNDS, BENCH_REPEATS))
+    bench_report.add("array_trade_history", **throughput(lambda: trades_array(trades), BENCH_ROUNDS, BENCH_REPEATS))
+    bench_report.add(
+        "array_depth_in_ticks",
+        **throughput(lambda: depth_arrays(DEPTH_RESPONSE, tick=TICK, lot=LOT), BENCH_ROUNDS, BENCH_REPEATS),
+    )
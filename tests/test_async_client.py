@@ -0,0 +1,57 @@
+"""Tests for the hundred_x.async_client module, run against the local stub server."""
+
+import asyncio
+
+import pytest
+
+from hundred_x.enums import OrderSide
+from tests.test_data import CANCEL_AND_REPLACE_ORDER, DEFAULT_SYMBOL, DEPTH_RESPONSE, OPEN_ORDERS_RESPONSE
+
+
+def test_construction_makes_no_requests(async_client, stub_server):
+    """Nothing is sent until the first awaited call."""
+    assert stub_server.requests == []
+
+
+def test_sync_context_manager_is_refused(async_client):
+    """``with`` cannot await the close, so only ``async with`` is accepted."""
+    with pytest.raises(TypeError, match="async with"):
+        with async_client:
+            pass
+
+
+def test_gather_shares_the_pool(async_client, stub_server):
+    """Concurrent reads return the same data as the sync client over one pool."""
+
+    async def run():
+        async with async_client:
+            await async_client.login()
+            return await asyncio.gather(
+                async_client.get_depth(DEFAULT_SYMBOL),
+                async_client.get_spot_balances(),
+                async_client.get_position(),
+                async_client.get_open_orders(DEFAULT_SYMBOL),
+            )
+
+    depth, balances, positions, orders = asyncio.run(run())
+    assert depth == DEPTH_RESPONSE
+    assert balances[0]["asset"] == "USDB"
+    assert positions == []
+    assert orders == OPEN_ORDERS_RESPONSE
+    paths = [request["path"] for request in stub_server.requests]
+    assert paths[:2] == ["/v1/referral/add-referee", "/v1/session/login"]
+    assert stub_server.connections <= async_client.pool_size
+
+
+def test_signed_order_matches_sync_client(async_client, stub_client, stub_server):
+    """Orders signed in the executor are identical to the ones the sync client sends."""
+    async_client._current_timestamp = stub_client._current_timestamp = lambda: 1711722373
+
+    async def run():
+        async with async_client:
+            return await async_client.cancel_and_replace_order(**CANCEL_AND_REPLACE_ORDER, order_id_to_cancel="0x1")
+
+    sent = asyncio.run(run())
+    expected = stub_client.cancel_and_replace_order(**CANCEL_AND_REPLACE_ORDER, order_id_to_cancel="0x1")
+    assert sent == expected
+    assert sent["isBuy"] is (CANCEL_AND_REPLACE_ORDER["side"] == OrderSide.BUY)
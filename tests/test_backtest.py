@@ -0,0 +1,153 @@
+"""Tests for the backtesting harness in hundred_x.backtest."""
+
+import random
+
+from hundred_x.backtest import Backtest, DepthEvent, TradeEvent, merge, ordered
+from hundred_x.engine import Quote, Strategy
+from hundred_x.enums import OrderSide
+from hundred_x.fixed_point import Fixed
+from hundred_x.products import Product
+from just_mm import JustMM
+from tests.test_data import PRODUCTS_RESPONSE
+
+PRODUCT = Product(PRODUCTS_RESPONSE[0])
+LATENCY = 10
+
+
+def wei(value) -> int:
+    """Return a human readable amount in wei."""
+    return int(Fixed.parse(value))
+
+
+def book(time, bid, ask, bid_size=1, ask_size=1):
+    """Return a one-level depth event."""
+    return DepthEvent(time, [(wei(bid), wei(bid_size))], [(wei(ask), wei(ask_size))])
+
+
+def trade(time, price, quantity, buyer_maker):
+    """Return a trade event."""
+    return TradeEvent(time, wei(price), wei(quantity), buyer_maker)
+
+
+class Join(Strategy):
+    """Join the best bid and ask with a fixed size, only while flat on that side."""
+
+    def quote(self, state, account):
+        """Quote the touch."""
+        bid, ask = state.book.best_bid, state.book.best_ask
+        quotes = []
+        if state.position <= 0:
+            quotes.append(Quote(OrderSide.BUY, bid[0], "0.5"))
+        if state.position >= 0:
+            quotes.append(Quote(OrderSide.SELL, ask[0], "0.5"))
+        return quotes
+
+
+def run(*events):
+    """Run ``Join`` over the events and return the backtest."""
+    backtest = Backtest(Join(), PRODUCT, latency=LATENCY)
+    backtest.run(events)
+    return backtest
+
+
+def test_queue_position():
+    """A joined level fills only once the size ahead of the order has traded."""
+    backtest = run(
+        book(0, 3000, 3001),
+        book(LATENCY, 3000, 3001),
+        trade(20, 3000, "0.6", True),
+        trade(30, 3000, "0.6", True),
+    )
+    result = backtest.result
+    assert result.orders == 2
+    assert result.fills == 1
+    assert result.position == wei("0.2")
+    assert backtest.live[(True, 0)].ahead == 0
+    assert backtest.live[(True, 0)].remaining == wei("0.3")
+
+
+def test_trades_through_and_crossed_books_fill():
+    """Trades through the price fill at once, and a book that crosses the order fills the rest of it."""
+    result = run(
+        book(0, 3000, 3001),
+        book(LATENCY, 3000, 3001),
+        trade(20, "3001.5", "0.2", False),
+        book(25, "3001.5", 3002),
+    ).result
+    assert result.fills == 2
+    assert result.position == -wei("0.5")
+    assert result.cash == wei(3001) * wei("0.5") // 10**18
+    assert result.mark == wei("3001.75")
+    assert result.fill_rate == 0.5
+
+
+class Ladder(Strategy):
+    """Bid at the best bid and one dollar below it."""
+
+    def quote(self, state, account):
+        """Quote two bid levels."""
+        bid = state.book.best_bid[0]
+        return [Quote(OrderSide.BUY, bid, "0.5"), Quote(OrderSide.BUY, bid - 1, "0.5")]
+
+
+def test_ladder_levels_fill_best_price_first():
+    """Each quote on a side rests as its own level, and a trade through both fills the better one first."""
+    backtest = Backtest(Ladder(), PRODUCT, latency=LATENCY)
+    result = backtest.run([book(0, 3000, 3001), book(LATENCY, 3000, 3001), trade(20, 2998, "0.7", True)])
+    assert result.orders == 2
+    assert result.position == wei("0.7")
+    assert backtest.live[(True, 1)].remaining == wei("0.3")
+    assert (True, 0) not in backtest.live
+    assert list(backtest.state.resting) == [(OrderSide.BUY, 1)]
+
+
+class Cross(Strategy):
+    """Bid at the best ask."""
+
+    def quote(self, state, account):
+        """Quote the ask as a bid."""
+        return [Quote(OrderSide.BUY, state.book.best_ask[0], "0.5")]
+
+
+def test_latency_and_post_only():
+    """Quotes miss trades before they arrive, and quotes that would cross on arrival are rejected."""
+    result = run(book(0, 3000, 3001), trade(5, 3000, 5, True), trade(LATENCY, 3000, 5, True)).result
+    assert result.fills == 1
+    assert result.position == wei("0.5")
+    backtest = Backtest(Cross(), PRODUCT, latency=LATENCY)
+    result = backtest.run([book(0, 3000, 3001), book(LATENCY, 3000, 3001)])
+    assert (result.orders, result.rejected) == (0, 1)
+    assert backtest.pending[(True, 0)][0] == 2 * LATENCY
+
+
+def test_ordered_and_merge():
+    """Sources are put back in time order within the window and merged by time."""
+    rng = random.Random(1)
+    times = list(range(100))
+    shuffled = [times[i:i + 10][::-1] for i in range(0, 100, 10)]
+    trades = [trade(t, 3000, 1, True) for chunk in shuffled for t in chunk]
+    books = [book(t, 3000, 3001) for t in sorted(rng.sample(range(100), 20))]
+    assert [event.time for event in ordered(trades, 10)] == times
+    merged = [event.time for event in merge(ordered(trades, 10), books)]
+    assert merged == sorted(merged) and len(merged) == 120
+
+
+def test_just_mm_backtest():
+    """The ``just_mm`` strategy runs over a random walk and reports PnL, fills and inventory."""
+    rng = random.Random(0)
+    mid, events = 30000, []
+    for step in range(5000):
+        mid += rng.choice((-1, 0, 1))
+        spread = rng.choice((1, 2, 4))
+        events.append(DepthEvent(step * 100, [(mid * 10**17, wei(6))], [((mid + spread) * 10**17, wei(6))]))
+        if rng.random() < 0.3:
+            buyer_maker = rng.random() < 0.5
+            price = mid if buyer_maker else mid + spread
+            events.append(TradeEvent(step * 100 + 50, price * 10**17, wei(rng.choice(("0.5", 3, 8))), buyer_maker))
+    backtest = Backtest(JustMM(Fixed.parse("0.01"), Fixed.parse(1), verbose=False), PRODUCT)
+    summary = backtest.run(events).summary()
+    assert summary["events"] == len(events)
+    assert summary["fills"] > 0
+    assert 0 < summary["fill_rate"] <= 1
+    assert summary["max_position"] >= abs(summary["position"])
+    assert summary["mean_inventory"] <= summary["max_position"]
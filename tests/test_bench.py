@@ -0,0 +1,207 @@
+"""Benchmark suite against the local stub server; run with ``pytest -m bench -s``.
+
+Every benchmark adds its numbers to the session's ``bench_report``, which is written as JSON to
+``--bench-json`` (``bench_results.json`` by default) so runs can be compared between releases.
+"""
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from hundred_x.arrays import depth_arrays
+from hundred_x.async_client import AsyncHundredXClient
+from hundred_x.backtest import Backtest, DepthEvent, TradeEvent
+from hundred_x.client import HundredXClient
+from hundred_x.constants import APIS
+from hundred_x.enums import ApiType, Environment, OrderSide, OrderType, TimeInForce
+from hundred_x.fixed_point import Fixed
+from hundred_x.order_book import OrderBook
+from hundred_x.products import Product
+from hundred_x.simulator import MatchingEngine, Simulator
+from hundred_x.tick_store import TickStore, decode
+from just_mm import JustMM
+from tests.bench import latencies, throughput
+from tests.stub_server import StubServer
+from tests.test_data import (
+    DEFAULT_SYMBOL,
+    DEPTH_RESPONSE,
+    PRODUCTS_RESPONSE,
+    TEST_ADDRESS,
+    TEST_ORDER,
+    TEST_PRIVATE_KEY,
+)
+
+# Server-side delays the latency benchmarks run at, in seconds: none, then a nearby exchange.
+LATENCIES = (0.0, 0.001)
+ASYNC_REQUESTS = 400
+
+
+@pytest.fixture
+def devnet(monkeypatch):
+    """Return a function that points the devnet URLs at a stub server."""
+
+    def point(server: StubServer):
+        monkeypatch.setitem(APIS[Environment.DEVNET], ApiType.REST, server.url)
+        monkeypatch.setitem(APIS[Environment.DEVNET], ApiType.WEBSOCKET, server.url)
+
+    return point
+
+
+@pytest.mark.bench
+def test_bench_signing(stub_client, bench_report):
+    """Orders signed per second, from the struct fields and end to end through ``_order_message``."""
+    stub_client.warmup(login=False)
+    message_class, fields = stub_client.order_intent(1, 1002, 1, 3000, OrderSide.BUY, OrderType.LIMIT, TimeInForce.GTC)
+    bench_report.add(
+        "sign_order", **throughput(lambda: stub_client.generate_and_sign_message(message_class, **fields), 500)
+    )
+    bench_report.add(
+        "build_and_sign_order",
+        **throughput(
+            lambda: stub_client._order_message(1, 1002, 1, 3000, OrderSide.BUY, OrderType.LIMIT, TimeInForce.GTC),
+            500,
+        ),
+    )
+
+
+@pytest.mark.bench
+@pytest.mark.parametrize("latency", LATENCIES)
+def test_bench_create_order(latency, devnet, bench_report):
+    """End-to-end ``create_order`` latency: sign, send, wait for the stub and decode."""
+    with StubServer(latency=latency) as server:
+        devnet(server)
+        with HundredXClient(env=Environment.DEVNET, private_key=TEST_PRIVATE_KEY, subaccount_id=1) as client:
+            client.warmup()
+            result = latencies(lambda: client.create_order(**TEST_ORDER), 300)
+    bench_report.add(f"create_order[latency={latency * 1000:g}ms]", **result)
+
+
+@pytest.mark.bench
+def test_bench_depth(stub_client, bench_report):
+    """Depth fetch and parse: the request alone, into an ``OrderBook`` and into arrays, then parsing only."""
+    stub_client.get_depth(DEFAULT_SYMBOL)
+    bench_report.add("get_depth", **latencies(lambda: stub_client.get_depth(DEFAULT_SYMBOL), 500))
+    bench_report.add("get_order_book", **latencies(lambda: stub_client.get_order_book(DEFAULT_SYMBOL), 500))
+    bench_report.add("get_depth_arrays", **latencies(lambda: stub_client.get_depth_arrays(DEFAULT_SYMBOL), 500))
+    book = OrderBook(DEFAULT_SYMBOL)
+    bench_report.add("parse_depth_order_book", **throughput(lambda: book.apply_snapshot(DEPTH_RESPONSE), 2000))
+    bench_report.add("parse_depth_arrays", **throughput(lambda: depth_arrays(DEPTH_RESPONSE), 2000))
+
+
+@pytest.mark.bench
+def test_bench_client_construction(stub_server, devnet, bench_report):
+    """Cost of building and closing a client, without a key and with one."""
+    devnet(stub_server)
+
+    def build(**kwargs):
+        HundredXClient(env=Environment.DEVNET, subaccount_id=1, lazy=True, **kwargs).close()
+
+    bench_report.add("client_construction", **throughput(build, 100))
+    bench_report.add("client_construction_with_key", **throughput(lambda: build(private_key=TEST_PRIVATE_KEY), 100))
+
+
+@pytest.mark.bench
+@pytest.mark.parametrize("latency", LATENCIES)
+def test_bench_async_throughput(latency, devnet, bench_report):
+    """Requests per second of the async client with every request in flight at once."""
+    with StubServer(latency=latency) as server:
+        devnet(server)
+        client = AsyncHundredXClient(env=Environment.DEVNET, private_key=TEST_PRIVATE_KEY, subaccount_id=1)
+
+        async def run():
+            async with client:
+                await client.warmup()
+                rates = {}
+                for name, call in (
+                    ("get_depth", lambda: client.get_depth(DEFAULT_SYMBOL)),
+                    ("create_order", lambda: client.create_order(**TEST_ORDER)),
+                ):
+                    await asyncio.gather(*(call() for _ in range(client.pool_size)))  # open the pool
+                    start = time.perf_counter()
+                    await asyncio.gather(*(call() for _ in range(ASYNC_REQUESTS)))
+                    rates[f"{name}_per_second"] = ASYNC_REQUESTS / (time.perf_counter() - start)
+                return rates
+
+        rates = asyncio.run(run())
+    bench_report.add(f"async_throughput[latency={latency * 1000:g}ms]", requests=ASYNC_REQUESTS, **rates)
+
+
+@pytest.mark.bench
+def test_bench_simulator(devnet, bench_report):
+    """Orders per second the simulator matches, in process and as signed requests from the async client."""
+    engine = MatchingEngine(verify_signatures=False)
+    tick, lot = 10**17, 10**16
+    sides = iter(range(10**9))
+
+    def place():
+        # Alternate resting bids a few ticks deep with asks that take the best of them.
+        n = next(sides)
+        engine.place(TEST_ADDRESS, n % 4, DEFAULT_SYMBOL, n % 2 == 0, 30000 * tick - (n % 2) * tick * 2, lot)
+
+    bench_report.add("simulator_match", **throughput(place, 5000))
+
+    with Simulator() as simulator:
+        devnet(simulator)
+        client = AsyncHundredXClient(env=Environment.DEVNET, private_key=TEST_PRIVATE_KEY, subaccount_id=1)
+
+        async def run():
+            async with client:
+                await client.login()
+                order = {**TEST_ORDER, "order_type": OrderType.LIMIT_MAKER}
+                await asyncio.gather(*(client.create_order(**order) for _ in range(client.pool_size)))
+                start = time.perf_counter()
+                await asyncio.gather(*(client.create_order(**order) for _ in range(ASYNC_REQUESTS)))
+                return ASYNC_REQUESTS / (time.perf_counter() - start)
+
+        rate = asyncio.run(run())
+        resting = len(simulator.engine.orders)
+    bench_report.add("simulator_signed_orders", requests=ASYNC_REQUESTS, per_second=rate, resting=resting)
+
+
+@pytest.mark.bench
+def test_bench_backtest(bench_report):
+    """Events per second replayed through ``just_mm`` by the backtest, on a five-level random walk."""
+    rng = random.Random(0)
+    tick, size = 10**17, 6 * 10**18
+    mid, events = 30000, []
+    for step in range(100_000):
+        mid += rng.choice((-1, 0, 0, 0, 0, 1))
+        spread = rng.choice((1, 2, 2, 2, 4))
+        bids = [((mid - i) * tick, size) for i in range(5)]
+        asks = [((mid + spread + i) * tick, size) for i in range(5)]
+        events.append(DepthEvent(step * 100, bids, asks))
+        if rng.random() < 0.3:
+            buyer_maker = rng.random() < 0.5
+            price = (mid if buyer_maker else mid + spread) * tick
+            events.append(TradeEvent(step * 100 + 50, price, 10**18, buyer_maker))
+    strategy = JustMM(Fixed.parse("0.01"), Fixed.parse(1), verbose=False)
+    summary = Backtest(strategy, Product(PRODUCTS_RESPONSE[0])).run(events).summary()
+    bench_report.add(
+        "backtest_just_mm",
+        events=summary["events"],
+        per_second=summary["events_per_second"],
+        quotes=summary["quotes"],
+        fills=summary["fills"],
+    )
+
+
+@pytest.mark.bench
+def test_bench_tick_store(tmp_path, bench_report):
+    """Samples appended to the tick store per second, and records scanned and decoded per second."""
+    product = Product(PRODUCTS_RESPONSE[0])
+    depth = depth_arrays(DEPTH_RESPONSE, int(product.tick), int(product.lot))
+    clock = iter(range(10**9, 10**18, 10**6))
+    with TickStore(str(tmp_path)) as store:
+        append = throughput(lambda: store.append(product, next(clock), depth), 20_000)
+    records = sum(len(segment) for segment in store.segments(product.symbol))
+    start = time.perf_counter()
+    spreads = []
+    for chunk in store.read(product.symbol):
+        decoded = decode(chunk)
+        spreads.append(decoded["ask_price"][:, 0] - decoded["bid_price"][:, 0])
+    scan = time.perf_counter() - start
+    assert sum(map(len, spreads)) == records
+    bench_report.add("tick_store_append", **append)
+    bench_report.add("tick_store_scan", records=records, per_second=records / scan, bytes=store.stats()[1])
@@ -0,0 +1,92 @@
+"""Tests for the multi-symbol depth collector in hundred_x.collector."""
+
+import asyncio
+
+import pytest
+
+from hundred_x.async_client import AsyncHundredXClient
+from hundred_x.collector import DepthCollector
+from hundred_x.constants import APIS
+from hundred_x.enums import ApiType, Environment
+from hundred_x.line_protocol import BatchWriter
+from hundred_x.tick_store import TickStore
+from tests.stub_server import StubServer
+from tests.test_data import DEPTH_RESPONSE
+
+
+def depth(request):
+    """Serve the recorded depth, failing for ``brokenperp`` and with an empty book for ``emptyperp``."""
+    if request["params"]["symbol"] == ["brokenperp"]:
+        return 500, {"error": "internal error"}
+    if request["params"]["symbol"] == ["emptyperp"]:
+        return 200, {"bids": [], "asks": []}
+    return 200, DEPTH_RESPONSE
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Run a stub server whose depth route fails for one symbol."""
+    with StubServer(routes={("GET", "/v1/depth"): depth}) as server:
+        monkeypatch.setitem(APIS[Environment.DEVNET], ApiType.REST, server.url)
+        monkeypatch.setitem(APIS[Environment.DEVNET], ApiType.WEBSOCKET, server.url)
+        yield server
+
+
+def collect(symbols, seconds, **kwargs):
+    """Run a collector for ``seconds`` and return it with the lines it wrote."""
+    batches = []
+
+    async def run():
+        async with AsyncHundredXClient(env=Environment.DEVNET, max_retries=0) as client:
+            async with DepthCollector(client, writer, symbols, **kwargs) as collector:
+                await asyncio.sleep(seconds)
+            return collector
+
+    with BatchWriter(batches.append, flush_interval=0.05) as writer:
+        collector = asyncio.run(run())
+    return collector, [line for batch in batches for line in batch]
+
+
+def test_symbols_are_isolated_and_tagged(server):
+    """Each symbol keeps its own interval, and a failing symbol does not stop the others."""
+    collector, lines = collect(
+        ["ethperp", "blastperp", "brokenperp"], 0.5, interval=0.02, intervals={"blastperp": 0.2}, levels=2
+    )
+    stats = collector.stats
+    assert stats["ethperp"].samples >= 10
+    assert 2 <= stats["blastperp"].samples <= 4
+    assert stats["brokenperp"].samples == 0
+    assert 1 <= stats["brokenperp"].errors <= 2
+    tagged = {symbol: [line for line in lines if line.startswith(f"orderbook,symbol={symbol} ")] for symbol in stats}
+    assert len(tagged["ethperp"]) == stats["ethperp"].samples
+    assert len(tagged["blastperp"]) == stats["blastperp"].samples
+    assert "bid2_price=" in tagged["ethperp"][0] and "bid3_price" not in tagged["ethperp"][0]
+
+
+def test_empty_books_are_skipped(server):
+    """A book with no levels on either side is counted as an error and not written."""
+    collector, lines = collect(["emptyperp"], 0.1, interval=0.02)
+    assert collector.stats["emptyperp"].samples == 0
+    assert "empty" in str(collector.stats["emptyperp"].last_error)
+    assert lines == []
+
+
+def test_all_products(server):
+    """Without symbols every active product is collected."""
+    collector, _ = collect(None, 0.1)
+    assert collector.symbols == ["ethperp", "blastperp"]
+    assert all(stats.samples >= 1 for stats in collector.stats.values())
+
+
+def test_record_to_tick_store(server, tmp_path):
+    """Samples go to a local tick store without a writer."""
+
+    async def run():
+        async with AsyncHundredXClient(env=Environment.DEVNET) as client:
+            async with DepthCollector(client, symbols=["ethperp"], interval=0.02, store=store) as collector:
+                await asyncio.sleep(0.2)
+            return collector
+
+    with TickStore(str(tmp_path)) as store:
+        collector = asyncio.run(run())
+    assert store.stats("ethperp")[0] == collector.stats["ethperp"].samples > 0
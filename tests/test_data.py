@@ -61,4 +61,96 @@ TEST_MARKET_SELL = {
     "side": OrderSide.SELL,
     "order_type": OrderType.MARKET,
     "time_in_force": TimeInForce.GTC,
-}
\ No newline at end of file
+}
+
+# Recorded responses served by the local stub server.
+DEPTH_RESPONSE = {
+    "bids": [
+        ["3000100000000000000000", "1500000000000000000", "1"],
+        ["3000000000000000000000", "6200000000000000000", "3"],
+        ["2999900000000000000000", "2000000000000000000", "1"],
+        ["2999800000000000000000", "8000000000000000000", "2"],
+        ["2999500000000000000000", "12000000000000000000", "4"],
+    ],
+    "asks": [
+        ["3000300000000000000000", "500000000000000000", "1"],
+        ["3000400000000000000000", "5500000000000000000", "2"],
+        ["3000600000000000000000", "1000000000000000000", "1"],
+        ["3000700000000000000000", "9000000000000000000", "3"],
+        ["3001000000000000000000", "20000000000000000000", "5"],
+    ],
+}
+
+PRODUCTS_RESPONSE = [
+    {
+        "id": 1002,
+        "productType": "PERP",
+        "symbol": "ethperp",
+        "baseAsset": "ETH",
+        "quoteAsset": "USDB",
+        "increment": "100000000000000000",
+        "minQuantity": "10000000000000000",
+        "maxQuantity": "1000000000000000000000",
+        "isActive": True,
+    },
+    {
+        "id": 1006,
+        "productType": "PERP",
+        "symbol": "blastperp",
+        "baseAsset": "BLAST",
+        "quoteAsset": "USDB",
+        "increment": "10000000000000",
+        "minQuantity": "1000000000000000000",
+        "maxQuantity": "10000000000000000000000000",
+        "isActive": True,
+    },
+]
+
+TRADE_HISTORY_RESPONSE = {
+    "trades": [
+        {
+            "id": f"0x{i:064x}",
+            "productId": 1002,
+            "price": f"{3000 + i % 7}{i % 10}00000000000000000",
+            "quantity": f"{(i % 5) + 1}0000000000000000",
+            "isBuyerMaker": bool(i % 2),
+            "makerAccount": "0xEEF7faba495b4875d67E3ED8FB3a32433d3DB3b3",
+            "takerAccount": "0x1111111111111111111111111111111111111111",
+            "createdAt": 1711722371000 + i * 250,
+        }
+        for i in range(500)
+    ]
+}
+
+OPEN_ORDERS_RESPONSE = [
+    {
+        "id": "0x" + "ab" * 32,
+        "account": TEST_ADDRESS,
+        "subAccountId": 1,
+        "productId": 1002,
+        "productSymbol": "ethperp",
+        "isBuy": True,
+        "orderType": 1,
+        "timeInForce": 0,
+        "price": "2999900000000000000000",
+        "quantity": "10000000000000000",
+        "residualQuantity": "10000000000000000",
+        "status": "OPEN",
+        "createdAt": 1711722371000,
+    },
+    {
+        "id": "0x" + "cd" * 32,
+        "account": TEST_ADDRESS,
+        "subAccountId": 1,
+        "productId": 1002,
+        "productSymbol": "ethperp",
+        "isBuy": False,
+        "orderType": 1,
+        "timeInForce": 0,
+        "price": "3000400000000000000000",
+        "quantity": "10000000000000000",
+        "residualQuantity": "10000000000000000",
+        "status": "OPEN",
+        "createdAt": 1711722371000,
+    },
+]
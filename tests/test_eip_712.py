@@ -0,0 +1,81 @@
+"""Tests for the hundred_x.eip_712 module."""
+
+import time
+
+import pytest
+from eth_account import Account
+from eth_account.messages import encode_structured_data
+from eth_keys import keys
+
+from hundred_x.eip_712 import CancelOrder, CancelOrders, LoginMessage, Order, Referral, StructSigner, Withdraw
+from tests.test_data import TEST_ADDRESS, TEST_ORDER, TEST_PRIVATE_KEY
+
+ORDER_FIELDS = {
+    "account": TEST_ADDRESS,
+    "subAccountId": TEST_ORDER["subaccount_id"],
+    "productId": TEST_ORDER["product_id"],
+    "isBuy": TEST_ORDER["side"].value,
+    "orderType": TEST_ORDER["order_type"].value,
+    "timeInForce": TEST_ORDER["time_in_force"].value,
+    "expiration": 1711722373000 + 1000,
+    "price": 3000130000000000000000,
+    "quantity": 4000730000000000000000,
+    "nonce": 1711722373000,
+}
+MESSAGES = [
+    (Order, ORDER_FIELDS),
+    (Order, {**ORDER_FIELDS, "isBuy": False, "price": 2**128 - 1}),
+    (CancelOrder, {"account": TEST_ADDRESS, "subAccountId": 1, "productId": 1002, "orderId": "0x" + "ab" * 32}),
+    (CancelOrders, {"account": TEST_ADDRESS, "subAccountId": 255, "productId": 1006}),
+    (
+        Withdraw,
+        {"account": TEST_ADDRESS, "subAccountId": 1, "asset": TEST_ADDRESS.lower(), "quantity": 10**20, "nonce": 1},
+    ),
+    (LoginMessage, {"account": TEST_ADDRESS, "message": "I would like to login to 100x finance.", "timestamp": 1}),
+    (Referral, {"account": TEST_ADDRESS, "code": "wakamex"}),
+]
+
+
+def sign_reference(wallet, domain, message_class, **kwargs):
+    """Sign by building the struct and encoding the full typed-data message."""
+    message = message_class(**kwargs).to_message(domain)
+    signed = wallet.sign_message(encode_structured_data(message))
+    message["message"]["signature"] = signed.signature.hex()
+    return message["message"]
+
+
+@pytest.mark.parametrize("message_class,fields", MESSAGES)
+def test_compiled_signature_is_identical(stub_client, message_class, fields):
+    """The compiled signer returns the same message and signature as the full encoding."""
+    wallet = Account.from_key(TEST_PRIVATE_KEY)
+    expected = sign_reference(wallet, stub_client.domain, message_class, **fields)
+    signer = StructSigner(message_class, stub_client.domain)
+    assert signer.sign(keys.PrivateKey(bytes(wallet.key)), **fields) == expected
+    assert stub_client.generate_and_sign_message(message_class, **fields) == expected
+
+
+def test_missing_and_out_of_range_fields(stub_client):
+    """Invalid values are rejected rather than signed."""
+    signer = StructSigner(Order, stub_client.domain)
+    with pytest.raises(ValueError, match="expiration"):
+        signer.hash_struct({**ORDER_FIELDS, "expiration": None})
+    with pytest.raises(ValueError, match="uint128"):
+        signer.hash_struct({**ORDER_FIELDS, "price": 2**128})
+
+
+@pytest.mark.bench
+def test_bench_order_signing(stub_client, bench_report):
+    """Compare orders signed per second with and without the precomputed hashes."""
+    wallet = Account.from_key(TEST_PRIVATE_KEY)
+    signer = StructSigner(Order, stub_client.domain)
+    private_key = keys.PrivateKey(bytes(wallet.key))
+    count = 200
+    start = time.perf_counter()
+    for nonce in range(count):
+        sign_reference(wallet, stub_client.domain, Order, **{**ORDER_FIELDS, "nonce": nonce})
+    before = count / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for nonce in range(count):
+        signer.sign(private_key, **{**ORDER_FIELDS, "nonce": nonce})
+    after = count / (time.perf_counter() - start)
+    bench_report.add("order_signing", calls=count, reference_per_second=before, precomputed_per_second=after)
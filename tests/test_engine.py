@@ -0,0 +1,270 @@
+"""Tests for the hundred_x.engine module, run against the local stub server."""
+
+import asyncio
+
+from hundred_x.engine import Quote, QuotingEngine, Strategy
+from hundred_x.enums import OrderSide, OrderType, TimeInForce
+from hundred_x.exceptions import APIError
+from hundred_x.fixed_point import Fixed
+from hundred_x.stream import HundredXStream
+from tests.test_data import DEFAULT_SYMBOL, OPEN_ORDERS_RESPONSE
+
+SIZE = Fixed.parse("0.01")
+# Removes the best bid and ask, so both quotes move one tick out.
+PULL_TOUCH = {"type": "delta", "bids": [["3000100000000000000000", "0"]], "asks": [["3000300000000000000000", "0"]]}
+
+
+class Inside(Strategy):
+    """Quote one tick inside the touch, or only the sides listed in ``sides``, with ``levels`` ticks apart."""
+
+    def __init__(self, levels=1):
+        """Quote both sides."""
+        self.sides = (OrderSide.BUY, OrderSide.SELL)
+        self.levels = levels
+        self.errors = []
+
+    def quote(self, state, account):
+        """Quote one tick inside the best bid and ask, and further out for every extra level."""
+        tick = state.product.tick
+        prices = {OrderSide.BUY: state.book.best_bid[0] + tick, OrderSide.SELL: state.book.best_ask[0] - tick}
+        steps = {OrderSide.BUY: -tick, OrderSide.SELL: tick}
+        return [
+            Quote(side, prices[side] + level * steps[side], SIZE) for side in self.sides for level in range(self.levels)
+        ]
+
+    def on_error(self, state, side, exc):
+        """Record the error."""
+        self.errors.append(exc)
+
+
+def orders_sent(stub_server, start=0):
+    """Return the ``(method, path)`` of the order requests sent since ``start``."""
+    return [
+        (request["method"], request["path"])
+        for request in stub_server.requests[start:]
+        if request["path"].startswith("/v1/order")
+    ]
+
+
+async def settle(state):
+    """Wait until the product's quoter has handled every change."""
+    for _ in range(200):
+        await asyncio.sleep(0.005)
+        if not state.changed.is_set() and not state.lock.locked():
+            return
+    raise TimeoutError(f"{state!r} did not settle")
+
+
+def run_engine(client, strategy, steps, **kwargs):
+    """Start an engine without the stream, let it quote, run ``steps(engine, state)`` and stop it."""
+
+    async def run():
+        async with client:
+            engine = QuotingEngine(client, strategy, [DEFAULT_SYMBOL], use_stream=False, poll_interval=60, **kwargs)
+            await engine.start()
+            try:
+                state = engine.states[DEFAULT_SYMBOL]
+                await settle(state)
+                return await steps(engine, state)
+            finally:
+                await engine.stop()
+
+    return asyncio.run(run())
+
+
+def test_start_quotes_both_sides(async_client, stub_server):
+    """Starting clears the product's orders, then the quoter places the strategy's quotes."""
+    strategy = Inside()
+
+    async def steps(engine, state):
+        return dict(state.resting), state.position
+
+    resting, position = run_engine(async_client, strategy, steps)
+    assert strategy.errors == []
+    assert position == 0
+    assert resting[(OrderSide.BUY, 0)].quote == Quote(OrderSide.BUY, "3000.2", SIZE)
+    assert resting[(OrderSide.SELL, 0)].quote == Quote(OrderSide.SELL, "3000.2", SIZE)
+    requests = [(request["method"], request["path"]) for request in stub_server.requests]
+    assert requests.index(("DELETE", "/v1/openOrders")) < requests.index(("POST", "/v1/order"))
+    assert requests[-1] == ("DELETE", "/v1/openOrders")
+    assert requests.count(("POST", "/v1/order")) == 2
+
+
+def test_book_moves_replace_and_unchanged_books_are_quiet(async_client, stub_server):
+    """A book move replaces both quotes, an unchanged book sends nothing and a dropped side is cancelled."""
+    strategy = Inside()
+
+    async def steps(engine, state):
+        start = len(stub_server.requests)
+        await engine.requote(state)
+        quiet = orders_sent(stub_server, start)
+        engine.on_depth(f"{DEFAULT_SYMBOL}@depth", PULL_TOUCH)
+        await settle(state)
+        moved = orders_sent(stub_server, start)
+        strategy.sides = (OrderSide.SELL,)
+        start = len(stub_server.requests)
+        await engine.requote(state)
+        return quiet, moved, orders_sent(stub_server, start), dict(state.resting)
+
+    quiet, moved, dropped, resting = run_engine(async_client, strategy, steps)
+    assert quiet == []
+    assert moved == [("POST", "/v1/order/cancel-and-replace")] * 2
+    assert dropped == [("DELETE", "/v1/order")]
+    assert list(resting) == [(OrderSide.SELL, 0)]
+    assert resting[(OrderSide.SELL, 0)].quote == Quote(OrderSide.SELL, "3000.3", SIZE)
+
+
+def test_replacements_keep_the_order_type(async_client, stub_server):
+    """Replaced orders are sent with the engine's order type and time in force, like new ones."""
+
+    async def steps(engine, state):
+        start = len(stub_server.requests)
+        engine.on_depth(f"{DEFAULT_SYMBOL}@depth", PULL_TOUCH)
+        await settle(state)
+        return [request["body"] for request in stub_server.requests[start:] if request["path"].endswith("replace")]
+
+    replaced = run_engine(
+        async_client, Inside(), steps, order_type=OrderType.LIMIT, time_in_force=TimeInForce.FOK
+    )
+    assert len(replaced) == 2
+    assert all(body["newOrder"]["orderType"] == OrderType.LIMIT.value for body in replaced)
+    assert all(body["newOrder"]["timeInForce"] == TimeInForce.FOK.value for body in replaced)
+
+
+def test_ladders_keep_an_order_per_level(async_client, stub_server):
+    """Several quotes on a side rest together, move level by level and shrink by cancelling the deepest."""
+    strategy = Inside(levels=3)
+
+    async def steps(engine, state):
+        placed = dict(state.resting)
+        start = len(stub_server.requests)
+        engine.on_depth(f"{DEFAULT_SYMBOL}@depth", PULL_TOUCH)
+        await settle(state)
+        moved = orders_sent(stub_server, start)
+        strategy.levels = 2
+        start = len(stub_server.requests)
+        await engine.requote(state)
+        return placed, moved, orders_sent(stub_server, start), dict(state.resting)
+
+    placed, moved, shrunk, resting = run_engine(async_client, strategy, steps)
+    assert strategy.errors == []
+    ladders = {OrderSide.BUY: ("3000.2", "3000.1", "3000"), OrderSide.SELL: ("3000.2", "3000.3", "3000.4")}
+    for side, prices in ladders.items():
+        assert [placed[(side, level)].quote for level in range(3)] == [Quote(side, price, SIZE) for price in prices]
+    assert moved == [("POST", "/v1/order/cancel-and-replace")] * 6
+    assert shrunk == [("DELETE", "/v1/order")] * 2
+    assert sorted(resting, key=lambda slot: (slot[0].name, slot[1])) == [
+        (side, level) for side in (OrderSide.BUY, OrderSide.SELL) for level in range(2)
+    ]
+
+
+def test_closed_orders_are_requoted(async_client, stub_server):
+    """An order update that closes a resting order makes the quoter place a new one."""
+
+    async def steps(engine, state):
+        bid = state.resting[(OrderSide.BUY, 0)]
+        start = len(stub_server.requests)
+        engine.on_orders("orders", [{"id": "other", "productId": state.product.id, "status": "FILLED"}])
+        engine.on_orders("orders", [{"id": bid.order_id, "productId": state.product.id, "status": "OPEN"}])
+        assert not state.changed.is_set()
+        engine.on_orders("orders", [{"id": bid.order_id, "productId": state.product.id, "status": "FILLED"}])
+        assert (OrderSide.BUY, 0) not in state.resting
+        await settle(state)
+        return orders_sent(stub_server, start), bid, state.resting[(OrderSide.BUY, 0)]
+
+    sent, old, new = run_engine(async_client, Inside(), steps)
+    assert sent == [("POST", "/v1/order")]
+    assert new is not old
+    assert new.quote == old.quote
+
+
+def test_rejections_forget_the_order(async_client, stub_server):
+    """A rejected replace is reported to the strategy and the side is placed afresh next time."""
+    strategy = Inside()
+
+    async def steps(engine, state):
+        stub_server.routes[("POST", "/v1/order/cancel-and-replace")] = lambda request: (400, {"error": "bad price"})
+        engine.on_depth(f"{DEFAULT_SYMBOL}@depth", PULL_TOUCH)
+        await settle(state)
+        return dict(state.resting)
+
+    assert run_engine(async_client, strategy, steps) == {}
+    assert len(strategy.errors) == 2
+    assert all(isinstance(exc, APIError) for exc in strategy.errors)
+
+
+def test_reconcile_cancels_orphans_and_requotes_lost_orders(async_client, stub_server):
+    """Orders on the exchange the engine does not own are cancelled; its own orders that are gone are requoted."""
+
+    async def steps(engine, state):
+        before = dict(state.resting)
+        start = len(stub_server.requests)
+        await engine.reconcile()
+        deletes = [request for request in stub_server.requests[start:] if request["method"] == "DELETE"]
+        cancelled = [request["body"]["orderId"] for request in deletes]
+        await settle(state)
+        assert sorted(engine.tracker.orders) == sorted(order.order_id for order in state.resting.values())
+        return before, cancelled, dict(state.resting), orders_sent(stub_server, start)
+
+    before, cancelled, after, sent = run_engine(async_client, Inside(), steps)
+    assert sorted(cancelled) == sorted(order["id"] for order in OPEN_ORDERS_RESPONSE)
+    assert sent.count(("POST", "/v1/order")) == 2
+    assert after[(OrderSide.BUY, 0)].order_id != before[(OrderSide.BUY, 0)].order_id
+    assert len(async_client.order_tracker) == 0
+
+
+def test_dead_stream_is_restarted_and_the_depth_polled_meanwhile(async_client, stub_server, monkeypatch):
+    """When the stream task dies the engine polls the depth, and stops polling once the stream is back."""
+    runs = []
+
+    async def run_stream(stream):
+        runs.append(stream)
+        if len(runs) == 1:
+            raise RuntimeError("stream bug")
+        await release.wait()
+        stream.connected.set()
+        await asyncio.Event().wait()
+
+    def polls():
+        return sum(request["path"] == "/v1/depth" for request in stub_server.requests)
+
+    async def run():
+        async with async_client:
+            engine = QuotingEngine(async_client, Inside(), [DEFAULT_SYMBOL], poll_interval=0.01)
+            await engine.start()
+            try:
+                start = polls()
+                for _ in range(200):
+                    await asyncio.sleep(0.01)
+                    if polls() - start >= 2:
+                        break
+                polled_while_down = polls() - start
+                release.set()
+                await asyncio.wait_for(engine.stream.connected.wait(), 5)
+                await asyncio.sleep(0.02)
+                start = polls()
+                await asyncio.sleep(0.05)
+                return polled_while_down, polls() - start
+            finally:
+                await engine.stop()
+
+    release = asyncio.Event()
+    monkeypatch.setattr(HundredXStream, "_run", run_stream)
+    polled_while_down, polled_after = asyncio.run(run())
+    assert len(runs) == 2
+    assert polled_while_down >= 2
+    assert polled_after == 0
+
+
+def test_failed_refresh_after_a_fill_still_requotes(async_client, stub_server):
+    """A fill whose account refresh fails is logged, and the product is still requoted."""
+
+    async def steps(engine, state):
+        async def fail():
+            raise ConnectionError("down")
+
+        engine.refresh_account = fail
+        await engine.on_fills("fills", [{"productId": state.product.id, "quantity": "1"}])
+        return state.changed.is_set(), len(state.fills)
+
+    assert run_engine(async_client, Inside(), steps) == (True, 1)
@@ -0,0 +1,134 @@
+"""Tests for the hundred_x.fixed_point module."""
+
+from decimal import (
+    ROUND_CEILING,
+    ROUND_DOWN,
+    ROUND_FLOOR,
+    ROUND_HALF_DOWN,
+    ROUND_HALF_EVEN,
+    ROUND_HALF_UP,
+    ROUND_UP,
+    Decimal,
+    localcontext,
+)
+
+import pytest
+
+from hundred_x.fixed_point import SCALE, Fixed
+from hundred_x.order_book import OrderBook
+from hundred_x.utils import to_wei
+from tests.bench import throughput
+from tests.test_data import DEPTH_RESPONSE, TRADE_HISTORY_RESPONSE
+
+AMOUNTS = [
+    "3000.1",
+    3000.1,
+    0.01,
+    Decimal("0.01"),
+    1e-05,
+    "-0.5",
+    7,
+    "4000.73",
+    Decimal("1E+2"),
+    "1.0000000000000000019",
+]
+ROUNDINGS = [ROUND_FLOOR, ROUND_CEILING, ROUND_DOWN, ROUND_UP, ROUND_HALF_UP, ROUND_HALF_DOWN, ROUND_HALF_EVEN]
+BENCH_ROUNDS = 20_000
+BENCH_REPEATS = 5
+
+
+def decimal_to_wei(value) -> int:
+    """Convert an amount the way the client did before fixed point."""
+    return int(Decimal(str(value)) * Decimal(1e18))
+
+
+@pytest.mark.parametrize("value", AMOUNTS)
+def test_parse_matches_decimal(value):
+    """Parsing gives the same wei as the Decimal conversion, and formatting round-trips."""
+    parsed = Fixed.parse(value)
+    assert parsed == decimal_to_wei(value) == to_wei(value)
+    assert Fixed.parse(str(parsed)) == parsed
+    assert parsed.to_decimal() == Decimal(decimal_to_wei(value)) / SCALE
+
+
+def test_wei_strings():
+    """API wei strings are wrapped as they are and written back unchanged."""
+    price = Fixed.from_wei("3000100000000000000000")
+    assert price == Fixed.parse("3000.1")
+    assert price.wei == "3000100000000000000000"
+    assert str(price) == "3000.1"
+    assert f"{price:.2f}" == "3000.10"
+    assert float(price) == 3000.1  # noqa: PLR2004
+
+
+def test_arithmetic_stays_fixed():
+    """Sums, differences, scaling, products and quotients keep the fixed-point type."""
+    tick = Fixed.parse("0.1")
+    price = Fixed.parse("3000")
+    assert isinstance(price + tick, Fixed) and price + tick == Fixed.parse("3000.1")
+    assert isinstance(price - 2 * tick, Fixed) and price - 2 * tick == Fixed.parse("2999.8")
+    assert Fixed.parse("1.5") * Fixed.parse("2") == Fixed.parse("3")
+    assert price // tick == 30000  # noqa: PLR2004
+    assert Fixed.parse("1.5") / 2 == Fixed.parse("0.75") and isinstance(Fixed.parse("1.5") / 2, Fixed)
+    assert Fixed.parse("1.5") / Fixed.parse("0.5") == Fixed.parse(3)
+    with pytest.raises(TypeError, match="float"):
+        Fixed.parse("1.5") / 2.0
+    assert repr(-tick) == "Fixed('-0.1')"
+
+
+@pytest.mark.parametrize("rounding", ROUNDINGS)
+def test_quantize_matches_decimal(rounding):
+    """Rounding to a tick agrees with Decimal.quantize in every mode, including ties and negatives."""
+    for step in ("0.1", "0.25", "1"):
+        for whole in range(-300, 300):
+            value = Decimal(whole) / 40
+            expected = (value / Decimal(step)).quantize(Decimal(1), rounding=rounding) * Decimal(step)
+            assert Fixed.parse(value).quantize(Fixed.parse(step), rounding) == Fixed.parse(expected)
+
+
+def test_order_book_levels_are_fixed():
+    """The order book hands out fixed-point prices and sizes."""
+    book = OrderBook.from_depth(DEPTH_RESPONSE)
+    price, size = book.best_bid
+    assert isinstance(price, Fixed) and isinstance(size, Fixed)
+    assert isinstance(book.mid, Fixed)
+
+
+@pytest.mark.bench
+def test_bench_order_conversion(bench_report):
+    """Convert an order's price and quantity to wei: the old Decimal path against fixed point."""
+    price, quantity = Fixed.parse("3000.1"), Fixed.parse("0.01")
+    for name, func in (
+        ("decimal_order_fields", lambda: (decimal_to_wei(3000.1), decimal_to_wei(0.01))),
+        ("parsed_order_fields", lambda: (to_wei(3000.1), to_wei(0.01))),
+        ("fixed_order_fields", lambda: (to_wei(price), to_wei(quantity))),
+    ):
+        bench_report.add(name, **throughput(func, BENCH_ROUNDS, BENCH_REPEATS))
+
+
+@pytest.mark.bench
+def test_bench_depth_and_trades(bench_report):
+    """Scale a depth snapshot and a trade history: Decimal with prec=100, as just_mm did, against fixed point."""
+    levels = DEPTH_RESPONSE["bids"] + DEPTH_RESPONSE["asks"]
+    trades = TRADE_HISTORY_RESPONSE["trades"]
+    de18 = Decimal(1e18)
+
+    def decimal_scale():
+        with localcontext() as ctx:
+            ctx.prec = 100
+            [(Decimal(price) / de18, Decimal(size) / de18) for price, size, _ in levels]
+            [(Decimal(trade["price"]) / de18, Decimal(trade["quantity"]) / de18) for trade in trades]
+
+    def fixed_scale():
+        [(Fixed.from_wei(price), Fixed.from_wei(size)) for price, size, _ in levels]
+        [(Fixed.from_wei(trade["price"]), Fixed.from_wei(trade["quantity"])) for trade in trades]
+
+    bench_report.add("decimal_depth_and_trades", **throughput(decimal_scale, 200, BENCH_REPEATS))
+    bench_report.add("fixed_depth_and_trades", **throughput(fixed_scale, 200, BENCH_REPEATS))
+    tick = Fixed.parse("0.1")
+    mid = Fixed.parse("3000.15")
+    for name, func in (
+        ("decimal_quantize", lambda: (mid.to_decimal() - Decimal("0.4")).quantize(Decimal("0.1"), ROUND_HALF_DOWN)),
+        ("fixed_quantize", lambda: (mid - tick * 4).quantize(tick, ROUND_HALF_DOWN)),
+    ):
+        bench_report.add(name, **throughput(func, BENCH_ROUNDS, BENCH_REPEATS))
@@ -0,0 +1,59 @@
+"""Import-time checks for the hundred_x package, run in fresh interpreters."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from hundred_x import client
+
+# Dependencies that only the signing and on-chain code paths may load.
+HEAVY_MODULES = ["web3", "eth_account", "eth_keys", "eip712_structs", "dotenv"]
+READ_ONLY_MODULES = ["hundred_x.client", "hundred_x.async_client", "hundred_x.order_book"]
+IMPORT_RUNS = 5
+
+
+def run_python(code: str) -> str:
+    """Run ``code`` in a new interpreter and return its output."""
+    return subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+
+
+@pytest.mark.parametrize("module", READ_ONLY_MODULES)
+def test_import_does_not_load_heavy_dependencies(module):
+    """Importing the client for market data does not pull in the chain and signing dependencies."""
+    loaded = run_python(
+        f"import json, sys; import {module}; "
+        f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))"
+    )
+    assert json.loads(loaded) == []
+
+
+def test_read_only_client_stays_light():
+    """A client without a key can be built without loading the signing dependencies."""
+    loaded = run_python(
+        "import json, sys; from hundred_x.client import HundredXClient; HundredXClient(); "
+        f"print(json.dumps([name for name in {HEAVY_MODULES[:-1]!r} if name in sys.modules]))"
+    )
+    assert json.loads(loaded) == []
+
+
+def test_abis_load_on_access():
+    """The module-level ABIs are still available, parsed on first access."""
+    assert any(entry.get("name") == "deposit" for entry in client.PROTOCOL_ABI)
+    assert any(entry.get("name") == "approve" for entry in client.ERC_20_ABI)
+
+
+@pytest.mark.bench
+def test_bench_import_time(bench_report):
+    """Report the best of several cold imports of the client."""
+    timings = [
+        float(
+            run_python(
+                "import time; start = time.perf_counter(); import hundred_x.client; "
+                "print(time.perf_counter() - start)"
+            )
+        )
+        for _ in range(IMPORT_RUNS)
+    ]
+    bench_report.add("client_import", runs=IMPORT_RUNS, best_ms=min(timings) * 1e3)
@@ -0,0 +1,86 @@
+"""Tests for the hundred_x.json_backend module."""
+
+import asyncio
+import json
+
+import pytest
+
+from hundred_x import json_backend
+from tests.bench import throughput
+from tests.test_data import DEFAULT_SYMBOL, DEPTH_RESPONSE, TEST_ORDER, TRADE_HISTORY_RESPONSE
+
+BENCH_ROUNDS = 200
+BENCH_REPEATS = 5
+
+
+@pytest.fixture(params=json_backend.BACKENDS)
+def backend(request):
+    """Run a test with each installed backend, restoring the default afterwards."""
+    default = json_backend.BACKEND
+    json_backend.use_backend(request.param)
+    yield request.param
+    json_backend.use_backend(default)
+
+
+@pytest.mark.parametrize("payload", [DEPTH_RESPONSE, TRADE_HISTORY_RESPONSE])
+def test_round_trip(backend, payload):
+    """Payloads encode to bytes and decode from bytes or text unchanged."""
+    encoded = json_backend.dumps(payload)
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == payload
+    assert json_backend.loads(encoded) == payload
+    assert json_backend.loads(encoded.decode()) == payload
+
+
+def test_wide_integers(backend):
+    """Integers beyond 64 bits, such as unstringified wei amounts, still encode and decode exactly."""
+    assert json.loads(json_backend.dumps({"quantity": 10**30})) == {"quantity": 10**30}
+    body = '{"quantity": 1000000000000000000000000000000, "id": "0x12345678901234567890", "n": -9223372036854775809}'
+    expected = {"quantity": 10**30, "id": "0x12345678901234567890", "n": -(2**63) - 1}
+    for data in (body, body.encode()):
+        decoded = json_backend.loads(data)
+        assert decoded == expected and isinstance(decoded["quantity"], int) and isinstance(decoded["n"], int)
+
+
+def test_unknown_backend():
+    """Selecting a backend that is not installed fails."""
+    with pytest.raises(ValueError):
+        json_backend.use_backend("simdjson")
+
+
+def test_client_sends_json_bytes(backend, stub_client, stub_server):
+    """Signed payloads are posted as JSON and responses decoded with the selected backend."""
+    assert stub_client.get_depth(DEFAULT_SYMBOL) == DEPTH_RESPONSE
+    stub_client.create_order(**TEST_ORDER)
+    request = stub_server.requests[-1]
+    assert request["path"] == "/v1/order"
+    assert request["content_type"] == "application/json"
+    assert request["body"]["price"] == str(TEST_ORDER["price"] * 10**18)
+
+
+def test_async_client_sends_json_bytes(backend, async_client, stub_server):
+    """The async client posts the same bytes and decodes the raw body."""
+
+    async def run():
+        async with async_client:
+            await async_client.create_order(**TEST_ORDER)
+            return await async_client.get_trade_history(DEFAULT_SYMBOL, lookback=10)
+
+    assert asyncio.run(run()) == TRADE_HISTORY_RESPONSE
+    request = stub_server.requests[-2]
+    assert request["path"] == "/v1/order"
+    assert request["content_type"] == "application/json"
+
+
+@pytest.mark.bench
+def test_bench_recorded_payloads(backend, bench_report):
+    """Decode recorded depth and trade history bodies, and encode a signed order, with each backend."""
+    depth, trades = json.dumps(DEPTH_RESPONSE).encode(), json.dumps(TRADE_HISTORY_RESPONSE).encode()
+    order = {**TEST_ORDER, "price": "3000000000000000000000", "signature": "0x" + "ab" * 65, "nonce": 1711722371000}
+    order = {key: getattr(value, "value", value) for key, value in order.items()}
+    for name, func in (
+        ("depth_decode", lambda: json_backend.loads(depth)),
+        ("trade_history_decode", lambda: json_backend.loads(trades)),
+        ("order_encode", lambda: json_backend.dumps(order)),
+    ):
+        bench_report.add(f"{backend}_{name}", **throughput(func, BENCH_ROUNDS, BENCH_REPEATS))
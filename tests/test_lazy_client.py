@@ -0,0 +1,69 @@
+"""Tests for lazy construction of the client, run against the local stub server."""
+
+import pytest
+
+from hundred_x.client import HundredXClient
+from hundred_x.constants import APIS
+from hundred_x.enums import ApiType, Environment
+from hundred_x.exceptions import UserInputValidationError
+from tests.test_data import TEST_ORDER, TEST_PRIVATE_KEY
+
+
+@pytest.fixture
+def lazy_client(stub_server, monkeypatch):
+    """Return a lazy client pointed at the stub server."""
+    monkeypatch.setitem(APIS[Environment.DEVNET], ApiType.REST, stub_server.url)
+    monkeypatch.setitem(APIS[Environment.DEVNET], ApiType.WEBSOCKET, stub_server.url)
+    with HundredXClient(env=Environment.DEVNET, private_key=TEST_PRIVATE_KEY, subaccount_id=1, lazy=True) as client:
+        yield client
+
+
+def paths(stub_server):
+    """Return the paths requested so far."""
+    return [request["path"] for request in stub_server.requests]
+
+
+def test_construction_is_offline(lazy_client, stub_server):
+    """A lazy client sends nothing and builds no web3 provider until it is used."""
+    assert stub_server.requests == []
+    assert lazy_client._web3 is None
+    assert lazy_client.get_contract_address("USDB").startswith("0x")
+    assert lazy_client._web3 is None
+
+
+def test_referral_is_registered_before_the_first_signed_request(lazy_client, stub_server):
+    """The deferred referral goes out once, just before the first order."""
+    lazy_client.create_order(**TEST_ORDER)
+    lazy_client.create_order(**TEST_ORDER)
+    assert paths(stub_server) == ["/v1/referral/add-referee", "/v1/order", "/v1/order"]
+
+
+def test_authenticated_requests_log_in_first(lazy_client, stub_server):
+    """The first authenticated read logs in; later ones reuse the session."""
+    lazy_client.get_spot_balances()
+    lazy_client.get_position()
+    assert paths(stub_server) == [
+        "/v1/referral/add-referee",
+        "/v1/session/login",
+        "/v1/balances",
+        "/v1/positionRisk",
+    ]
+
+
+def test_warmup(lazy_client, stub_server):
+    """Warming up does all the deferred setup, so the next order is a single request."""
+    lazy_client.warmup()
+    assert paths(stub_server) == ["/v1/referral/add-referee", "/v1/session/login", "/v1/time"]
+    lazy_client.create_order(**TEST_ORDER)
+    assert paths(stub_server)[-1] == "/v1/order"
+    assert len(stub_server.requests) == len(["referral", "login", "time", "order"])
+
+
+def test_private_call_without_a_key(stub_server, monkeypatch):
+    """A client without a private key reports the missing key instead of failing on a missing attribute."""
+    monkeypatch.setitem(APIS[Environment.DEVNET], ApiType.REST, stub_server.url)
+    monkeypatch.setitem(APIS[Environment.DEVNET], ApiType.WEBSOCKET, stub_server.url)
+    client = HundredXClient(env=Environment.DEVNET)
+    assert client.get_depth("ethperp")["bids"]
+    with pytest.raises(UserInputValidationError):
+        client.send_message_to_endpoint("/v1/order", "POST", {})
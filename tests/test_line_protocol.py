@@ -0,0 +1,91 @@
+"""Tests for line protocol encoding and the batching writer in hundred_x.line_protocol."""
+
+import threading
+import time
+
+import pytest
+
+from hundred_x.arrays import depth_arrays
+from hundred_x.line_protocol import BatchWriter, depth_line, encode_line
+
+
+def test_encode_line():
+    """Tags are sorted and escaped, and fields are typed."""
+    fields = [("price", 3000.5), ("count", 3), ("note", 'say "hi"')]
+    line = encode_line("order book", {"symbol": "eth,perp", "venue": "a=b"}, fields, 17)
+    assert line == r'order\ book,symbol=eth\,perp,venue=a\=b price=3000.5,count=3i,note="say \"hi\"" 17'
+    assert encode_line("m", {}, [("up", True)]) == "m up=true"
+
+
+def test_bad_fields_fail_the_line_alone():
+    """Non-finite floats are left out, and a line with no fields left raises instead of being queued."""
+    assert encode_line("m", {}, [("a", float("nan")), ("b", 1.5), ("c", float("inf"))], 1) == "m b=1.5 1"
+    with pytest.raises(ValueError, match="No fields"):
+        encode_line("m", {"symbol": "ethperp"}, [("a", float("-inf"))])
+    with pytest.raises(ValueError, match="No fields"):
+        depth_line("m", {}, depth_arrays({"bids": [], "asks": []}), 5, 1)
+
+
+def test_depth_line():
+    """Depth arrays become the collector's ``bid1_price``, ``bid1_amount``, ... fields."""
+    depth = depth_arrays({
+        "bids": [[str(3000 * 10**18), str(15 * 10**17)], [str(29995 * 10**17), str(2 * 10**18)]],
+        "asks": [[str(30005 * 10**17), str(25 * 10**16)]],
+    })
+    line = depth_line("orderbook", {"symbol": "ethperp"}, depth, 1, 5)
+    assert line == "orderbook,symbol=ethperp bid1_price=3000.0,bid1_amount=1.5,ask1_price=3000.5,ask1_amount=0.25 5"
+
+
+def test_batches_by_count_and_time():
+    """A full batch is written at once, and a partial one after ``flush_interval``."""
+    batches = []
+    with BatchWriter(batches.append, batch_size=3, flush_interval=0.2) as writer:
+        for i in range(4):
+            writer.add(f"m v={i}i")
+        deadline = time.monotonic() + 1
+        while not batches and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert batches == [["m v=0i", "m v=1i", "m v=2i"]]
+        assert len(writer) == 1
+        time.sleep(0.3)
+        assert batches[1:] == [["m v=3i"]]
+        writer.add("m v=4i")
+        assert writer.flush(1)
+        assert batches[2:] == [["m v=4i"]]
+    assert (writer.written, writer.batches, writer.dropped) == (5, 3, 0)
+
+
+def test_backpressure():
+    """``add`` waits while ``max_pending`` lines are buffered and returns False on timeout."""
+    release = threading.Event()
+    written = []
+
+    def write(lines):
+        release.wait()
+        written.extend(lines)
+
+    writer = BatchWriter(write, batch_size=1, flush_interval=0, max_pending=2)
+    for i in range(3):
+        assert writer.add(f"m v={i}i")
+    assert not writer.add("m v=3i", timeout=0.05)
+    release.set()
+    assert writer.add("m v=3i", timeout=1)
+    writer.close()
+    assert written == [f"m v={i}i" for i in range(4)]
+
+
+def test_failed_batches_are_retried_then_dropped():
+    """A failing write is retried, and dropped once the attempts run out."""
+    calls = []
+
+    def write(lines):
+        calls.append(lines)
+        if lines == ["bad"] or len(calls) == 1:
+            raise ConnectionError("database down")
+
+    with BatchWriter(write, batch_size=1, flush_interval=0.01, attempts=2) as writer:
+        writer.add("good")
+        writer.add("bad")
+        assert writer.flush(5)
+    assert calls == [["good"], ["good"], ["bad"], ["bad"]]
+    assert (writer.written, writer.dropped) == (1, 1)
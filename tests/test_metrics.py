@@ -0,0 +1,110 @@
+"""Tests for the hundred_x.metrics module and the clients' request hooks."""
+
+import asyncio
+import json
+import random
+import urllib.request
+
+import pytest
+
+from hundred_x.constants import SUCCESS_CODE, TOO_MANY_REQUESTS
+from hundred_x.exceptions import APIError
+from hundred_x.metrics import LatencyHistogram, Metrics, RequestEvent, bucket_floor, bucket_index
+from hundred_x.rate_limit import RateLimiter
+from tests.test_data import DEFAULT_SYMBOL, DEPTH_RESPONSE, TEST_ORDER
+
+BAD_REQUEST = 400
+
+
+def test_buckets_are_contiguous():
+    """Every latency falls in the bucket whose range contains it."""
+    for micros in [*range(100), 1_000, 12_345, 999_999, 10**8]:
+        index = bucket_index(micros)
+        assert bucket_floor(index) <= micros < bucket_floor(index + 1)
+
+
+def test_percentiles_are_within_a_bucket():
+    """Percentiles land within the bucket resolution of the exact values."""
+    rng = random.Random(0)
+    samples = sorted(rng.lognormvariate(-6, 1) for _ in range(10_000))
+    histogram = LatencyHistogram()
+    for sample in samples:
+        histogram.record(sample)
+    assert histogram.count == len(samples)
+    for fraction in (0.5, 0.99, 0.999):
+        exact = samples[round(fraction * len(samples)) - 1]
+        assert histogram.percentile(fraction) == pytest.approx(exact, rel=0.07)
+    assert histogram.percentile(1.0) == histogram.max == samples[-1]
+    assert LatencyHistogram().percentile(0.5) == 0.0
+
+
+def test_client_records_every_request(stub_client, stub_server):
+    """GETs and signed messages are recorded per endpoint with statuses, sizes and errors."""
+    metrics = stub_client.enable_metrics()
+    assert stub_client.enable_metrics() is metrics
+    stub_client.get_depth(DEFAULT_SYMBOL)
+    stub_client.get_depth(DEFAULT_SYMBOL)
+    stub_client.create_order(**TEST_ORDER)
+    stub_server.routes[("POST", "/v1/order")] = lambda request: (BAD_REQUEST, {"error": "bad price"})
+    with pytest.raises(APIError):
+        stub_client.create_order(**TEST_ORDER)
+    snapshot = metrics.snapshot()
+    depth, order = snapshot["GET /v1/depth"], snapshot["POST /v1/order"]
+    assert depth["count"] == 2
+    assert depth["statuses"] == {str(SUCCESS_CODE): 2}
+    assert depth["bytes_received"] == 2 * depth["max_bytes_received"] > 0
+    assert 0 < depth["p50_ms"] <= depth["p99_ms"] <= depth["p999_ms"] <= depth["max_ms"]
+    assert order["statuses"] == {str(SUCCESS_CODE): 1, str(BAD_REQUEST): 1}
+    assert order["bytes_sent"] > 0
+    assert json.loads(json.dumps(snapshot)) == snapshot
+    metrics.reset()
+    assert metrics.snapshot() == {}
+
+
+def test_hooks_see_retries_and_failures(stub_client, stub_server):
+    """Hooks get throttled retries, and a failing hook does not fail the request."""
+    events = []
+    stub_client.add_request_hook(events.append)
+    stub_client.add_request_hook(lambda event: 1 / 0)
+    stub_client.rate_limiter = RateLimiter(default=(200.0, 4), limits={})
+    throttled = iter([True])
+    stub_server.routes[("GET", "/v1/depth")] = lambda request: (
+        (TOO_MANY_REQUESTS, {}) if next(throttled, False) else (SUCCESS_CODE, DEPTH_RESPONSE)
+    )
+    assert stub_client.get_depth(DEFAULT_SYMBOL) == DEPTH_RESPONSE
+    (event,) = events
+    assert (event.method, event.endpoint, event.status, event.retries) == ("GET", "/v1/depth", SUCCESS_CODE, 1)
+    assert event.error is None
+    stub_client.remove_request_hook(events.append)
+    stub_client.get_depth(DEFAULT_SYMBOL)
+    assert len(events) == 1
+
+
+def test_async_client_hooks(async_client, stub_server):
+    """The async client reports its requests to the same hooks."""
+    events = []
+    async_client.add_request_hook(events.append)
+
+    async def run():
+        async with async_client:
+            await asyncio.gather(async_client.get_depth(DEFAULT_SYMBOL), async_client.create_order(**TEST_ORDER))
+
+    asyncio.run(run())
+    by_endpoint = {event.endpoint: event for event in events}
+    assert by_endpoint["/v1/depth"].status == SUCCESS_CODE
+    assert by_endpoint["/v1/order"].sent > 0
+    assert all(event.elapsed > 0 for event in events)
+
+
+def test_serve_publishes_the_snapshot():
+    """The metrics endpoint returns the snapshot as JSON."""
+    metrics = Metrics()
+    metrics.record(RequestEvent("GET", "/v1/depth", SUCCESS_CODE, 0.002, received=100))
+    server = metrics.serve(port=0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/") as response:
+            published = json.loads(response.read())
+    finally:
+        metrics.close()
+    assert published == json.loads(json.dumps(metrics.snapshot()))
+    assert published["GET /v1/depth"]["count"] == 1
@@ -0,0 +1,79 @@
+"""Tests for the hundred_x.order_book module."""
+
+import random
+from decimal import Decimal
+
+from hundred_x.order_book import OrderBook
+from tests.test_data import DEFAULT_SYMBOL, DEPTH_RESPONSE
+
+WEI = 10**18
+BIG_SIZE = 5 * WEI
+
+
+def naive_first_above(levels, min_size):
+    """Scan the raw depth levels the way just_mm used to."""
+    for price, size, _ in levels:
+        if Decimal(size) / Decimal(1e18) > Decimal(min_size) / Decimal(1e18):
+            return int(price), int(size)
+    return None
+
+
+def test_snapshot_queries():
+    """Queries on a REST snapshot match a linear scan of the raw levels."""
+    book = OrderBook.from_depth(DEPTH_RESPONSE, DEFAULT_SYMBOL)
+    assert book.best_bid == (int(DEPTH_RESPONSE["bids"][0][0]), int(DEPTH_RESPONSE["bids"][0][1]))
+    assert book.best_ask == (int(DEPTH_RESPONSE["asks"][0][0]), int(DEPTH_RESPONSE["asks"][0][1]))
+    assert book.mid == (book.best_bid[0] + book.best_ask[0]) // 2
+    assert book.spread == book.best_ask[0] - book.best_bid[0]
+    assert book.bids.first_level_above(BIG_SIZE) == naive_first_above(DEPTH_RESPONSE["bids"], BIG_SIZE)
+    assert book.asks.first_level_above(BIG_SIZE) == naive_first_above(DEPTH_RESPONSE["asks"], BIG_SIZE)
+    assert book.asks.first_level_above(100 * WEI) is None
+    bid_sizes = [int(size) for _, size, _ in DEPTH_RESPONSE["bids"]]
+    assert book.bids.cumulative_volume(2) == sum(bid_sizes[:2])
+    assert book.bids.cumulative_volume() == sum(bid_sizes)
+    assert book.bids.volume_through(int(DEPTH_RESPONSE["bids"][2][0])) == sum(bid_sizes[:3])
+    assert book.bids.price_for_volume(bid_sizes[0] + 1) == int(DEPTH_RESPONSE["bids"][1][0])
+    assert book.bids.price_for_volume(sum(bid_sizes) + 1) is None
+
+
+def test_deltas_match_rebuilt_book():
+    """Random in-place deltas leave the book equal to one rebuilt from scratch."""
+    rng = random.Random(0)
+    book = OrderBook.from_depth(DEPTH_RESPONSE)
+    levels = {
+        side: {int(price): int(size) for price, size, _ in DEPTH_RESPONSE[side]} for side in ("bids", "asks")
+    }
+    for _ in range(500):
+        side = rng.choice(["bids", "asks"])
+        base = 2990 if side == "bids" else 3001
+        price = (base * 10 + rng.randrange(100)) * WEI // 10
+        size = rng.choice([0, rng.randrange(1, 10) * WEI])
+        book.on_stream_message(f"{DEFAULT_SYMBOL}@depth", {"type": "delta", side: [[str(price), str(size)]]})
+        if size:
+            levels[side][price] = size
+        else:
+            levels[side].pop(price, None)
+        expected = {side: [[str(p), str(s), "1"] for p, s in sorted(lvls.items())] for side, lvls in levels.items()}
+        rebuilt = OrderBook.from_depth(expected)
+        assert book.bids.prices == rebuilt.bids.prices
+        assert book.asks.sizes == rebuilt.asks.sizes
+        assert book.bids.first_level_above(BIG_SIZE) == rebuilt.bids.first_level_above(BIG_SIZE)
+        assert book.asks.cumulative_volume(3) == rebuilt.asks.cumulative_volume(3)
+    assert book.bids.prices == sorted(book.bids.prices, reverse=True)
+    assert book.asks.prices == sorted(book.asks.prices)
+
+
+def test_stream_snapshot_replaces_book():
+    """A stream message without a delta marker is a full snapshot."""
+    book = OrderBook.from_depth(DEPTH_RESPONSE)
+    book.on_stream_message(f"{DEFAULT_SYMBOL}@depth", {"bids": [["1", "2"]], "asks": []})
+    assert book.best_bid == (1, 2)
+    assert book.best_ask is None
+    assert book.mid is None
+
+
+def test_client_order_book(stub_client):
+    """The client builds a book from the REST depth."""
+    book = stub_client.get_order_book(DEFAULT_SYMBOL)
+    assert book.symbol == DEFAULT_SYMBOL
+    assert len(book.bids) == len(DEPTH_RESPONSE["bids"])
@@ -0,0 +1,85 @@
+"""Tests for the hundred_x.order_tracker module and the clients' use of it."""
+
+import time
+
+from hundred_x.enums import OrderSide
+from hundred_x.fixed_point import Fixed
+from hundred_x.order_tracker import OrderTracker
+from tests.test_data import OPEN_ORDERS_RESPONSE, TEST_ORDER
+
+BID, ASK = OPEN_ORDERS_RESPONSE
+PRODUCT_ID = BID["productId"]
+
+
+def test_indexes_by_id_and_level():
+    """Orders are found by id and by product, side and price, in any unit."""
+    tracker = OrderTracker()
+    tracker.add(BID)
+    tracker.add(ASK)
+    assert len(tracker) == 2
+    assert BID["id"] in tracker
+    assert tracker.get(ASK["id"]).price == Fixed.parse("3000.4")
+    assert tracker.has(PRODUCT_ID, OrderSide.BUY, "2999.9")
+    assert tracker.has(PRODUCT_ID, OrderSide.BUY, Fixed.from_wei(BID["price"]))
+    assert not tracker.has(PRODUCT_ID, OrderSide.SELL, "2999.9")
+    assert [order.order_id for order in tracker.at(PRODUCT_ID, OrderSide.SELL, "3000.4")] == [ASK["id"]]
+    assert tracker.prices(PRODUCT_ID, OrderSide.BUY) == [Fixed.parse("2999.9")]
+    assert [order.order_id for order in tracker.open_orders(PRODUCT_ID, OrderSide.SELL)] == [ASK["id"]]
+
+
+def test_replace_and_updates():
+    """Replacing moves the level, partial fills update the residual and closed orders are dropped or never added."""
+    tracker = OrderTracker()
+    tracker.add(BID)
+    tracker.add({**BID, "id": "0x01", "price": "2999800000000000000000"}, replaced=BID["id"])
+    assert BID["id"] not in tracker
+    assert not tracker.has(PRODUCT_ID, OrderSide.BUY, "2999.9")
+    assert tracker.has(PRODUCT_ID, OrderSide.BUY, "2999.8")
+    tracker.on_orders("orders", {"id": "0x01", "status": "OPEN", "residualQuantity": "5000000000000000"})
+    assert tracker.get("0x01").residual == Fixed.parse("0.005")
+    tracker.on_orders("orders", [{"id": "0x01", "status": "FILLED"}, {**BID, "status": "OPEN"}])
+    assert len(tracker) == 0
+    assert tracker.prices(PRODUCT_ID, OrderSide.BUY) == []
+    tracker.add({**ASK, "id": "0x02", "status": "FILLED", "residualQuantity": "0"})
+    assert "0x02" not in tracker
+
+
+def test_reconcile():
+    """A snapshot adds missing orders and drops gone ones, but leaves orders newer than itself alone."""
+    tracker = OrderTracker()
+    tracker.add({**ASK, "id": "0xgone"})
+    since = time.monotonic()
+    tracker.add({**ASK, "id": "0xnew"})
+    tracker.remove(ASK["id"])
+    added, removed = tracker.reconcile(OPEN_ORDERS_RESPONSE, since)
+    assert [order.order_id for order in added] == [BID["id"]]
+    assert [order.order_id for order in removed] == ["0xgone"]
+    assert sorted(tracker.orders) == sorted([BID["id"], "0xnew"])
+    assert tracker.reconcile([], time.monotonic(), product_id=PRODUCT_ID + 1) == ([], [])
+    assert len(tracker.reconcile([], time.monotonic(), product_id=PRODUCT_ID)[1]) == 2
+
+
+def test_client_records_orders(stub_client, stub_server):
+    """The client records placed, replaced and cancelled orders once the tracker is enabled."""
+    tracker = stub_client.enable_order_tracker()
+    order = stub_client.create_order(**TEST_ORDER)
+    assert tracker.has(TEST_ORDER["product_id"], OrderSide.BUY, "3000")
+    replaced = stub_client.cancel_and_replace_order(
+        TEST_ORDER["subaccount_id"], TEST_ORDER["product_id"], "1", "2999.9", OrderSide.BUY, order["id"]
+    )
+    assert order["id"] not in tracker
+    assert tracker.get(replaced["id"]).price == Fixed.parse("2999.9")
+    stub_client.cancel_order(TEST_ORDER["subaccount_id"], TEST_ORDER["product_id"], replaced["id"])
+    assert len(tracker) == 0
+    stub_client.create_order(**TEST_ORDER)
+    stub_client.cancel_all_orders(TEST_ORDER["subaccount_id"], "ethperp")
+    assert len(tracker) == 0
+
+
+def test_client_reconciles(stub_client, stub_server):
+    """``reconcile_orders`` loads the open orders into the tracker with one request."""
+    added, removed = stub_client.reconcile_orders("ethperp")
+    assert sorted(order.order_id for order in added) == sorted([BID["id"], ASK["id"]])
+    assert removed == []
+    assert stub_client.order_tracker.has(PRODUCT_ID, OrderSide.SELL, "3000.4")
+    assert [request["path"] for request in stub_server.requests].count("/v1/openOrders") == 1
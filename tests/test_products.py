@@ -0,0 +1,77 @@
+"""Tests for the hundred_x.products module, run against the local stub server."""
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from hundred_x.async_client import AsyncHundredXClient
+from hundred_x.client import HundredXClient
+from hundred_x.enums import Environment, OrderSide, OrderType, TimeInForce
+from hundred_x.exceptions import UserInputValidationError
+from hundred_x.products import ProductRegistry
+from tests.test_data import PRODUCTS_RESPONSE, TEST_PRIVATE_KEY
+
+ETH_PRODUCT_ID = 1002
+
+
+def product_fetches(stub_server):
+    """Return how many times the product list was requested."""
+    return sum(request["path"] == "/v1/products" for request in stub_server.requests)
+
+
+def test_lookup_by_symbol_and_id(stub_client, stub_server):
+    """Symbols and ids resolve to the same decoded product from a single fetch."""
+    product = stub_client.lookup_product("ethperp")
+    assert stub_client.lookup_product(ETH_PRODUCT_ID) is product
+    assert product.id == ETH_PRODUCT_ID
+    assert product.increment == Decimal("0.1")
+    assert product.tick == int(PRODUCTS_RESPONSE[0]["increment"])
+    assert product.lot_size == Decimal("0.01")
+    assert product_fetches(stub_server) == 1
+
+
+def test_unknown_product(stub_client, stub_server):
+    """An unknown symbol refetches the list once before failing."""
+    stub_client.lookup_product("ethperp")
+    with pytest.raises(UserInputValidationError):
+        stub_client.lookup_product("dogeperp")
+    assert product_fetches(stub_server) == len(["first lookup", "retry on miss"])
+
+
+def test_ttl_expiry(stub_client, stub_server):
+    """A stale list is fetched again."""
+    stub_client.products.ttl = 0
+    stub_client.lookup_product("ethperp")
+    stub_client.lookup_product("ethperp")
+    assert product_fetches(stub_server) == len(["first lookup", "second lookup"])
+
+
+def test_orders_accept_symbols(stub_client, stub_server):
+    """Order methods resolve a symbol to its product id."""
+    stub_client.create_order(1, "ethperp", 1, 3000, OrderSide.BUY, OrderType.LIMIT_MAKER, TimeInForce.GTC)
+    stub_client.cancel_all_orders(1, "ethperp")
+    assert stub_server.requests[-2]["body"]["productId"] == ETH_PRODUCT_ID
+    assert stub_server.requests[-1]["body"]["productId"] == ETH_PRODUCT_ID
+
+
+def test_async_orders_accept_symbols(stub_client, stub_server):
+    """The async client resolves symbols without blocking the loop."""
+
+    async def run():
+        async with AsyncHundredXClient(env=Environment.DEVNET, private_key=TEST_PRIVATE_KEY) as client:
+            return await client.create_order(
+                1, "blastperp", 1, 4, OrderSide.BUY, OrderType.LIMIT_MAKER, TimeInForce.GTC
+            )
+
+    assert asyncio.run(run())["productId"] == PRODUCTS_RESPONSE[1]["id"]
+
+
+def test_disk_cache_survives_restarts(stub_client, stub_server, tmp_path):
+    """A warm restart reads the product list from disk instead of the network."""
+    cache_path = str(tmp_path / "products.json")
+    for _ in range(2):
+        with HundredXClient(env=Environment.DEVNET, products_cache=cache_path) as client:
+            assert client.lookup_product("blastperp").increment == Decimal("0.00001")
+    assert product_fetches(stub_server) == 1
+    assert len(ProductRegistry(cache_path=cache_path)) == len(PRODUCTS_RESPONSE)
@@ -0,0 +1,108 @@
+"""Tests for the hundred_x.quote_cache module."""
+
+import time
+from decimal import Decimal
+
+from hundred_x.enums import OrderSide, OrderType, TimeInForce
+from hundred_x.quote_cache import QuoteCache
+
+LEVELS = 2
+LADDER_SIZE = 2 * LEVELS + 1
+MIN_REMAINING = 1000
+
+
+def manual_cache(client, **kwargs):
+    """Attach a cache that is refreshed by the test rather than by the background thread."""
+    client.quote_cache = QuoteCache(client, **kwargs)
+    return client.quote_cache
+
+
+def set_bid_ladder(client, price):
+    """Center a one-lot bid ladder with 0.1 increments on ``price``."""
+    client.quote_cache.set_ladder(1, 1002, price, "0.1", levels=LEVELS, sides=(OrderSide.BUY,))
+
+
+def test_orders_are_taken_from_the_cache(stub_client, stub_server):
+    """A reprice onto a pre-signed level sends the cached signature instead of signing inline."""
+    cache = manual_cache(stub_client, min_remaining=MIN_REMAINING)
+    set_bid_ladder(stub_client, 3000)
+    assert cache.refresh() == LADDER_SIZE
+    cached = dict(cache.entries[next(iter(cache.entries))])
+    price = Decimal(cached["price"]) / 10**18
+    response = stub_client.create_order(
+        1, 1002, 1, price, OrderSide.BUY, OrderType.LIMIT_MAKER, TimeInForce.GTC, duration=cache.duration
+    )
+    assert response["signature"] == cached["signature"]
+    assert cache.hits == 1
+    assert len(cache) == LADDER_SIZE - 1
+
+
+def test_cache_miss_signs_inline(stub_client):
+    """Orders off the ladder, or with an explicit nonce, are signed as before."""
+    cache = manual_cache(stub_client)
+    set_bid_ladder(stub_client, 3000)
+    cache.refresh()
+    stub_client.create_order(1, 1002, 1, 2000, OrderSide.BUY, OrderType.LIMIT_MAKER, TimeInForce.GTC)
+    stub_client.create_order(1, 1002, 1, 3000, OrderSide.BUY, OrderType.LIMIT_MAKER, TimeInForce.GTC, nonce=1)
+    assert cache.misses == 1
+    assert len(cache) == LADDER_SIZE
+
+
+def test_cached_orders_do_not_outlive_the_requested_duration(stub_client):
+    """An order asked to expire sooner than the cached entries is signed inline and the entry kept."""
+    cache = manual_cache(stub_client)
+    set_bid_ladder(stub_client, 3000)
+    cache.refresh()
+    args = (1, 1002, 1, 3000, OrderSide.BUY, OrderType.LIMIT_MAKER, TimeInForce.GTC)
+    assert cache.take(*args, duration=cache.duration // 2) is None
+    assert len(cache) == LADDER_SIZE
+    before = stub_client._current_timestamp()
+    message = stub_client._order_message(*args, duration=1000)
+    assert message["expiration"] <= stub_client._current_timestamp() + 1000
+    assert message["expiration"] >= before + 1000
+    assert cache.take(*args, duration=cache.duration) is not None
+
+
+def test_default_duration_orders_hit_a_short_ladder(stub_client, stub_server):
+    """A ladder signed for the default one second duration serves ``create_order`` called with defaults."""
+    cache = manual_cache(stub_client)
+    stub_client.quote_cache.set_ladder(1, 1002, 3000, "0.1", levels=LEVELS, sides=(OrderSide.BUY,), duration=1000)
+    assert cache.refresh() == LADDER_SIZE
+    cached = dict(cache.entries[next(iter(cache.entries))])
+    price = Decimal(cached["price"]) / 10**18
+    response = stub_client.create_order(1, 1002, 1, price, OrderSide.BUY, OrderType.LIMIT_MAKER, TimeInForce.GTC)
+    assert response["signature"] == cached["signature"]
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_moving_the_ladder_evicts_and_refills(stub_client):
+    """Recentering keeps the overlapping levels, drops the rest and signs only the new ones."""
+    cache = manual_cache(stub_client)
+    set_bid_ladder(stub_client, 3000)
+    cache.refresh()
+    before = {key: message["signature"] for key, message in cache.entries.items()}
+    set_bid_ladder(stub_client, 3000.1)
+    assert len(cache) == LADDER_SIZE - 1
+    assert cache.refresh() == 1
+    assert sum(before.get(key) == message["signature"] for key, message in cache.entries.items()) == LEVELS * 2
+
+
+def test_expiring_entries_are_evicted(stub_client):
+    """Entries too close to their expiration are never sent."""
+    cache = manual_cache(stub_client, duration=MIN_REMAINING + 50, min_remaining=MIN_REMAINING)
+    set_bid_ladder(stub_client, 3000)
+    cache.refresh()
+    for message in cache.entries.values():
+        message["expiration"] -= 100
+    assert cache.take(1, 1002, 1, 3000, OrderSide.BUY, OrderType.LIMIT_MAKER, TimeInForce.GTC) is None
+    assert cache.refresh() == LADDER_SIZE
+
+
+def test_background_thread_fills_the_ladder(stub_client):
+    """Enabling the cache starts a thread that signs the ladder without being asked."""
+    cache = stub_client.enable_quote_cache()
+    set_bid_ladder(stub_client, 3000)
+    deadline = time.monotonic() + 5
+    while len(cache) < LADDER_SIZE and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(cache) == LADDER_SIZE
@@ -0,0 +1,129 @@
+"""Tests for the hundred_x.rate_limit module and the clients' use of it."""
+
+import asyncio
+import time
+from email.utils import formatdate
+
+import pytest
+
+from hundred_x.constants import SUCCESS_CODE, TOO_MANY_REQUESTS
+from hundred_x.enums import RequestPriority
+from hundred_x.exceptions import APIError, RateLimitError
+from hundred_x.rate_limit import RateLimiter, TokenBucket, is_throttled, parse_retry_after
+from tests.test_data import DEFAULT_SYMBOL, DEPTH_RESPONSE, TEST_ORDER
+
+BAD_REQUEST = 400
+# Fast enough that a throttled retry only waits a few milliseconds.
+FAST_LIMIT = (200.0, 4)
+
+
+def throttle_first(responses: int, payload):
+    """Return a route that answers 429 to the first ``responses`` requests and ``payload`` after that."""
+    seen = []
+
+    def route(request):
+        seen.append(request)
+        if len(seen) <= responses:
+            return TOO_MANY_REQUESTS, {"error": "Too Many Requests"}
+        return SUCCESS_CODE, payload
+
+    return route
+
+
+def test_is_throttled():
+    """429s and rate limit errors count as throttling, other failures, including other limits, do not."""
+    assert is_throttled(TOO_MANY_REQUESTS, b"")
+    assert is_throttled(BAD_REQUEST, b'{"error": "Rate limit exceeded"}')
+    assert not is_throttled(BAD_REQUEST, b'{"error": "invalid limit price"}')
+    assert not is_throttled(BAD_REQUEST, b'{"error": "Position limit exceeded"}')
+    assert not is_throttled(SUCCESS_CODE, b'{"note": "rate limit"}')
+
+
+def test_parse_retry_after():
+    """Retry-After is read as seconds or as an HTTP date."""
+    assert parse_retry_after({"Retry-After": "1.5"}) == 1.5
+    assert parse_retry_after({}) is None
+    assert parse_retry_after({"Retry-After": "soon"}) is None
+    assert parse_retry_after({"Retry-After": formatdate(time.time() + 60, usegmt=True)}) == pytest.approx(60, abs=2)
+
+
+def test_bucket_keeps_a_reserve_for_cancels():
+    """Normal requests stop at the reserve while high priority ones drain the bucket."""
+    bucket = TokenBucket(rate=1.0, capacity=4, reserve=0.5)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() > 0
+    assert bucket.try_acquire(RequestPriority.HIGH) == 0
+    assert bucket.try_acquire(RequestPriority.HIGH) == 0
+    assert bucket.try_acquire(RequestPriority.HIGH) > 0
+
+
+def test_bucket_adapts_to_throttling():
+    """Throttling halves the rate and blocks the bucket; successes win the rate back."""
+    bucket = TokenBucket(rate=10.0, capacity=10, backoff=0.5, recovery=0.1)
+    assert bucket.on_throttled(retry_after=2.0) == 2.0
+    assert bucket.rate == 5.0
+    assert bucket.try_acquire(RequestPriority.HIGH) == pytest.approx(2.0, abs=0.1)
+    for _ in range(10):
+        bucket.on_success()
+    assert bucket.rate == 10.0
+
+
+def test_limiter_gives_up_after_max_wait():
+    """A request that would wait past ``max_wait`` raises with the remaining wait."""
+    limiter = RateLimiter(default=(1.0, 1), max_wait=0.01, reserve=0)
+    limiter.acquire("/v1/depth")
+    with pytest.raises(RateLimitError) as info:
+        limiter.acquire("/v1/depth")
+    assert info.value.retry_after > 0.5
+    assert info.value.endpoint == "/v1/depth"
+    limiter.acquire("/v1/time")
+
+
+def test_throttled_post_raises(stub_client, stub_server):
+    """A throttled order raises a typed error and is not replayed."""
+    stub_client.rate_limiter = RateLimiter(default=FAST_LIMIT, limits={})
+    stub_server.routes[("POST", "/v1/order")] = throttle_first(1, {})
+    with pytest.raises(RateLimitError) as info:
+        stub_client.create_order(**TEST_ORDER)
+    assert info.value.status == TOO_MANY_REQUESTS
+    assert info.value.endpoint == "/v1/order"
+    assert info.value.retry_after > 0
+    assert isinstance(info.value, ConnectionError)
+    assert stub_client.rate_limiter.bucket("/v1/order").rate < FAST_LIMIT[0]
+    assert sum(request["path"] == "/v1/order" for request in stub_server.requests) == 1
+
+
+def test_failed_post_raises_api_error(stub_client, stub_server):
+    """Other rejections raise ``APIError`` with the status and body."""
+    stub_server.routes[("POST", "/v1/order")] = lambda request: (BAD_REQUEST, {"error": "bad price"})
+    with pytest.raises(APIError) as info:
+        stub_client.create_order(**TEST_ORDER)
+    assert not isinstance(info.value, RateLimitError)
+    assert info.value.status == BAD_REQUEST
+    assert b"bad price" in info.value.body
+
+
+def test_throttled_get_is_retried(stub_client, stub_server):
+    """With a limiter a throttled GET waits out the backoff and is retried; without one it raises."""
+    stub_server.routes[("GET", "/v1/depth")] = throttle_first(1, DEPTH_RESPONSE)
+    with pytest.raises(RateLimitError):
+        stub_client.get_depth(DEFAULT_SYMBOL)
+    stub_server.routes[("GET", "/v1/depth")] = throttle_first(2, DEPTH_RESPONSE)
+    stub_client.rate_limiter = RateLimiter(default=FAST_LIMIT, limits={})
+    assert stub_client.get_depth(DEFAULT_SYMBOL) == DEPTH_RESPONSE
+    assert stub_client.rate_limiter.bucket("/v1/depth").throttled == 2
+
+
+def test_async_throttled_get_is_retried(async_client, stub_server):
+    """The async client waits on the shared limiter and retries a throttled GET."""
+    stub_server.routes[("GET", "/v1/depth")] = throttle_first(1, DEPTH_RESPONSE)
+    limiter = RateLimiter(default=FAST_LIMIT, limits={})
+    async_client.rate_limiter = limiter
+
+    async def run():
+        async with async_client:
+            return await async_client.get_depth(DEFAULT_SYMBOL)
+
+    assert asyncio.run(run()) == DEPTH_RESPONSE
+    assert limiter.bucket("/v1/depth").throttled == 1
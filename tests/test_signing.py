@@ -0,0 +1,56 @@
+"""Tests for the hundred_x.signing module."""
+
+import time
+
+import pytest
+
+from hundred_x.enums import OrderSide, OrderType, TimeInForce
+from hundred_x.signing import SigningPool
+from tests.test_data import TEST_ORDER, TEST_PRIVATE_KEY
+
+
+def ladder(client, levels):
+    """Return order and cancel intents for a ladder of bids below the test price."""
+    intents = []
+    for level in range(levels):
+        intents.append(client.order_intent(**{**TEST_ORDER, "price": TEST_ORDER["price"] - level / 10}))
+        intents.append(client.cancel_order_intent(1, TEST_ORDER["product_id"], f"0x{level:064x}"))
+    return intents
+
+
+def test_sign_many_matches_inline_signing(stub_client):
+    """Pool-signed messages come back in order and identical to inline signatures."""
+    intents = ladder(stub_client, 10)
+    stub_client.signing_workers = 2
+    signed = stub_client.sign_many(intents)
+    assert signed == [stub_client.generate_and_sign_message(cls, **fields) for cls, fields in intents]
+    assert len({message["nonce"] for message in signed[::2]}) == len(intents) // 2
+
+
+def test_signed_batch_is_accepted(stub_client, stub_server):
+    """Signed intents can be sent as they are."""
+    stub_client.signing_workers = 1
+    (message,) = stub_client.sign_many(
+        [stub_client.order_intent(1, 1002, 1, 3000, OrderSide.BUY, OrderType.LIMIT_MAKER, TimeInForce.GTC)]
+    )
+    response = stub_client.send_message_to_endpoint("/v1/order", "POST", message)
+    assert response["signature"] == message["signature"]
+
+
+@pytest.mark.bench
+def test_bench_ladder_requote(stub_client, bench_report):
+    """Compare the time to sign a full ladder inline and across the pool."""
+    intents = ladder(stub_client, 64)
+    start = time.perf_counter()
+    for message_class, fields in intents:
+        stub_client.generate_and_sign_message(message_class, **fields)
+    inline = time.perf_counter() - start
+    pool = SigningPool(bytes.fromhex(TEST_PRIVATE_KEY[2:]), stub_client.domain.data_dict())
+    pool.sign_many(intents)  # start the workers
+    start = time.perf_counter()
+    pool.sign_many(intents)
+    pooled = time.perf_counter() - start
+    pool.close()
+    bench_report.add(
+        "ladder_signing", messages=len(intents), workers=pool.workers, inline_ms=inline * 1e3, pooled_ms=pooled * 1e3
+    )
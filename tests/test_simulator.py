@@ -0,0 +1,161 @@
+"""Tests for the local matching-engine simulator in hundred_x.simulator."""
+
+import time
+
+import pytest
+
+from hundred_x.client import HundredXClient
+from hundred_x.constants import APIS, ORDER_NOT_FOUND
+from hundred_x.enums import ApiType, Environment, OrderSide, OrderType, TimeInForce
+from hundred_x.exceptions import APIError
+from hundred_x.simulator import MatchingEngine, Simulator, SimulatorError
+from tests.test_data import DEFAULT_SYMBOL, TEST_ADDRESS, TEST_PRIVATE_KEY
+
+WEI = 10**18
+MAKER = "0x1111111111111111111111111111111111111111"
+OTHER_PRIVATE_KEY = "0x" + "11" * 32
+UNAUTHORIZED = 401
+BAD_REQUEST = 400
+
+
+def price(value: float) -> int:
+    """Return a human readable price in wei."""
+    return int(round(value * 10)) * WEI // 10
+
+
+def qty(value: float) -> int:
+    """Return a human readable quantity in wei."""
+    return int(round(value * 100)) * WEI // 100
+
+
+@pytest.fixture
+def engine():
+    """Return a matching engine that does not check signatures."""
+    return MatchingEngine(verify_signatures=False)
+
+
+@pytest.fixture
+def simulator(monkeypatch):
+    """Run a simulator with the devnet REST URL pointed at it."""
+    with Simulator() as simulator:
+        monkeypatch.setitem(APIS[Environment.DEVNET], ApiType.REST, simulator.url)
+        monkeypatch.setitem(APIS[Environment.DEVNET], ApiType.WEBSOCKET, simulator.url)
+        yield simulator
+
+
+def taker(engine, is_buy, limit, quantity, **kwargs):
+    """Send a taker order for the test address."""
+    return engine.place(TEST_ADDRESS, 1, DEFAULT_SYMBOL, is_buy, limit, quantity, **kwargs)
+
+
+def test_price_time_priority(engine):
+    """Better prices fill first, and orders at one price fill in the order they arrived."""
+    first = engine.place(MAKER, 0, DEFAULT_SYMBOL, False, price(3001), qty(0.1))
+    second = engine.place(MAKER, 1, DEFAULT_SYMBOL, False, price(3001), qty(0.1))
+    best = engine.place(MAKER, 2, DEFAULT_SYMBOL, False, price(3000.5), qty(0.1))
+    order = taker(engine, True, price(3001), qty(0.15))
+    assert (order["status"], order["residualQuantity"]) == ("FILLED", "0")
+    fills = [(trade["price"], trade["quantity"]) for trade in engine.trade_history(DEFAULT_SYMBOL)["trades"]]
+    assert fills == [(str(price(3001)), str(qty(0.05))), (str(price(3000.5)), str(qty(0.1)))]
+    assert engine.depth(DEFAULT_SYMBOL)["asks"] == [
+        [str(price(3001)), str(qty(0.15)), "2"],
+    ]
+    assert engine.orders[first["id"]].residual == qty(0.05)
+    assert engine.orders[second["id"]].residual == qty(0.1)
+    assert best["id"] not in engine.orders
+    position = engine.positions(TEST_ADDRESS, 1)[0]
+    assert position["quantity"] == str(qty(0.15))
+
+
+def test_order_types(engine):
+    """LIMIT_MAKER never crosses, IOC cancels its rest, FOK fills completely or not at all."""
+    engine.place(MAKER, 0, DEFAULT_SYMBOL, False, price(3000), qty(0.1))
+    with pytest.raises(SimulatorError, match="would cross"):
+        taker(engine, True, price(3000), qty(0.1), order_type=OrderType.LIMIT_MAKER)
+    resting = taker(engine, True, price(2999), qty(0.1), order_type=OrderType.LIMIT_MAKER)
+    assert resting["status"] == "OPEN"
+    with pytest.raises(SimulatorError, match="fill or kill"):
+        taker(engine, True, price(3000), qty(0.2), time_in_force=TimeInForce.FOK)
+    ioc = taker(engine, True, price(3000), qty(0.2), time_in_force=TimeInForce.IOC)
+    assert (ioc["status"], ioc["residualQuantity"]) == ("CANCELLED", str(qty(0.1)))
+    assert engine.depth(DEFAULT_SYMBOL)["asks"] == []
+    engine.place(MAKER, 0, DEFAULT_SYMBOL, False, price(3000), qty(0.2))
+    fok = taker(engine, True, price(3000), qty(0.2), time_in_force=TimeInForce.FOK)
+    assert fok["status"] == "FILLED"
+    with pytest.raises(SimulatorError, match="invalid price"):
+        taker(engine, True, price(3000) + 1, qty(0.1))
+    with pytest.raises(SimulatorError, match="invalid quantity"):
+        taker(engine, True, price(3000), qty(0.1) + 1)
+
+
+def test_positions_realize_pnl(engine):
+    """Closing a position moves the PnL into the balance."""
+    start = engine.balances(TEST_ADDRESS, 1)[0]["quantity"]
+    engine.place(MAKER, 0, DEFAULT_SYMBOL, False, price(3000), qty(1))
+    taker(engine, True, price(3000), qty(1))
+    engine.place(MAKER, 0, DEFAULT_SYMBOL, True, price(3010), qty(1))
+    taker(engine, False, price(3010), qty(1))
+    assert engine.positions(TEST_ADDRESS, 1) == []
+    assert int(engine.balances(TEST_ADDRESS, 1)[0]["quantity"]) - int(start) == price(10)
+    assert int(engine.balances(MAKER, 0)[0]["quantity"]) - int(start) == -price(10)
+
+
+def test_orders_expire(engine):
+    """Orders leave the book once their expiration passes."""
+    order = engine.place(MAKER, 0, DEFAULT_SYMBOL, False, price(3000), qty(0.1), duration=20)
+    time.sleep(0.05)
+    assert engine.depth(DEFAULT_SYMBOL)["asks"] == []
+    assert engine.order_history(MAKER, 0, ids=[order["id"]])[0]["status"] == "EXPIRED"
+
+
+def test_client_round_trip(simulator):
+    """A devnet client places, replaces and cancels orders, and trades against another account."""
+    with HundredXClient(env=Environment.DEVNET, private_key=TEST_PRIVATE_KEY, subaccount_id=1) as client:
+        client.login()
+        tracker = client.enable_order_tracker()
+        order = client.create_order(
+            1, DEFAULT_SYMBOL, 0.1, 3000, OrderSide.SELL, OrderType.LIMIT_MAKER, TimeInForce.GTC
+        )
+        assert [o["id"] for o in client.get_open_orders(DEFAULT_SYMBOL)] == [order["id"]]
+        replaced = client.cancel_and_replace_order(1, DEFAULT_SYMBOL, 0.2, 3001, OrderSide.SELL, order["id"])
+        assert client.get_depth(DEFAULT_SYMBOL)["asks"] == [[str(price(3001)), str(qty(0.2)), "1"]]
+        with pytest.raises(APIError, match=ORDER_NOT_FOUND):
+            client.cancel_and_replace_order(1, DEFAULT_SYMBOL, 0.2, 3001, OrderSide.SELL, order["id"])
+        assert list(tracker.orders) == [replaced["id"]]
+
+        with HundredXClient(env=Environment.DEVNET, private_key=OTHER_PRIVATE_KEY, subaccount_id=0) as other:
+            other.login()
+            fill = other.create_order(0, DEFAULT_SYMBOL, 0.05, 3001, OrderSide.BUY, OrderType.LIMIT, TimeInForce.IOC)
+            assert fill["status"] == "FILLED"
+            assert other.get_position()[0]["quantity"] == str(qty(0.05))
+
+        assert client.get_open_orders()[0]["residualQuantity"] == str(qty(0.15))
+        assert client.get_position()[0]["quantity"] == str(-qty(0.05))
+        client.cancel_order(1, DEFAULT_SYMBOL, replaced["id"])
+        assert client.get_open_orders() == []
+        assert client.get_orders(ids=[replaced["id"]])[0]["status"] == "CANCELLED"
+
+
+def test_signatures_are_checked(simulator):
+    """Tampered, replayed and unauthenticated requests are refused."""
+    with HundredXClient(env=Environment.DEVNET, private_key=TEST_PRIVATE_KEY, subaccount_id=1) as client:
+        client.login()
+        message = client._order_message(1, 1002, 0.1, 2990, OrderSide.BUY, OrderType.LIMIT, TimeInForce.GTC)
+        tampered = {**message, "price": str(price(2991))}
+        with pytest.raises(APIError) as raised:
+            client.send_message_to_endpoint("/v1/order", "POST", tampered)
+        assert raised.value.status == UNAUTHORIZED
+        client.send_message_to_endpoint("/v1/order", "POST", dict(message))
+        with pytest.raises(APIError, match="duplicate"):
+            client.send_message_to_endpoint("/v1/order", "POST", dict(message))
+        client.session_cookie = "not-a-session"
+        assert client.get_open_orders() == {"error": "not logged in"}
+
+
+def test_malformed_bodies_are_bad_requests():
+    """Bodies of the wrong shape are answered with a 400 instead of dropping the connection."""
+    with Simulator(MatchingEngine(verify_signatures=False)) as simulator:
+        for path, body in (("/v1/order/cancel-and-replace", b"[1]"), ("/v1/order", b"{}"), ("/v1/order", b'"x"')):
+            status, response = simulator.handle("POST", path, "", body, None)
+            assert status == BAD_REQUEST
+            assert b"error" in response
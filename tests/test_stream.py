@@ -0,0 +1,93 @@
+"""Tests for the hundred_x.stream module, run against a local websocket server."""
+
+import asyncio
+import json
+
+import websockets
+
+from hundred_x.enums import StreamType
+from hundred_x.stream import to_websocket_url
+from tests.test_data import DEFAULT_SYMBOL, DEPTH_RESPONSE
+
+
+def test_to_websocket_url():
+    """The configured https stream URL maps onto wss."""
+    assert to_websocket_url("https://stream.100x.finance") == "wss://stream.100x.finance"
+    assert to_websocket_url("http://127.0.0.1:8080") == "ws://127.0.0.1:8080"
+
+
+def test_private_stream_name(stub_client):
+    """Private streams are named after the client's account."""
+    stream = stub_client.stream()
+    assert stream.stream_name(StreamType.ORDERS) == f"{stub_client.public_key.lower()}@orders"
+    assert stream.stream_name(StreamType.DEPTH, DEFAULT_SYMBOL) == f"{DEFAULT_SYMBOL}@depth"
+
+
+def test_resubscribes_after_reconnect(stub_client):
+    """Dropped connections are reopened with the session and subscriptions restored."""
+    received = []
+    connections = []
+
+    async def handler(websocket):
+        requests = []
+        connections.append(requests)
+        async for raw in websocket:
+            request = json.loads(raw)
+            requests.append(request)
+            if request["method"] == "SUBSCRIBE":
+                await websocket.send(json.dumps({"id": request["id"], "result": None}))
+                for name in request["params"]:
+                    await websocket.send(json.dumps({"stream": name, "data": DEPTH_RESPONSE}))
+                if len(connections) == 1:
+                    await websocket.close()
+
+    async def run():
+        async with websockets.serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            stream = stub_client.stream(reconnect_delay=0.01)
+            stream.url = f"ws://127.0.0.1:{port}"
+            async with stream:
+                depth = await stream.subscribe(StreamType.DEPTH, DEFAULT_SYMBOL)
+                orders = await stream.subscribe(StreamType.ORDERS, callback=lambda name, data: received.append(name))
+                messages = [await asyncio.wait_for(anext(stream), 5) for _ in range(4)]
+                await stream.unsubscribe(orders)
+                await asyncio.sleep(0.05)
+        return depth, orders, messages
+
+    depth, orders, messages = asyncio.run(run())
+    assert messages.count((depth, DEPTH_RESPONSE)) == len(connections)
+    assert received == [orders] * len(connections)
+    methods = [request["method"] for request in connections[1]]
+    assert methods[:2] == ["LOGIN", "SUBSCRIBE"]
+    assert set(connections[1][1]["params"]) == {depth, orders}
+    assert connections[1][-1] == {"id": connections[1][-1]["id"], "method": "UNSUBSCRIBE", "params": [orders]}
+
+
+def test_bad_messages_and_callbacks_do_not_end_the_stream(stub_client):
+    """A frame that does not decode and a callback that raises are skipped, and later messages still arrive."""
+
+    async def handler(websocket):
+        async for raw in websocket:
+            request = json.loads(raw)
+            if request["method"] == "SUBSCRIBE":
+                await websocket.send("{not json")
+                for name in request["params"]:
+                    await websocket.send(json.dumps({"stream": name, "data": DEPTH_RESPONSE}))
+                    await websocket.send(json.dumps({"stream": name, "data": DEPTH_RESPONSE}))
+
+    def broken(name, data):
+        raise RuntimeError("handler bug")
+
+    async def run():
+        async with websockets.serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            stream = stub_client.stream()
+            stream.url = f"ws://127.0.0.1:{port}"
+            async with stream:
+                depth = await stream.subscribe(StreamType.DEPTH, DEFAULT_SYMBOL, callback=broken)
+                messages = [await asyncio.wait_for(anext(stream), 5) for _ in range(2)]
+                return depth, messages, stream._task.done()
+
+    depth, messages, done = asyncio.run(run())
+    assert messages == [(depth, DEPTH_RESPONSE)] * 2
+    assert not done
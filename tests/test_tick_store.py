@@ -0,0 +1,74 @@
+"""Tests for the local tick store in hundred_x.tick_store."""
+
+import os
+
+import numpy as np
+import pytest
+
+from hundred_x.arrays import depth_arrays
+from hundred_x.products import Product
+from hundred_x.tick_store import HEADER_DTYPE, TickStore, decode, record_dtype
+from tests.test_data import DEPTH_RESPONSE, PRODUCTS_RESPONSE
+
+PRODUCT = Product(PRODUCTS_RESPONSE[0])
+SECOND = 10**9
+
+
+def sample(shift=0):
+    """Return the recorded depth in ticks and lots, moved ``shift`` ticks."""
+    depth = depth_arrays(DEPTH_RESPONSE, int(PRODUCT.tick), int(PRODUCT.lot))
+    for side in depth.values():
+        side["price"] += shift
+    return depth
+
+
+def test_round_trip(tmp_path):
+    """Records decode to the levels that were appended, with missing levels at size 0."""
+    expected = sample()
+    short = {"bids": expected["bids"][:2], "asks": expected["asks"][:0]}
+    with TickStore(str(tmp_path), levels=3) as store:
+        store.append(PRODUCT, 1 * SECOND, expected)
+        store.append(PRODUCT, 2 * SECOND, short)
+    (records,) = TickStore(str(tmp_path), levels=3).read(PRODUCT.symbol)
+    assert isinstance(records, np.memmap)
+    assert records.dtype.itemsize == record_dtype(3).itemsize == 64
+    depth = decode(records)
+    assert depth["time"].tolist() == [SECOND, 2 * SECOND]
+    assert depth["bid_price"][0].tolist() == expected["bids"]["price"][:3].tolist()
+    assert depth["ask_price"][0].tolist() == expected["asks"]["price"][:3].tolist()
+    assert depth["bid_size"][0].tolist() == expected["bids"]["size"][:3].tolist()
+    assert depth["bid_size"][1].tolist() == [*expected["bids"]["size"][:2].tolist(), 0]
+    assert depth["ask_size"][1].tolist() == [0, 0, 0]
+
+
+def test_segments_rotate_and_reads_select_by_time(tmp_path):
+    """Samples go to one segment per period, and reads return only the requested window."""
+    with TickStore(str(tmp_path), segment_seconds=10) as store:
+        for second in range(25):
+            store.append(PRODUCT, second * SECOND, sample(second))
+    store = TickStore(str(tmp_path), segment_seconds=10)
+    segments = store.segments(PRODUCT.symbol)
+    assert [os.path.basename(segment.path) for segment in segments] == ["0.ticks", "10.ticks", "20.ticks"]
+    assert [len(segment) for segment in segments] == [10, 10, 5]
+    chunks = list(store.read(PRODUCT.symbol, start=8 * SECOND, stop=21 * SECOND))
+    assert [len(chunk) for chunk in chunks] == [2, 10, 1]
+    times = np.concatenate([chunk["time"] for chunk in chunks])
+    assert times.tolist() == [second * SECOND for second in range(8, 21)]
+    best = np.concatenate([decode(chunk)["bid_price"][:, 0] for chunk in chunks])
+    assert (np.diff(best) == 1).all()
+    assert store.stats() == (25, 3 * HEADER_DTYPE.itemsize + 25 * record_dtype(5).itemsize)
+
+
+def test_restart_continues_the_segment(tmp_path):
+    """Reopening a segment drops a partial record and keeps appending after the last whole one."""
+    with TickStore(str(tmp_path)) as store:
+        store.append(PRODUCT, 5 * SECOND, sample())
+    (segment,) = TickStore(str(tmp_path)).segments(PRODUCT.symbol)
+    with open(segment.path, "ab") as file:
+        file.write(b"\0" * 10)
+    with TickStore(str(tmp_path)) as store:
+        store.append(PRODUCT, 4 * SECOND, sample())
+        store.append(PRODUCT, 6 * SECOND, sample())
+    assert segment.records["time"].tolist() == [5 * SECOND, 5 * SECOND, 6 * SECOND]
+    with pytest.raises(ValueError, match="other levels"), TickStore(str(tmp_path), levels=2) as store:
+        store.append(PRODUCT, 7 * SECOND, sample())
@@ -0,0 +1,85 @@
+"""Tests for the hundred_x.tracing module and the traced order methods."""
+
+import asyncio
+import json
+
+import pytest
+
+from hundred_x.enums import OrderSide
+from hundred_x.exceptions import APIError
+from hundred_x.tracing import Trace, Tracer, mark
+from tests.test_data import TEST_ORDER
+
+SIGNED_PHASES = ["build", "hash", "sign", "payload", "serialize", "network", "decode"]
+
+
+def test_trace_attributes_time_between_marks():
+    """Each phase gets the time since the previous mark, repeated phases add up and the rest is ``other``."""
+    trace = Trace("op")
+    trace.start, trace.end = 0.0, 10.0
+    trace.marks = [("a", 1.0), ("b", 4.0), ("a", 6.0)]
+    assert trace.phases() == {"a": 3.0, "b": 3.0, "other": 4.0}
+    assert trace.total == 10.0
+    mark("ignored")  # no active trace
+
+
+def test_ring_buffer_keeps_the_latest():
+    """The tracer keeps the last ``capacity`` traces and records errors."""
+    tracer = Tracer(capacity=2)
+    for name in ("first", "second"):
+        with tracer.trace(name):
+            mark("work")
+    with pytest.raises(ValueError), tracer.trace("third"):
+        raise ValueError("boom")
+    records = tracer.records()
+    assert [record["operation"] for record in records] == ["second", "third"]
+    assert records[1]["error"] == "ValueError('boom')"
+    assert set(tracer.summary()) == {"second", "third"}
+
+
+def test_client_traces_order_phases(stub_client, stub_server, tmp_path):
+    """Traced orders record every phase and export as JSON lines; untraced calls record nothing."""
+    stub_client.cancel_order(1, 1002, "0x01")
+    tracer = stub_client.enable_tracing(capacity=10)
+    order = stub_client.create_order(**TEST_ORDER)
+    stub_client.cancel_and_replace_order(1, 1002, "1", "2999.9", OrderSide.BUY, order["id"])
+    stub_client.cancel_order(1, 1002, order["id"])
+    stub_client.get_depth("ethperp")
+    stub_server.routes[("POST", "/v1/order")] = lambda request: (400, {"error": "bad price"})
+    with pytest.raises(APIError):
+        stub_client.create_order(**TEST_ORDER)
+    records = tracer.records()
+    assert [record["operation"] for record in records] == [
+        "create_order",
+        "cancel_and_replace_order",
+        "cancel_order",
+        "create_order",
+    ]
+    assert list(records[0]["phases"]) == [*SIGNED_PHASES, "other"]
+    assert records[0]["error"] is None
+    assert "decode" not in records[3]["phases"]
+    assert "APIError" in records[3]["error"]
+    for record in records:
+        assert sum(record["phases"].values()) == pytest.approx(record["total_ms"])
+    summary = tracer.summary()["create_order"]
+    assert summary["network"]["count"] == 2
+    path = tmp_path / "traces.jsonl"
+    assert tracer.export(str(path)) == len(records)
+    assert [json.loads(line)["operation"] for line in path.read_text().splitlines()] == [
+        record["operation"] for record in records
+    ]
+
+
+def test_async_client_traces_across_the_executor(async_client):
+    """Phases signed in the executor land in the trace of the coroutine that asked for them."""
+    tracer = async_client.enable_tracing()
+
+    async def run():
+        async with async_client:
+            await async_client.warmup()
+            await asyncio.gather(async_client.create_order(**TEST_ORDER), async_client.withdraw(1, 1))
+
+    asyncio.run(run())
+    traces = {record["operation"]: record for record in tracer.records()}
+    assert list(traces["create_order"]["phases"]) == ["resolve", "offload", *SIGNED_PHASES, "other"]
+    assert "sign" in traces["withdraw"]["phases"]
@@ -0,0 +1,88 @@
+"""Tests for the pooled HTTP transport, run against the local stub server."""
+
+import time
+
+import pytest
+import requests
+
+from hundred_x.constants import ENDPOINT_TIMEOUTS, SUCCESS_CODE, TIMEOUT
+from hundred_x.transport import create_session
+from tests.stub_server import StubServer
+from tests.test_data import DEFAULT_SYMBOL
+
+UNAVAILABLE = 503
+ATTEMPTS = 3
+
+
+def test_connections_are_reused(stub_client, stub_server):
+    """Public and private calls share one keep-alive connection."""
+    stub_client.get_depth(DEFAULT_SYMBOL)
+    stub_client.get_open_orders(DEFAULT_SYMBOL)
+    stub_client.get_spot_balances()
+    stub_client.cancel_all_orders(subaccount_id=1, product_id=1002)
+    assert stub_server.connections == 1
+
+
+def test_keep_alive_disabled():
+    """Each request opens a new connection when keep-alive is off."""
+    with StubServer() as server:
+        session = create_session(keep_alive=False)
+        for _ in range(ATTEMPTS):
+            session.get(f"{server.url}/v1/time", timeout=TIMEOUT)
+        assert server.connections == ATTEMPTS
+
+
+def test_endpoint_timeouts(stub_client):
+    """Endpoints use their own timeouts and fall back to the global one."""
+    assert stub_client._timeout("/v1/depth") == ENDPOINT_TIMEOUTS["/v1/depth"]
+    assert stub_client._timeout("/v1/uiKlines") == TIMEOUT
+    stub_client.timeouts["/v1/depth"] = TIMEOUT / 2
+    assert stub_client._timeout("/v1/depth") == TIMEOUT / 2
+
+
+def test_get_is_retried_on_unavailable():
+    """The adapter retries idempotent requests on a 503."""
+    attempts = []
+
+    def flaky(request):
+        attempts.append(request)
+        return (UNAVAILABLE, {}) if len(attempts) < ATTEMPTS else (SUCCESS_CODE, {"serverTime": 0})
+
+    with StubServer(routes={("GET", "/v1/time"): flaky}) as server:
+        response = create_session(backoff_factor=0).get(f"{server.url}/v1/time", timeout=TIMEOUT)
+    assert response.status_code == SUCCESS_CODE
+    assert len(attempts) == ATTEMPTS
+
+
+def test_post_is_not_retried():
+    """Order submission is not replayed on a bad status."""
+    attempts = []
+
+    def unavailable(request):
+        attempts.append(request)
+        return UNAVAILABLE, {}
+
+    with StubServer(routes={("POST", "/v1/order"): unavailable}) as server:
+        response = create_session(backoff_factor=0).post(f"{server.url}/v1/order", json={}, timeout=TIMEOUT)
+    assert response.status_code == UNAVAILABLE
+    assert len(attempts) == 1
+
+
+@pytest.mark.bench
+def test_bench_pooled_vs_fresh_connections(bench_report):
+    """Compare per-request latency of fresh connections against the pooled session."""
+    calls = 200
+    with StubServer(connect_latency=0.005) as server:
+        url = f"{server.url}/v1/depth"
+        start = time.perf_counter()
+        for _ in range(calls):
+            requests.get(url, params={"symbol": DEFAULT_SYMBOL}, timeout=TIMEOUT).json()
+        fresh = (time.perf_counter() - start) / calls
+
+        session = create_session()
+        start = time.perf_counter()
+        for _ in range(calls):
+            session.get(url, params={"symbol": DEFAULT_SYMBOL}, timeout=TIMEOUT).json()
+        pooled = (time.perf_counter() - start) / calls
+        assert server.connections == calls + 1
+    bench_report.add("fresh_vs_pooled_connections", calls=calls, fresh_us=fresh * 1e6, pooled_us=pooled * 1e6)